@@ -0,0 +1,257 @@
+"""저장된 캔들로 규칙 기반 전략을 재생하는 벡터화 백테스터
+
+지표는 MarketDataCollector 와 같은 indicator_kernel 로 전체 구간을 한 번에 계산하고,
+결정 함수가 봉마다 포지션 신호를 배열로 돌려주면 TradeExecutor.execute_trade 의 포지션
+규칙대로 목표 포지션을 만든다. 봉 단위 반복 없이 거래 단위로만 반복하므로 수백만 봉도 수 초 안에 끝난다.
+
+체결 규칙
+- 봉 종가에 내린 결정은 다음 봉 시가에 슬리피지를 더해 체결
+- 주문 금액 = 진입 시점 자산 x 투자비중 x 레버리지 (기존 포지션을 뒤집을 때는 flip_buffer 배)
+- 수수료는 진입/청산 체결 금액에 각각 부과
+"""
+
+from typing import Callable, Dict, Optional, Union
+import numpy as np
+import pandas as pd
+import logging
+import indicator_kernel as kernel
+from models import Session, Candle
+from resampler import timeframe_to_ms
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+POSITIONS = ('HOLD', 'LONG', 'SHORT', 'CLOSE', 'LONG->SHORT', 'SHORT->LONG')
+# 바이비트 선물 테이커 수수료
+DEFAULT_FEE_RATE = 0.00055
+DEFAULT_SLIPPAGE = 0.0005
+# execute_trade 에서 포지션 전환 시 사용하는 여유 비율
+DEFAULT_FLIP_BUFFER = 0.95
+
+# 결정 함수: (캔들 DataFrame, 지표 시계열) -> 봉별 포지션 신호 배열
+# 또는 {'position': 신호, 'leverage': 배열/값, 'investment_ratio': 배열/값}
+DecisionRule = Callable[[pd.DataFrame, Dict[str, np.ndarray]], Union[np.ndarray, Dict]]
+
+
+def load_candles(symbol: str, timeframe: str = '1h', start_ms: Optional[int] = None,
+                 end_ms: Optional[int] = None, session_factory=Session) -> pd.DataFrame:
+    """캔들 저장소(DB)에 보관된 확정봉 로드"""
+    session = session_factory()
+    try:
+        query = session.query(
+            Candle.timestamp, Candle.open, Candle.high,
+            Candle.low, Candle.close, Candle.volume
+        ).filter(Candle.symbol == symbol, Candle.timeframe == timeframe)
+        if start_ms is not None:
+            query = query.filter(Candle.timestamp >= start_ms)
+        if end_ms is not None:
+            query = query.filter(Candle.timestamp <= end_ms)
+        df = pd.DataFrame(query.order_by(Candle.timestamp).all(),
+                          columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        return df
+    finally:
+        session.close()
+
+
+def trend_rule(df: pd.DataFrame, indicators: Dict[str, np.ndarray], fast: int = 20, slow: int = 50,
+               overbought: float = 70, oversold: float = 30) -> np.ndarray:
+    """예시 규칙: 단기/장기 MA 추세 방향으로 진입하고 RSI 과열 구간에서는 청산"""
+    def moving_average(period):
+        if f'ma_{period}' in indicators:
+            return indicators[f'ma_{period}']
+        return kernel.rolling_mean(df['close'].to_numpy(dtype=float), period)
+
+    ma_fast, ma_slow, rsi = moving_average(fast), moving_average(slow), indicators['rsi']
+    up = ma_fast > ma_slow
+    down = ma_fast < ma_slow
+    return np.select(
+        [up & (rsi < overbought), down & (rsi > oversold),
+         up & (rsi >= overbought + 5), down & (rsi <= oversold - 5)],
+        ['LONG', 'SHORT', 'CLOSE', 'CLOSE'],
+        default='HOLD'
+    )
+
+
+def _broadcast(value, n: int) -> np.ndarray:
+    return np.broadcast_to(np.asarray(value, dtype=float), (n,)).astype(float)
+
+
+def _target_positions(signals: np.ndarray) -> np.ndarray:
+    """신호 배열을 봉별 목표 방향(+1 롱, -1 숏, 0 무포지션)으로 변환
+
+    HOLD 는 직전 상태 유지(forward fill). execute_trade 와 같이 무포지션에서 받은
+    SHORT->LONG 은 무시된다 (무포지션의 LONG->SHORT 는 숏 진입).
+    """
+    signals = np.asarray(signals).astype(str)
+    target = np.full(len(signals), np.nan)
+    target[np.isin(signals, ('LONG', 'SHORT->LONG'))] = 1.0
+    target[np.isin(signals, ('SHORT', 'LONG->SHORT'))] = -1.0
+    target[signals == 'CLOSE'] = 0.0
+    short_to_long = np.flatnonzero(signals == 'SHORT->LONG')
+
+    def forward_fill(values):
+        idx = np.where(np.isnan(values), 0, np.arange(len(values)))
+        np.maximum.accumulate(idx, out=idx)
+        filled = values[idx]
+        filled[np.isnan(filled)] = 0.0
+        return filled
+
+    # 무시된 SHORT->LONG 이 이후 상태를 바꿀 수 있으므로 더 이상 바뀌지 않을 때까지 반복
+    while True:
+        state = forward_fill(target)
+        prev_state = np.r_[0.0, state[:-1]]
+        ignored = short_to_long[(prev_state[short_to_long] == 0) & ~np.isnan(target[short_to_long])]
+        if len(ignored) == 0:
+            return state
+        target[ignored] = np.nan
+
+
+class Backtester:
+    """execute_trade 의 포지션/수량 규칙을 따르는 벡터화 백테스터"""
+
+    def __init__(self, initial_equity: float = 10000.0, fee_rate: float = DEFAULT_FEE_RATE,
+                 slippage: float = DEFAULT_SLIPPAGE, flip_buffer: float = DEFAULT_FLIP_BUFFER,
+                 indicator_params: Optional[Dict] = None):
+        self.initial_equity = initial_equity
+        self.fee_rate = fee_rate
+        self.slippage = slippage
+        self.flip_buffer = flip_buffer
+        # compute_indicator_series 에 그대로 전달 (ma_periods, rsi_period, bb_period ...)
+        self.indicator_params = indicator_params or {}
+
+    def compute_indicators(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        return kernel.compute_indicator_series(
+            df['high'].to_numpy(dtype=float),
+            df['low'].to_numpy(dtype=float),
+            df['close'].to_numpy(dtype=float),
+            df['volume'].to_numpy(dtype=float),
+            **self.indicator_params
+        )
+
+    def run(self, df: pd.DataFrame, rule: DecisionRule = trend_rule, leverage: float = 3,
+            investment_ratio: float = 0.1, timeframe: str = '1h',
+            indicators: Optional[Dict[str, np.ndarray]] = None) -> Dict:
+        """백테스트 실행
+
+        leverage/investment_ratio 는 결정 함수가 봉별 값을 주지 않을 때 사용한다.
+        반환값: {'stats': 성과 요약, 'trades': 거래 내역 DataFrame, 'equity': 봉별 평가 자산 Series}
+        """
+        n = len(df)
+        if indicators is None:
+            indicators = self.compute_indicators(df)
+        decision = rule(df, indicators)
+        if isinstance(decision, dict):
+            signals = decision['position']
+            leverage = decision.get('leverage', leverage)
+            investment_ratio = decision.get('investment_ratio', investment_ratio)
+        else:
+            signals = decision
+        leverage = _broadcast(leverage, n)
+        investment_ratio = _broadcast(investment_ratio, n)
+        signals = np.asarray(signals).astype(str)
+
+        # 결정 봉 기준 목표 방향 -> 다음 봉 시가에 체결되므로 한 봉 뒤로 이동
+        decided = _target_positions(signals)
+        position = np.r_[0.0, decided[:-1]]
+
+        open_ = df['open'].to_numpy(dtype=float)
+        close = df['close'].to_numpy(dtype=float)
+        timestamps = df['timestamp'].to_numpy()
+
+        # 방향이 바뀌는 봉마다 청산/진입, 같은 방향이 이어지는 구간이 하나의 거래
+        changes = np.flatnonzero(np.diff(np.r_[0.0, position]) != 0)
+        run_ends = np.r_[changes[1:], n]
+
+        trades = []
+        equity_curve = np.full(n, np.nan)
+        equity = self.initial_equity
+        fees_paid = 0.0
+        cursor = 0
+        for start, end in zip(changes, run_ends):
+            side = position[start]
+            # 이전 구간은 실현 자산 그대로
+            equity_curve[cursor:start] = equity
+            cursor = end
+            if side == 0 or equity <= 0:
+                equity_curve[start:end] = equity
+                continue
+
+            decision_bar = start - 1
+            # 전환 신호로 반대 포지션을 뒤집을 때는 execute_trade 와 같이 여유 비율 적용
+            flipped = (start > 0 and position[start - 1] == -side
+                       and signals[decision_bar] in ('LONG->SHORT', 'SHORT->LONG'))
+            notional = equity * investment_ratio[decision_bar] * leverage[decision_bar]
+            if flipped:
+                notional *= self.flip_buffer
+            entry_price = open_[start] * (1 + side * self.slippage)
+            quantity = notional / entry_price
+            entry_fee = notional * self.fee_rate
+
+            closed = end < n
+            exit_price = (open_[end] if closed else close[-1]) * (1 - side * self.slippage)
+            exit_fee = quantity * exit_price * self.fee_rate if closed else 0.0
+            pnl = side * quantity * (exit_price - entry_price) - entry_fee - exit_fee
+
+            # 보유 중에는 종가 기준 평가
+            equity_curve[start:end] = equity - entry_fee + side * quantity * (close[start:end] - entry_price)
+            trades.append({
+                'entry_time': timestamps[start],
+                'exit_time': timestamps[end] if closed else None,
+                'side': 'LONG' if side > 0 else 'SHORT',
+                'entry_price': entry_price,
+                'exit_price': exit_price,
+                'quantity': quantity,
+                'leverage': leverage[decision_bar],
+                'notional': notional,
+                'fees': entry_fee + exit_fee,
+                'pnl': pnl,
+                'return_pct': pnl / equity * 100,
+                'bars': end - start,
+                'closed': closed
+            })
+            fees_paid += entry_fee + exit_fee
+            equity += pnl
+        equity_curve[cursor:] = equity
+
+        trades_df = pd.DataFrame(trades, columns=[
+            'entry_time', 'exit_time', 'side', 'entry_price', 'exit_price', 'quantity', 'leverage',
+            'notional', 'fees', 'pnl', 'return_pct', 'bars', 'closed'
+        ])
+        equity_series = pd.Series(equity_curve, index=df['timestamp'], name='equity')
+        stats = self._stats(equity_curve, trades_df, position, fees_paid, timeframe)
+        return {'stats': stats, 'trades': trades_df, 'equity': equity_series}
+
+    def _stats(self, equity_curve: np.ndarray, trades: pd.DataFrame, position: np.ndarray,
+               fees_paid: float, timeframe: str) -> Dict[str, float]:
+        final_equity = float(equity_curve[-1]) if len(equity_curve) else self.initial_equity
+        peak = np.maximum.accumulate(equity_curve) if len(equity_curve) else np.array([self.initial_equity])
+        drawdown = (equity_curve - peak) / peak if len(equity_curve) else np.zeros(1)
+
+        returns = np.diff(equity_curve) / equity_curve[:-1] if len(equity_curve) > 1 else np.zeros(0)
+        bars_per_year = 365 * 24 * 60 * 60 * 1000 / timeframe_to_ms(timeframe)
+        std = returns.std(ddof=1) if len(returns) > 1 else 0.0
+        sharpe = float(returns.mean() / std * np.sqrt(bars_per_year)) if std > 0 else 0.0
+
+        pnl = trades['pnl'].to_numpy(dtype=float)
+        wins, losses = pnl[pnl > 0], pnl[pnl < 0]
+        if len(losses):
+            profit_factor = float(wins.sum() / -losses.sum())
+        else:
+            profit_factor = float('inf') if len(wins) else 0.0
+        return {
+            'initial_equity': self.initial_equity,
+            'final_equity': final_equity,
+            'total_return_pct': (final_equity / self.initial_equity - 1) * 100,
+            'max_drawdown_pct': float(drawdown.min()) * 100,
+            'sharpe': sharpe,
+            'trades': len(trades),
+            'long_trades': int((trades['side'] == 'LONG').sum()),
+            'short_trades': int((trades['side'] == 'SHORT').sum()),
+            'win_rate_pct': len(wins) / len(pnl) * 100 if len(pnl) else 0.0,
+            'avg_trade_return_pct': float(trades['return_pct'].mean()) if len(trades) else 0.0,
+            'profit_factor': profit_factor,
+            'avg_bars_held': float(trades['bars'].mean()) if len(trades) else 0.0,
+            'exposure_pct': float(np.mean(position != 0) * 100) if len(position) else 0.0,
+            'fees_paid': float(fees_paid)
+        }
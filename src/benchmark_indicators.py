@@ -0,0 +1,201 @@
+"""기술적 분석 핫패스 벤치마크 (오프라인, 시드 고정 합성 데이터)
+
+지표 커널(전체 시계열)과 get_technical_indicators, get_volume_analysis, _format_for_llm 을
+여러 데이터 크기에서 실행해 실행 시간, 최대 메모리, 남은 할당 블록 수를 측정하고
+git 커밋별로 JSON 파일에 저장한다.
+
+사용 예
+    python benchmark_indicators.py                      # 측정 후 benchmark_results.json 에 저장
+    python benchmark_indicators.py --sizes 500 50000    # 크기 지정
+    python benchmark_indicators.py --compare abc1234    # 저장된 abc1234 결과와 현재 커밋 비교
+"""
+
+from typing import Callable, Dict, List, Optional
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from data_collector import MarketDataCollector
+import indicator_kernel as kernel
+
+DEFAULT_SIZES = (500, 50_000, 1_000_000, 5_000_000)
+DEFAULT_OUTPUT = 'benchmark_results.json'
+SEED = 42
+
+
+def synthetic_ohlcv(n: int, seed: int = SEED) -> pd.DataFrame:
+    """시드 고정 랜덤워크 1분봉"""
+    rng = np.random.default_rng(seed)
+    close = 60000 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2020-01-01', periods=n, freq='min'),
+        'open': open_,
+        'high': np.maximum(open_, close) * (1 + rng.random(n) * 0.002),
+        'low': np.minimum(open_, close) * (1 - rng.random(n) * 0.002),
+        'close': close,
+        'volume': rng.random(n) * 100
+    })
+
+
+def _analysis_result(collector: MarketDataCollector, df: pd.DataFrame) -> Dict:
+    """_format_for_llm 입력 (실제 리포트와 같은 구조, 파생상품 값은 고정)"""
+    recent = df.tail(50).copy()
+    recent['timestamp'] = recent['timestamp'].dt.strftime('%Y-%m-%d %H:%M:%S')
+    return {
+        'timestamp': '2024-01-01T00:00:00',
+        'symbol': 'BTCUSDT',
+        'timeframe': '1m',
+        'price_history': recent.to_dict('records'),
+        'indicators': collector.get_technical_indicators(df),
+        'volume': collector.get_volume_analysis(df),
+        'derivatives': {
+            'open_interest': 50000.0, 'funding_rate': 0.0001, 'next_funding_time': None,
+            'oi_change_1h': 0.1, 'oi_change_4h': 0.5, 'oi_change_24h': 1.2, 'oi_change': 1.2
+        },
+        'patterns': collector.get_candle_patterns(df.tail(500))
+    }
+
+
+def benchmark_targets(collector: MarketDataCollector, df: pd.DataFrame) -> Dict[str, Callable]:
+    analysis_result = _analysis_result(collector, df)
+    return {
+        'compute_indicator_series': lambda: kernel.compute_indicator_series(df['high'], df['low'], df['close']),
+        'compute_volume_series': lambda: kernel.compute_volume_series(df['close'], df['volume']),
+        'get_technical_indicators': lambda: collector.get_technical_indicators(df),
+        'get_volume_analysis': lambda: collector.get_volume_analysis(df),
+        '_format_for_llm': lambda: collector._format_for_llm(analysis_result),
+    }
+
+
+def measure(func: Callable, repeat: int) -> Dict[str, float]:
+    """실행 시간은 추적 없이 repeat 회 중 최소/중앙값, 메모리는 tracemalloc 으로 1회 측정"""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = func()
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    diff = after.compare_to(before, 'filename')
+    del result
+
+    return {
+        'best_s': min(times),
+        'median_s': float(np.median(times)),
+        'peak_mb': peak / 1024 / 1024,
+        'alloc_blocks': sum(stat.count_diff for stat in diff if stat.count_diff > 0),
+        'alloc_mb': sum(stat.size_diff for stat in diff if stat.size_diff > 0) / 1024 / 1024,
+    }
+
+
+def run(sizes=DEFAULT_SIZES, repeat: int = 3, only: Optional[List[str]] = None) -> Dict:
+    # 공유 클라이언트 생성은 네트워크 요청을 하지 않음
+    collector = MarketDataCollector(api_key='', secret_key='')
+    results = {}
+    for size in sizes:
+        df = synthetic_ohlcv(size)
+        results[str(size)] = {}
+        for name, func in benchmark_targets(collector, df).items():
+            if only and name not in only:
+                continue
+            stats = measure(func, repeat)
+            results[str(size)][name] = stats
+            print(f"{size:>9} {name:<26} {stats['best_s'] * 1000:>10.2f} ms "
+                  f"peak {stats['peak_mb']:>9.2f} MB  blocks {stats['alloc_blocks']:>7}")
+        del df
+    return results
+
+
+def git_revision() -> str:
+    repo_dir = os.path.dirname(os.path.abspath(__file__))
+    try:
+        sha = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                      cwd=repo_dir, stderr=subprocess.DEVNULL).strip()
+        dirty = subprocess.check_output(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                        text=True, cwd=repo_dir, stderr=subprocess.DEVNULL).strip()
+        return f"{sha}-dirty" if dirty else sha
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def load_results(path: str) -> Dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_results(path: str, revision: str, results: Dict, repeat: int):
+    data = load_results(path)
+    data[revision] = {
+        'recorded_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'repeat': repeat,
+        'results': results
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+
+
+def compare(base: Dict, head: Dict) -> List[str]:
+    """두 결과의 시간/최대 메모리 비율 표 (head / base, 1 보다 크면 느려짐)"""
+    lines = [f"{'size':>9} {'target':<26} {'base ms':>10} {'head ms':>10} {'time x':>7} {'peak x':>7}"]
+    for size, targets in head['results'].items():
+        for name, stats in targets.items():
+            old = base['results'].get(size, {}).get(name)
+            if old is None:
+                continue
+            time_ratio = stats['best_s'] / old['best_s'] if old['best_s'] else float('nan')
+            peak_ratio = stats['peak_mb'] / old['peak_mb'] if old['peak_mb'] else float('nan')
+            lines.append(f"{size:>9} {name:<26} {old['best_s'] * 1000:>10.2f} {stats['best_s'] * 1000:>10.2f} "
+                         f"{time_ratio:>7.2f} {peak_ratio:>7.2f}")
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="기술적 분석 벤치마크")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', nargs='+', help="측정할 대상 이름")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--revision', help="저장 키 (기본: 현재 git 커밋)")
+    parser.add_argument('--compare', nargs='+', metavar='REV',
+                        help="저장된 결과 비교: BASE [HEAD] (HEAD 생략 시 새로 측정)")
+    args = parser.parse_args(argv)
+
+    saved = load_results(args.output)
+    if args.compare and len(args.compare) == 2:
+        base, head = (saved[rev] for rev in args.compare)
+    else:
+        revision = args.revision or git_revision()
+        results = run(args.sizes, args.repeat, args.only)
+        save_results(args.output, revision, results, args.repeat)
+        print(f"결과 저장: {args.output} [{revision}]")
+        if not args.compare:
+            return 0
+        base, head = saved[args.compare[0]], {'results': results}
+    print('\n'.join(compare(base, head)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,13 @@
-from pybit.unified_trading import HTTP
 import os
 from dotenv import load_dotenv
+from exchange_registry import get_http_client
 
 class BybitClient:
     def __init__(self):
         load_dotenv()
-        self.client = HTTP(
-            testnet=False,
-            api_key=os.getenv('BYBIT_API_KEY'),
-            api_secret=os.getenv('BYBIT_SECRET_KEY')
+        self.client = get_http_client(
+            os.getenv('BYBIT_API_KEY'),
+            os.getenv('BYBIT_SECRET_KEY')
         )
 
     def get_closed_pnl(self, **kwargs):
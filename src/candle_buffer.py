@@ -0,0 +1,122 @@
+"""고정 용량 캔들 링 버퍼 (연속된 NumPy 배열 기반)
+
+타임스탬프(int64 ms)와 OHLCV(float64 또는 float32)를 열별로 연속된 배열에 보관한다.
+배열 뒤쪽에 여유 공간(slack)을 두고 끝에 도달하면 최근 capacity 개만 앞으로 옮기므로
+추가는 분할 상환 O(1) 이고, 최근 n개 구간은 항상 복사 없는 연속 뷰로 꺼낼 수 있다.
+
+뷰는 읽기 전용이며 다음 추가/병합 전까지만 유효하다 (앞으로 옮길 때 내용이 바뀜).
+오래 보관할 값은 to_frame() 이나 np.array(view) 로 복사해서 사용한다.
+"""
+
+from typing import Dict, Iterable, Optional
+import numpy as np
+import pandas as pd
+
+VALUE_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+
+class CandleBuffer:
+    """심볼/타임프레임 하나의 최근 확정봉 capacity 개를 보관하는 링 버퍼"""
+
+    def __init__(self, capacity: int, dtype=np.float64, slack: Optional[int] = None):
+        if capacity <= 0:
+            raise ValueError("capacity 는 1 이상이어야 합니다")
+        self.capacity = capacity
+        self.slack = slack if slack is not None else max(1, capacity // 4)
+        size = capacity + self.slack
+        self._timestamps = np.zeros(size, dtype=np.int64)
+        self._values = np.zeros((len(VALUE_COLUMNS), size), dtype=dtype)
+        self._start = 0
+        self._end = 0
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    @property
+    def nbytes(self) -> int:
+        return self._timestamps.nbytes + self._values.nbytes
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        return int(self._timestamps[self._end - 1]) if len(self) else None
+
+    def _compact(self):
+        """최근 capacity 개를 배열 앞으로 이동"""
+        keep = min(len(self), self.capacity)
+        src = slice(self._end - keep, self._end)
+        self._timestamps[:keep] = self._timestamps[src]
+        self._values[:, :keep] = self._values[:, src]
+        self._start, self._end = 0, keep
+
+    def append(self, timestamp: int, open_: float, high: float, low: float, close: float, volume: float):
+        """봉 하나 추가 (마지막 봉과 시각이 같으면 교체, 더 오래된 봉은 무시)"""
+        timestamp = int(timestamp)
+        last = self.last_timestamp
+        if last is not None and timestamp < last:
+            return
+        if last is None or timestamp > last:
+            if self._end == len(self._timestamps):
+                self._compact()
+            self._end += 1
+            if len(self) > self.capacity:
+                self._start += 1
+        i = self._end - 1
+        self._timestamps[i] = timestamp
+        self._values[:, i] = (open_, high, low, close, volume)
+
+    def extend(self, rows: Iterable[list]):
+        """[timestamp, open, high, low, close, volume] 행들을 병합
+
+        모두 마지막 봉 이후라면 순서대로 추가하고, 중간 구간(갭)이 섞여 있으면 정렬해 다시 채운다.
+        """
+        rows = list(rows)
+        if not rows:
+            return
+        data = np.asarray(rows, dtype=np.float64).reshape(-1, 1 + len(VALUE_COLUMNS))
+        timestamps = data[:, 0].astype(np.int64)
+        last = self.last_timestamp
+        if last is None or (timestamps.min() >= last and np.all(np.diff(timestamps) > 0)):
+            for ts, row in zip(timestamps, data[:, 1:]):
+                self.append(ts, *row)
+            return
+
+        # 기존 값과 합쳐 시각순 정렬 (같은 시각은 새 값 우선)
+        all_ts = np.concatenate([self.timestamps(), timestamps])
+        all_values = np.concatenate([self.values().astype(np.float64), data[:, 1:].T], axis=1)
+        order = np.argsort(all_ts, kind='stable')[::-1]
+        _, first = np.unique(all_ts[order], return_index=True)
+        keep = order[first][-self.capacity:]
+        self._load(all_ts[keep], all_values[:, keep])
+
+    def _load(self, timestamps: np.ndarray, values: np.ndarray):
+        n = len(timestamps)
+        self._timestamps[:n] = timestamps
+        self._values[:, :n] = values
+        self._start, self._end = 0, n
+
+    def timestamps(self, n: Optional[int] = None) -> np.ndarray:
+        """최근 n개 타임스탬프(ms) 뷰"""
+        start = self._start if n is None else max(self._start, self._end - n)
+        view = self._timestamps[start:self._end]
+        view.flags.writeable = False
+        return view
+
+    def values(self, n: Optional[int] = None) -> np.ndarray:
+        """최근 n개 OHLCV 뷰 (shape: 5 x n, 행 순서는 VALUE_COLUMNS)"""
+        start = self._start if n is None else max(self._start, self._end - n)
+        view = self._values[:, start:self._end]
+        view.flags.writeable = False
+        return view
+
+    def window(self, n: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """최근 n개 구간의 열별 연속 뷰 ('timestamp' 는 ms int64)"""
+        values = self.values(n)
+        window = {'timestamp': self.timestamps(n)}
+        window.update({name: values[i] for i, name in enumerate(VALUE_COLUMNS)})
+        return window
+
+    def to_frame(self, n: Optional[int] = None) -> pd.DataFrame:
+        """최근 n개를 DataFrame 으로 복사 (timestamp 는 datetime)"""
+        window = self.window(n)
+        frame = {name: np.array(window[name], dtype=np.float64) for name in VALUE_COLUMNS}
+        return pd.DataFrame({'timestamp': pd.to_datetime(window['timestamp'], unit='ms'), **frame})
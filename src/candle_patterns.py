@@ -0,0 +1,143 @@
+"""벡터화 캔들 패턴 탐지
+
+OHLCV 배열 전체를 NumPy 연산으로 한 번에 검사해 패턴별 신뢰도 배열(0~100, 미탐지는 0)을
+만든다. 몸통/꼬리 크기는 최근 평균 봉 길이와 비교해 판단하므로 가격 수준과 무관하다.
+"""
+
+from typing import Dict, List
+import numpy as np
+import indicator_kernel as kernel
+
+# 패턴 이름 -> (리포트 표기, 방향)
+PATTERNS = {
+    'doji': ('도지', 'neutral'),
+    'hammer': ('망치형', 'bullish'),
+    'shooting_star': ('유성형', 'bearish'),
+    'bullish_engulfing': ('상승장악형', 'bullish'),
+    'bearish_engulfing': ('하락장악형', 'bearish'),
+    'morning_star': ('샛별형', 'bullish'),
+    'evening_star': ('석별형', 'bearish'),
+    'inside_bar': ('인사이드바', 'neutral'),
+    'three_white_soldiers': ('적삼병', 'bullish'),
+    'three_black_crows': ('흑삼병', 'bearish'),
+}
+
+RANGE_PERIOD = 14  # 평균 봉 길이 계산 기간
+TREND_LOOKBACK = 5  # 직전 추세 판단 기간
+
+
+def _shift(values: np.ndarray, periods: int) -> np.ndarray:
+    shifted = np.full_like(values, np.nan)
+    if periods < len(values):
+        shifted[periods:] = values[:-periods]
+    return shifted
+
+
+def _score(mask: np.ndarray, strength: np.ndarray, base: float = 50.0) -> np.ndarray:
+    """탐지된 봉에 base + 강도(0~1) x (100 - base) 점수 부여"""
+    strength = np.nan_to_num(np.clip(strength, 0.0, 1.0))
+    return np.where(mask, base + strength * (100.0 - base), 0.0)
+
+
+def detect_patterns(open_, high, low, close) -> Dict[str, np.ndarray]:
+    """모든 패턴의 봉별 신뢰도 배열 계산"""
+    o = np.ascontiguousarray(open_, dtype=np.float64)
+    h = np.ascontiguousarray(high, dtype=np.float64)
+    l = np.ascontiguousarray(low, dtype=np.float64)
+    c = np.ascontiguousarray(close, dtype=np.float64)
+
+    body = np.abs(c - o)
+    candle_range = h - l
+    upper = h - np.maximum(o, c)
+    lower = np.minimum(o, c) - l
+    bullish = c > o
+    bearish = c < o
+    # 직전 봉까지의 평균 봉 길이 (현재 봉 크기를 비교할 기준)
+    avg_range = kernel.shift(kernel.rolling_mean(candle_range, RANGE_PERIOD))
+    safe_avg = np.where(avg_range > 0, avg_range, np.nan)
+    safe_range = np.where(candle_range > 0, candle_range, np.nan)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        body_ratio = body / safe_range
+        rel_body = body / safe_avg
+        rel_range = candle_range / safe_avg
+
+        # 직전 TREND_LOOKBACK 봉 동안의 추세 (평균 봉 길이 대비 이동 폭)
+        prev_close = kernel.shift(c)
+        trend = (prev_close - _shift(c, TREND_LOOKBACK + 1)) / safe_avg
+        downtrend = trend < -1.0
+        uptrend = trend > 1.0
+
+        o1, c1, h1, l1 = kernel.shift(o), prev_close, kernel.shift(h), kernel.shift(l)
+        body1 = np.abs(c1 - o1)
+        o2, c2 = _shift(o, 2), _shift(c, 2)
+        body2 = np.abs(c2 - o2)
+        rel_body1 = body1 / safe_avg
+        rel_body2 = _shift(rel_body, 2)
+
+        patterns = {}
+
+        doji = (body_ratio <= 0.1) & (rel_range >= 0.3)
+        patterns['doji'] = _score(doji, 1 - body_ratio / 0.1, base=50)
+
+        hammer = (lower >= 2 * body) & (upper <= np.maximum(body, 0.1 * candle_range)) \
+            & (body_ratio > 0.05) & downtrend
+        patterns['hammer'] = _score(hammer, (lower / safe_range - 0.5) * 2 + np.minimum(-trend - 1, 1) * 0.3, base=55)
+
+        shooting_star = (upper >= 2 * body) & (lower <= np.maximum(body, 0.1 * candle_range)) \
+            & (body_ratio > 0.05) & uptrend
+        patterns['shooting_star'] = _score(shooting_star, (upper / safe_range - 0.5) * 2 + np.minimum(trend - 1, 1) * 0.3, base=55)
+
+        # 직전 봉도 의미 있는 몸통이어야 하고, 감싸는 비율과 직전 추세가 강할수록 신뢰도 상승
+        engulf_size = body / np.where(body1 > 0, body1, np.nan)
+        engulf_strength = np.minimum((engulf_size - 1) / 2, 1) * 0.5
+        meaningful = (rel_body1 >= 0.3) & (rel_body >= 0.6)
+        bull_engulf = bullish & (c1 < o1) & (c >= o1) & (o <= c1) & (body > body1) & meaningful
+        patterns['bullish_engulfing'] = _score(bull_engulf, engulf_strength + downtrend * 0.5, base=40)
+        bear_engulf = bearish & (c1 > o1) & (c <= o1) & (o >= c1) & (body > body1) & meaningful
+        patterns['bearish_engulfing'] = _score(bear_engulf, engulf_strength + uptrend * 0.5, base=40)
+
+        # 큰 봉 -> 작은 몸통 -> 반대 방향 큰 봉이 첫 봉 몸통 절반 이상 회복
+        small_middle = rel_body1 < 0.5
+        mid2 = (o2 + c2) / 2
+        recovery = np.abs(c - mid2) / np.where(body2 > 0, body2, np.nan)
+        morning = (c2 < o2) & (rel_body2 >= 1.0) & small_middle & (np.maximum(o1, c1) <= c2 + 0.1 * body2) \
+            & bullish & (c > mid2)
+        patterns['morning_star'] = _score(morning, recovery + 0.5 * (rel_body - 0.5), base=65)
+        evening = (c2 > o2) & (rel_body2 >= 1.0) & small_middle & (np.minimum(o1, c1) >= c2 - 0.1 * body2) \
+            & bearish & (c < mid2)
+        patterns['evening_star'] = _score(evening, recovery + 0.5 * (rel_body - 0.5), base=65)
+
+        inside = (h < h1) & (l > l1)
+        patterns['inside_bar'] = _score(inside, 1 - candle_range / np.where(h1 - l1 > 0, h1 - l1, np.nan), base=40)
+
+        # 같은 방향 큰 몸통 3연속, 종가가 계속 갱신
+        strong = rel_body >= 0.7
+        strong1, strong2 = kernel.shift(strong.astype(float)) == 1, _shift(strong.astype(float), 2) == 1
+        soldiers = bullish & (c1 > o1) & (c2 > o2) & strong & strong1 & strong2 & (c > c1) & (c1 > c2) \
+            & (upper <= 0.3 * body)
+        crows = bearish & (c1 < o1) & (c2 < o2) & strong & strong1 & strong2 & (c < c1) & (c1 < c2) \
+            & (lower <= 0.3 * body)
+        three_strength = (rel_body + rel_body1 + rel_body2) / 3 - 0.7
+        patterns['three_white_soldiers'] = _score(soldiers, three_strength, base=65)
+        patterns['three_black_crows'] = _score(crows, three_strength, base=65)
+
+    return patterns
+
+
+def recent_patterns(patterns: Dict[str, np.ndarray], lookback: int = 3,
+                    min_confidence: float = 55.0) -> List[Dict]:
+    """최근 lookback 봉 안에서 탐지된 패턴 목록 (최근 봉, 높은 신뢰도 순)"""
+    found = []
+    for name, scores in patterns.items():
+        recent = scores[-lookback:]
+        for offset in np.flatnonzero(recent >= min_confidence):
+            label, direction = PATTERNS[name]
+            found.append({
+                'pattern': label,
+                'name': name,
+                'direction': direction,
+                'confidence': float(recent[offset]),
+                'bars_ago': int(len(recent) - 1 - offset)
+            })
+    return sorted(found, key=lambda p: (p['bars_ago'], -p['confidence']))
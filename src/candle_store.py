@@ -0,0 +1,202 @@
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from contextlib import contextmanager
+import threading
+import pandas as pd
+import numpy as np
+import logging
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from models import Session, Candle
+from rate_limiter import RateLimiter
+from candle_buffer import CandleBuffer
+from metrics import DB_WRITE_SECONDS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class CandleStore:
+    """심볼/타임프레임별 로컬 캔들 저장소
+
+    확정된 봉만 DB에 보관하고, 매 호출마다 마지막 확정봉 이후의 봉과
+    비어있는 구간(갭)만 거래소에서 조회한다.
+    """
+
+    # 바이비트 kline 1회 최대 조회 개수
+    MAX_FETCH_LIMIT = 1000
+    INSERT_CHUNK = 100
+
+    def __init__(self, exchange, session_factory=Session, rate_limiter: Optional[RateLimiter] = None,
+                 dtype=np.float64, clock: Optional[Callable[[], int]] = None):
+        self.exchange = exchange
+        # 현재 시각(ms) 함수 (거래소 서버 시간 기준 시계를 주면 로컬 시계 오차와 무관하게 마감 봉 판단)
+        self.clock = clock
+        self.session_factory = session_factory
+        self.rate_limiter = rate_limiter
+        # 메모리 캐시 값 자료형 (많은 심볼을 보관할 때는 float32 로 절반 절약)
+        self.dtype = dtype
+        # 키별 잠금 (서로 다른 심볼은 병렬로 갱신), SQLite 쓰기는 하나씩
+        self._key_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._write_lock = threading.Lock()
+        # (symbol, timeframe) -> 최근 확정봉 링 버퍼
+        self._cache: Dict[Tuple[str, str], CandleBuffer] = {}
+        # 거래소에 데이터가 없던 봉 (상장 이전, 점검 구간 등) - 재조회 방지
+        self._unavailable: Dict[Tuple[str, str], set] = {}
+        # 키별로 요청된 최대 봉 개수 (캐시 보관 범위)
+        self._depth: Dict[Tuple[str, str], int] = {}
+
+    def _timeframe_ms(self, timeframe: str) -> int:
+        return int(self.exchange.parse_timeframe(timeframe) * 1000)
+
+    def _last_closed_start(self, tf_ms: int) -> int:
+        """마지막 확정봉의 시작 시각 (ms)"""
+        now_ms = self.clock() if self.clock is not None else self.exchange.milliseconds()
+        return (now_ms // tf_ms) * tf_ms - tf_ms
+
+    def _load(self, symbol: str, timeframe: str, start_ms: int) -> List[list]:
+        """DB에 저장된 확정봉 로드"""
+        session = self.session_factory()
+        try:
+            rows = session.query(
+                Candle.timestamp, Candle.open, Candle.high,
+                Candle.low, Candle.close, Candle.volume
+            ).filter(
+                Candle.symbol == symbol,
+                Candle.timeframe == timeframe,
+                Candle.timestamp >= start_ms
+            ).order_by(Candle.timestamp).all()
+            return [list(r) for r in rows]
+        finally:
+            session.close()
+
+    def _persist(self, symbol: str, timeframe: str, rows: List[list]):
+        """새 확정봉 저장 (중복은 무시)"""
+        if not rows:
+            return
+        session = self.session_factory()
+        try:
+            values = [
+                {
+                    'symbol': symbol,
+                    'timeframe': timeframe,
+                    'timestamp': int(r[0]),
+                    'open': float(r[1]),
+                    'high': float(r[2]),
+                    'low': float(r[3]),
+                    'close': float(r[4]),
+                    'volume': float(r[5])
+                } for r in rows
+            ]
+            # SQLite 바인딩 변수 개수 제한을 넘지 않도록 나눠서 저장
+            with self._write_lock, DB_WRITE_SECONDS.time(operation='persist_candles'):
+                for i in range(0, len(values), self.INSERT_CHUNK):
+                    stmt = sqlite_insert(Candle).values(values[i:i + self.INSERT_CHUNK])
+                    stmt = stmt.on_conflict_do_nothing(index_elements=['symbol', 'timeframe', 'timestamp'])
+                    session.execute(stmt)
+                session.commit()
+        except Exception as e:
+            logger.error(f"Candle persist error: {e}")
+            session.rollback()
+        finally:
+            session.close()
+
+    @staticmethod
+    def _missing_ranges(have_ms: np.ndarray, start_ms: int, end_ms: int, tf_ms: int) -> List[Tuple[int, int]]:
+        """[start_ms, end_ms] 구간에서 비어있는 봉들을 연속 구간으로 묶어 반환"""
+        expected = np.arange(start_ms, end_ms + tf_ms, tf_ms, dtype=np.int64)
+        missing = np.setdiff1d(expected, have_ms, assume_unique=True)
+        if len(missing) == 0:
+            return []
+        # 연속되지 않는 지점에서 구간 분리
+        breaks = np.where(np.diff(missing) != tf_ms)[0] + 1
+        return [(int(chunk[0]), int(chunk[-1])) for chunk in np.split(missing, breaks)]
+
+    def _fetch_range(self, symbol: str, timeframe: str, from_ms: int, to_ms: int, tf_ms: int) -> List[list]:
+        """[from_ms, to_ms] 구간의 확정봉 조회 (필요 시 페이지 단위 반복)"""
+        rows = []
+        since = from_ms
+        while since <= to_ms:
+            count = int(min((to_ms - since) // tf_ms + 1, self.MAX_FETCH_LIMIT))
+            until = since + (count - 1) * tf_ms
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            batch = self.exchange.fetch_ohlcv(
+                symbol, timeframe, since=since, limit=count,
+                params={'until': until}
+            )
+            rows.extend(b for b in batch if since <= b[0] <= until)
+            since = until + tf_ms
+        return rows
+
+    def _lock_for(self, key: Tuple[str, str]) -> threading.Lock:
+        with self._locks_guard:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def append_closed_bar(self, symbol: str, timeframe: str, bar: list):
+        """실시간 피드에서 받은 확정봉 반영 ([timestamp ms, open, high, low, close, volume])"""
+        key = (symbol, timeframe)
+        with self._lock_for(key):
+            self._persist(symbol, timeframe, [bar])
+            buffer = self._cache.get(key)
+            if buffer is not None:
+                buffer.append(*bar)
+
+    def get_candles(self, symbol: str, timeframe: str = '1h', limit: int = 500) -> pd.DataFrame:
+        """최근 확정봉 limit개 반환 (신규 봉과 갭만 거래소에서 조회)"""
+        with self._lock_for((symbol, timeframe)):
+            return self._refresh(symbol, timeframe, limit).to_frame(limit)
+
+    def refresh(self, symbol: str, timeframe: str = '1h', limit: int = 500) -> int:
+        """최근 확정봉 limit개를 캐시에 맞춰두고 보관 중인 봉 수 반환 (DataFrame 을 만들지 않음)"""
+        with self._lock_for((symbol, timeframe)):
+            return len(self._refresh(symbol, timeframe, limit))
+
+    @contextmanager
+    def read_window(self, symbol: str, timeframe: str = '1h', limit: int = 500) -> Iterator[Dict[str, np.ndarray]]:
+        """get_candles 와 같지만 DataFrame 대신 링 버퍼의 열별 읽기 전용 뷰를 빌려줌 (복사 없음)
+
+        with 블록 동안 키 잠금을 잡고 있으므로 실시간 피드의 append_closed_bar 가 버퍼를 옮기지 못한다.
+        블록 밖에서 쓸 값은 블록 안에서 복사해야 한다.
+        """
+        with self._lock_for((symbol, timeframe)):
+            yield self._refresh(symbol, timeframe, limit).window(limit)
+
+    def _refresh(self, symbol: str, timeframe: str, limit: int) -> CandleBuffer:
+        key = (symbol, timeframe)
+        tf_ms = self._timeframe_ms(timeframe)
+        end_ms = self._last_closed_start(tf_ms)
+        start_ms = end_ms - (limit - 1) * tf_ms
+        deeper = limit > self._depth.get(key, 0)
+        depth = max(limit, self._depth.get(key, 0))
+        self._depth[key] = depth
+
+        buffer = self._cache.get(key)
+        if buffer is None or deeper:
+            buffer = CandleBuffer(depth, dtype=self.dtype)
+            buffer.extend(self._load(symbol, timeframe, end_ms - (depth - 1) * tf_ms))
+
+        have_ms = buffer.timestamps()
+        unavailable = self._unavailable.setdefault(key, set())
+        if unavailable:
+            have_ms = np.union1d(have_ms, np.fromiter(unavailable, dtype=np.int64))
+
+        new_rows = []
+        for from_ms, to_ms in self._missing_ranges(have_ms, start_ms, end_ms, tf_ms):
+            fetched = self._fetch_range(symbol, timeframe, from_ms, to_ms, tf_ms)
+            fetched_ms = {int(r[0]) for r in fetched}
+            # 이후 봉이 존재하는데 비어있는 봉은 거래소에도 없는 것이므로 기록해두고 건너뜀
+            # (가장 최근 구간의 누락분은 아직 반영 전일 수 있으므로 다음 호출에서 재시도)
+            last_known = to_ms + tf_ms if to_ms < end_ms else max(fetched_ms, default=from_ms)
+            unavailable.update(
+                ts for ts in range(from_ms, last_known, tf_ms) if ts not in fetched_ms
+            )
+            new_rows.extend(fetched)
+
+        if new_rows:
+            self._persist(symbol, timeframe, new_rows)
+            logger.info(f"{symbol} {timeframe}: 신규/누락 캔들 {len(new_rows)}개 조회")
+            # 보관 범위(depth) 밖의 오래된 봉은 버퍼에서 자연히 밀려남
+            buffer.extend(sorted(new_rows, key=lambda r: r[0]))
+
+        self._cache[key] = buffer
+        return buffer
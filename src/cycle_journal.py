@@ -0,0 +1,145 @@
+"""사이클 입력 저널 (오프라인 재생용)
+
+사이클마다 캔들 구간(열 단위), 지표, 파생상품, 심리, 거시, 계정 상태, 프롬프트, LLM 원본 응답,
+파싱된 결정을 레코드 하나로 모아 추가 전용 파일에 기록한다.
+
+파일 형식: 하루(UTC)에 파일 하나 (cycles-YYYYMMDD.jnl), 레코드마다
+[4바이트 압축 길이][4바이트 CRC32][zlib 압축 JSON] 프레임. 기록 도중 종료돼 끝이 잘린
+프레임은 읽을 때 건너뛴다. replay() 로 기록 구간을 TradingAdvisor/주문 실행기에 네트워크 없이 다시 흘려보낸다.
+"""
+
+from typing import Dict, Iterator, Optional, Tuple
+from datetime import datetime, timezone
+import glob
+import json
+import os
+import struct
+import threading
+import zlib
+import logging
+import numpy as np
+import pandas as pd
+from llm_backends import LocalBackend
+from metrics import DB_WRITE_SECONDS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+JOURNAL_DIR = os.getenv('CYCLE_JOURNAL_DIR', 'journal')
+FRAME_HEADER = struct.Struct('>II')  # 압축 길이, CRC32
+
+
+def _to_json(value):
+    """numpy 값/배열 등 JSON 기본 형식이 아닌 값 변환 (그 외는 문자열)"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def candle_columns(window) -> Dict[str, list]:
+    """CandleStore.read_window 결과(열별 뷰) 또는 캔들 DataFrame 을 복사해 열 단위 목록으로 (timestamp 는 ms)"""
+    if isinstance(window, pd.DataFrame):
+        window = {
+            name: (window[name].to_numpy(dtype='datetime64[ms]').astype(np.int64) if name == 'timestamp'
+                   else window[name].to_numpy())
+            for name in window.columns
+        }
+    return {name: np.asarray(values).tolist() for name, values in window.items()}
+
+
+class CycleJournal:
+    """추가 전용 사이클 저널 기록기"""
+
+    def __init__(self, directory: str = JOURNAL_DIR, level: int = 6):
+        self.directory = directory
+        self.level = level
+        self._lock = threading.Lock()
+
+    def _path_for(self, timestamp_ms: int) -> str:
+        day = datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc).strftime('%Y%m%d')
+        return os.path.join(self.directory, f"cycles-{day}.jnl")
+
+    def append(self, record: Dict) -> int:
+        """레코드 기록 (cycle_ms 가 없으면 현재 시각). 압축된 프레임 크기 반환"""
+        record = dict(record)
+        record.setdefault('cycle_ms', int(datetime.now(timezone.utc).timestamp() * 1000))
+        payload = zlib.compress(
+            json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=_to_json).encode('utf-8'),
+            self.level
+        )
+        frame = FRAME_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+        path = self._path_for(record['cycle_ms'])
+        with self._lock, DB_WRITE_SECONDS.time(operation='cycle_journal'):
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path, 'ab') as f:
+                f.write(frame)
+                f.flush()
+                os.fsync(f.fileno())
+        return len(frame)
+
+
+def read_file(path: str) -> Iterator[Dict]:
+    """저널 파일 하나의 레코드를 순서대로 읽음 (잘리거나 손상된 프레임에서 중단)"""
+    with open(path, 'rb') as f:
+        while True:
+            header = f.read(FRAME_HEADER.size)
+            if len(header) < FRAME_HEADER.size:
+                return
+            length, crc = FRAME_HEADER.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length or zlib.crc32(payload) != crc:
+                logger.warning(f"{path}: 손상되거나 잘린 레코드 이후는 건너뜀 (위치 {f.tell()})")
+                return
+            yield json.loads(zlib.decompress(payload))
+
+
+def read_journal(directory: str = JOURNAL_DIR, start_ms: Optional[int] = None,
+                 end_ms: Optional[int] = None, symbol: Optional[str] = None) -> Iterator[Dict]:
+    """[start_ms, end_ms) 구간 사이클 레코드를 시간 순서대로 읽음"""
+    for path in sorted(glob.glob(os.path.join(directory, 'cycles-*.jnl'))):
+        day = os.path.basename(path)[len('cycles-'):-len('.jnl')]
+        day_start = int(datetime.strptime(day, '%Y%m%d').replace(tzinfo=timezone.utc).timestamp() * 1000)
+        # 구간과 겹치지 않는 날짜 파일은 열지 않음
+        if end_ms is not None and day_start >= end_ms:
+            continue
+        if start_ms is not None and day_start + 86400000 <= start_ms:
+            continue
+        for record in read_file(path):
+            cycle_ms = record.get('cycle_ms', 0)
+            if start_ms is not None and cycle_ms < start_ms:
+                continue
+            if end_ms is not None and cycle_ms >= end_ms:
+                continue
+            if symbol is not None and record.get('symbol') != symbol:
+                continue
+            yield record
+
+
+def replay(records, advisor=None, executor=None) -> Iterator[Tuple[Dict, Dict, Optional[str]]]:
+    """기록된 사이클을 다시 실행해 (레코드, 결정, 응답) 반환
+
+    advisor 를 주면 기록된 LLM 원본 응답을 돌려주는 백엔드로 바꿔 끼워 TradingAdvisor 의
+    파싱/캐스케이드/대체 규칙을 네트워크 대기 없이 다시 실행한다 (advisor 는 backend=LocalBackend('') 로 만든 재생 전용 인스턴스를 사용).
+    advisor 가 없으면 기록된 결정을 그대로 쓴다. executor 를 주면 결정을 execute_trade 로 넘긴다
+    (모의 실행기 등 execute_trade(symbol, trading_decision) 만 있으면 됨).
+    """
+    current: Dict = {}
+    if advisor is not None:
+        advisor.backend = LocalBackend(lambda prompt, temperature: current.get('response') or '')
+        # 재생 중에는 기록된 응답이 항상 즉시 나오므로 마감/헤지 없이 실행
+        advisor.hedger = advisor.stream_hedger = None
+    for record in records:
+        current = record
+        if advisor is not None:
+            decision, response = advisor.get_trading_advice(record.get('report', ''),
+                                                            features=record.get('features'))
+        else:
+            decision, response = dict(record.get('decision') or {}), record.get('response')
+        if executor is not None:
+            executor.execute_trade(symbol=record.get('symbol'), trading_decision=decision)
+        yield record, decision, response
+
@@ -0,0 +1,152 @@
+"""거래소 서버 시간 기준 사이클 스케줄러
+
+로컬 시계 대신 거래소 서버 시간으로 캔들 마감 시각을 계산한다. 캔들과 무관한 느린 단계
+(펀더멘털, 심리, 거시, 계정)는 마감 몇 분 전에 미리 실행하고, 마감 직후에는 확정봉(kline confirm)
+수신만 기다렸다가 기술적 분석과 조언을 실행한다. 캔들 마감부터 주문까지의 지연을 핵심 지표로 기록한다.
+"""
+
+from typing import Dict, List, Optional
+from collections import deque
+import time
+import logging
+import ccxt
+import numpy as np
+from metrics import CLOSE_TO_ORDER_SECONDS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_PREFETCH_LEAD = 180  # 초
+DEFAULT_BAR_TIMEOUT = 90  # 확정봉 대기 최대 시간 (초)
+DEFAULT_CLOSE_GRACE = 5  # 실시간 수신이 없을 때 거래소 REST 반영을 기다리는 시간 (초)
+
+
+class ServerClock:
+    """거래소 서버 시간 = 로컬 시간 + 오차
+
+    여러 번 조회해 왕복 시간이 가장 짧은 표본의 중간 시점을 기준으로 오차를 계산한다.
+    """
+
+    def __init__(self, exchange, samples: int = 3, resync_interval: float = 3600):
+        self.exchange = exchange
+        self.samples = samples
+        self.resync_interval = resync_interval
+        self.offset_ms = 0.0
+        self.rtt_ms: Optional[float] = None
+        self.synced_at = 0.0
+
+    def sync(self) -> float:
+        """서버 시간 오차(ms) 갱신. 실패하면 ccxt 가 보관한 오차로 대체"""
+        best = None
+        for _ in range(self.samples):
+            try:
+                before = time.time() * 1000
+                server_ms = self.exchange.fetch_time()
+                after = time.time() * 1000
+            except Exception as e:
+                logger.warning(f"서버 시간 조회 실패: {e}")
+                continue
+            rtt = after - before
+            if best is None or rtt < best[0]:
+                best = (rtt, server_ms - (before + after) / 2)
+        if best is not None:
+            self.rtt_ms, self.offset_ms = best
+            logger.info(f"서버 시간 오차: {self.offset_ms:+.0f}ms (왕복 {self.rtt_ms:.0f}ms)")
+        else:
+            # ccxt 의 timeDifference 는 (로컬 - 서버)
+            self.offset_ms = -float(getattr(self.exchange, 'options', {}).get('timeDifference', 0) or 0)
+        self.synced_at = time.time()
+        return self.offset_ms
+
+    def maybe_sync(self):
+        if time.time() - self.synced_at >= self.resync_interval:
+            self.sync()
+
+    def now_ms(self) -> int:
+        return int(time.time() * 1000 + self.offset_ms)
+
+
+class CycleScheduler:
+    """캔들 마감 시각 계산, 마감 전/후 대기, 마감-주문 지연 기록"""
+
+    def __init__(self, clock: ServerClock, timeframe: str = '1h',
+                 prefetch_lead: float = DEFAULT_PREFETCH_LEAD, bar_timeout: float = DEFAULT_BAR_TIMEOUT,
+                 close_grace: float = DEFAULT_CLOSE_GRACE, history: int = 200):
+        self.clock = clock
+        self.timeframe = timeframe
+        self.tf_ms = int(ccxt.Exchange.parse_timeframe(timeframe) * 1000)
+        self.prefetch_lead = prefetch_lead
+        self.bar_timeout = bar_timeout
+        self.close_grace = close_grace
+        # 최근 캔들 마감 -> 주문 지연 (초)
+        self.latencies = deque(maxlen=history)
+
+    def next_close_ms(self) -> int:
+        """다음 캔들 마감 시각 (서버 시간 ms)"""
+        now_ms = self.clock.now_ms()
+        return (now_ms // self.tf_ms + 1) * self.tf_ms
+
+    def sleep_until(self, target_ms: int):
+        """서버 시간 기준 target_ms 까지 대기 (긴 대기 중 시계 오차 갱신을 반영하도록 나눠서 잠)"""
+        while True:
+            remaining = (target_ms - self.clock.now_ms()) / 1000
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining, 60))
+
+    def wait_for_prefetch(self, close_ms: int):
+        """마감 prefetch_lead 초 전까지 대기"""
+        self.clock.maybe_sync()
+        target_ms = close_ms - int(self.prefetch_lead * 1000)
+        logger.info(f"사전 수집까지 대기: {max(target_ms - self.clock.now_ms(), 0) / 60000:.1f}분")
+        self.sleep_until(target_ms)
+
+    def wait_for_close(self, close_ms: int, stream=None, symbol: Optional[str] = None) -> Optional[list]:
+        """마감된 봉(시작 시각 close_ms - 봉 길이) 확정 대기
+
+        실시간 수신기가 있으면 확정봉을 받는 즉시 반환하고, 없거나 시간 초과면
+        close_grace 초 뒤 REST 조회에 맡긴다 (None 반환).
+        """
+        self.sleep_until(close_ms)
+        if stream is not None and symbol is not None:
+            bar = stream.wait_for_closed_bar(symbol, close_ms - self.tf_ms, timeout=self.bar_timeout)
+            if bar is not None:
+                logger.info(f"확정봉 수신: 마감 후 {(self.clock.now_ms() - close_ms) / 1000:.2f}초")
+                return bar
+            logger.warning("확정봉 수신 시간 초과, REST 조회로 대체")
+        self.sleep_until(close_ms + int(self.close_grace * 1000))
+        return None
+
+    def close_ready(self, close_ms: int, stream=None, symbol: Optional[str] = None) -> bool:
+        """마감된 봉으로 사이클을 시작해도 되는지 대기 없이 확인 (기준은 wait_for_close 와 같음)"""
+        now_ms = self.clock.now_ms()
+        if now_ms < close_ms:
+            return False
+        if stream is not None and symbol is not None and getattr(stream, 'connected', True):
+            bar = stream.get_last_closed_bar(symbol)
+            if bar is not None and bar[0] >= close_ms - self.tf_ms:
+                return True
+            return now_ms >= close_ms + int(max(self.bar_timeout, self.close_grace) * 1000)
+        return now_ms >= close_ms + int(self.close_grace * 1000)
+
+    def record_order(self, close_ms: int, symbol: str = "BTCUSDT") -> float:
+        """캔들 마감부터 지금(주문 직후)까지의 지연 (초)"""
+        latency = (self.clock.now_ms() - close_ms) / 1000
+        self.latencies.append(latency)
+        CLOSE_TO_ORDER_SECONDS.observe(latency, symbol=symbol)
+        stats = self.latency_stats()
+        logger.info(f"{symbol} 캔들 마감 -> 주문 지연: {latency:.2f}초 "
+                    f"(p50 {stats['p50']:.2f}초, p90 {stats['p90']:.2f}초, {stats['count']}회)")
+        return latency
+
+    def latency_stats(self) -> Dict[str, float]:
+        if not self.latencies:
+            return {'count': 0}
+        values: List[float] = list(self.latencies)
+        return {
+            'count': len(values),
+            'last': round(values[-1], 3),
+            'p50': round(float(np.percentile(values, 50)), 3),
+            'p90': round(float(np.percentile(values, 90)), 3),
+            'max': round(max(values), 3),
+        }
@@ -1,314 +1,84 @@
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence
 import pandas as pd
 import numpy as np
 import ccxt
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 import logging
-import json
+from candle_store import CandleStore
+from indicator_engine import IncrementalIndicatorEngine
+import indicator_kernel as kernel
+from rate_limiter import RateLimiter
+from resampler import resample_many, timeframe_to_ms, can_resample
+from derivatives_snapshot import DerivativesCache
+from exchange_registry import get_ccxt_client
+from report_encoding import encode_price_history, section_token_counts
+from candle_patterns import detect_patterns, recent_patterns
 
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# LLM 리포트에 포함할 상위 타임프레임과 타임프레임별 최소 봉 수
+MTF_TIMEFRAMES = ('4h', '1d')
+MTF_MIN_BARS = 60
+
 class MarketDataCollector:
-    def __init__(self, api_key: str, secret_key: str):
-        self.exchange = ccxt.bybit({
-            'apiKey': api_key,
-            'secret': secret_key,
-            'enableRateLimit': True,
-            'options': {
-                'defaultType': 'linear',
-                'adjustForTimeDifference': True,
-                'recvWindow': 10000
-            }
-        })
+    def __init__(self, api_key: str, secret_key: str, rate_limiter: Optional[RateLimiter] = None,
+                 max_workers: int = 8, price_history_format: str = 'csv',
+                 price_decimals: Optional[int] = None):
+        # 프로세스 전역 공유 클라이언트 (마켓 정보/시간 오차는 디스크 캐시 사용)
+        self.exchange = get_ccxt_client(api_key, secret_key)
+        # 여러 심볼을 병렬 수집할 때도 하나의 요청 예산을 공유
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.max_workers = max_workers
+        self.candle_store = CandleStore(self.exchange, rate_limiter=self.rate_limiter)
+        self.derivatives_cache = DerivativesCache(self.exchange, rate_limiter=self.rate_limiter)
+        # (symbol, timeframe) 별 증분 지표 엔진
+        self.indicator_engines: Dict[tuple, IncrementalIndicatorEngine] = {}
+        # 심볼별 마지막 리포트의 지표/파생상품/패턴 값 (가격 이력 제외, 결정 캐시 키 등에 사용)
+        self.latest_metrics: Dict[str, Dict] = {}
+        # 심볼별 마지막 리포트의 지표 계산에 쓴 캔들 구간 (최근 500봉 열별 배열 복사본, timestamp 는 ms)
+        self.latest_windows: Dict[str, Dict[str, np.ndarray]] = {}
+        # 리포트의 가격 이력 형식 ('csv', 'delta', 'json') 과 가격 소수점 자릿수 (None 이면 가격 크기에 맞춤)
+        self.price_history_format = price_history_format
+        self.price_decimals = price_decimals
 
     def _get_historical_data(self, symbol: str, timeframe: str = '1h', limit: int = 500) -> pd.DataFrame:
-        """과거 데이터 조회"""
+        """과거 데이터 조회 (로컬 캔들 저장소에서 확정봉만 반환, 신규 봉만 증분 조회)"""
         try:
-            ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
-            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            return df
+            return self.candle_store.get_candles(symbol, timeframe=timeframe, limit=limit)
         except Exception as e:
             logger.error(f"Historical data fetch error: {e}")
             raise
 
-    def _calculate_moving_averages(self, df: pd.DataFrame) -> Dict[str, float]:
-        """이동평균선 계산 (talib 제거, pandas 사용)"""
-        close_prices = df['close']
-        ma_periods = [5, 20, 50, 200]
-        mas = {}
-
-        for period in ma_periods:
-            sma_series = close_prices.rolling(window=period).mean()
-            ema_series = close_prices.ewm(span=period, adjust=False).mean()
-            mas[f'ma_{period}'] = float(sma_series.iloc[-1])
-            mas[f'ema_{period}'] = float(ema_series.iloc[-1])
-
-        # 골든/데드 크로스 확인
-        mas['golden_cross'] = mas['ma_5'] > mas['ma_20'] and mas['ma_20'] > mas['ma_50']
-        mas['death_cross'] = mas['ma_5'] < mas['ma_20'] and mas['ma_20'] < mas['ma_50']
-
-        return mas
-
-    def _calculate_rsi(self, df: pd.DataFrame, period: int = 14) -> Dict[str, float]:
-        """RSI 계산 (talib 제거, pandas 사용)"""
-        close_prices = df['close']
-        delta = close_prices.diff()
-
-        # 상승폭과 하락폭 분리
-        gain = delta.where(delta > 0, 0.0)
-        loss = -delta.where(delta < 0, 0.0)
-
-        # 지수이동평균(EMA)로 평균 상승폭, 평균 하락폭 계산
-        avg_gain = gain.ewm(com=period - 1, min_periods=period).mean()
-        avg_loss = loss.ewm(com=period - 1, min_periods=period).mean()
-
-        rs = avg_gain / avg_loss
-        rsi_series = 100 - (100 / (1 + rs))
-        rsi_current = float(rsi_series.iloc[-1])
-
-        # RSI 다이버전스 확인(간단 버전)
-        recent_close_diff = np.diff(close_prices.iloc[-5:].values).mean()
-        recent_rsi_diff = np.diff(rsi_series.iloc[-5:].values).mean()
-
-        divergence = 'none'
-        if recent_close_diff < 0 and recent_rsi_diff > 0:
-            divergence = 'bullish'
-        elif recent_close_diff > 0 and recent_rsi_diff < 0:
-            divergence = 'bearish'
-
-        return {
-            'current': rsi_current,
-            'divergence': divergence
-        }
-
-    def _calculate_macd(self, df: pd.DataFrame) -> Dict[str, float]:
-        """MACD 계산 (talib 제거, pandas 사용)"""
-        close_prices = df['close']
-        ema12 = close_prices.ewm(span=12, adjust=False).mean()
-        ema26 = close_prices.ewm(span=26, adjust=False).mean()
-        macd_line = ema12 - ema26
-        signal_line = macd_line.ewm(span=9, adjust=False).mean()
-        histogram = macd_line - signal_line
-
-        # 교차 확인
-        # 직전 값과 비교가 필요하므로 인덱스 에러를 피하기 위해 조건 처리
-        if len(macd_line) < 2:
-            cross_above = False
-            cross_below = False
-        else:
-            cross_above = (macd_line.iloc[-1] > signal_line.iloc[-1]) and (macd_line.iloc[-2] <= signal_line.iloc[-2])
-            cross_below = (macd_line.iloc[-1] < signal_line.iloc[-1]) and (macd_line.iloc[-2] >= signal_line.iloc[-2])
-
-        return {
-            'macd': float(macd_line.iloc[-1]),
-            'signal': float(signal_line.iloc[-1]),
-            'histogram': float(histogram.iloc[-1]),
-            'cross_above': cross_above,
-            'cross_below': cross_below
-        }
-
-    def _calculate_bollinger(self, df: pd.DataFrame, period: int = 20) -> Dict[str, float]:
-        """볼린저 밴드 계산 (talib 제거, pandas 사용)"""
-        close_prices = df['close']
-        rolling_mean = close_prices.rolling(window=period).mean()
-        rolling_std = close_prices.rolling(window=period).std()
-
-        upper = rolling_mean + 2 * rolling_std
-        middle = rolling_mean
-        lower = rolling_mean - 2 * rolling_std
-
-        current_price = close_prices.iloc[-1]
-        upper_val = float(upper.iloc[-1])
-        middle_val = float(middle.iloc[-1])
-        lower_val = float(lower.iloc[-1])
-
-        # 밴드폭, 현재 가격 위치
-        if middle_val != 0:
-            bandwidth = (upper_val - lower_val) / middle_val
-        else:
-            bandwidth = 0.0
-
-        if (upper_val - lower_val) != 0:
-            position = (current_price - lower_val) / (upper_val - lower_val)
-        else:
-            position = 0.0
-
-        return {
-            'upper': upper_val,
-            'middle': middle_val,
-            'lower': lower_val,
-            'bandwidth': bandwidth,
-            'position': position
-        }
-
-    def _calculate_atr(self, df: pd.DataFrame, period: int = 14) -> float:
-        """ATR 계산 (talib 제거, pandas 사용, 기본적으로 Wilder’s Moving Average 가정)"""
-        high = df['high']
-        low = df['low']
-        close = df['close']
-
-        # TR 계산
-        df_atr = df.copy()
-        df_atr['prev_close'] = df_atr['close'].shift(1)
-        df_atr['tr1'] = abs(df_atr['high'] - df_atr['low'])
-        df_atr['tr2'] = abs(df_atr['high'] - df_atr['prev_close'])
-        df_atr['tr3'] = abs(df_atr['low'] - df_atr['prev_close'])
-        df_atr['TR'] = df_atr[['tr1', 'tr2', 'tr3']].max(axis=1)
-
-        # ATR = TR의 지수이동평균(기본적으로 Welles Wilder는 특수 계산, 여기서는 ewm으로 대체)
-        df_atr['ATR'] = df_atr['TR'].ewm(span=period, adjust=False).mean()
-
-        return float(df_atr['ATR'].iloc[-1])
-
-    def _calculate_adx(self, df: pd.DataFrame, period: int = 14) -> Dict[str, float]:
-        """ADX 계산 (talib 제거, pandas 사용, 기본 로직 구현)"""
-        # ADX 는 +DI, -DI, DX 를 거쳐 계산됨
-        df_adx = df.copy()
-        df_adx['prev_close'] = df_adx['close'].shift(1)
-        df_adx['prev_high'] = df_adx['high'].shift(1)
-        df_adx['prev_low'] = df_adx['low'].shift(1)
-
-        # DM+
-        df_adx['+DM'] = np.where(
-            (df_adx['high'] - df_adx['prev_high']) > (df_adx['prev_low'] - df_adx['low']),
-            np.maximum(df_adx['high'] - df_adx['prev_high'], 0),
-            0
-        )
-        # DM-
-        df_adx['-DM'] = np.where(
-            (df_adx['prev_low'] - df_adx['low']) > (df_adx['high'] - df_adx['prev_high']),
-            np.maximum(df_adx['prev_low'] - df_adx['low'], 0),
-            0
-        )
-        # TR
-        df_adx['TR1'] = df_adx['high'] - df_adx['low']
-        df_adx['TR2'] = abs(df_adx['high'] - df_adx['prev_close'])
-        df_adx['TR3'] = abs(df_adx['low'] - df_adx['prev_close'])
-        df_adx['TR'] = df_adx[['TR1', 'TR2', 'TR3']].max(axis=1)
-
-        # smoothed TR, +DM, -DM (지수이동평균 사용)
-        df_adx['TR_ewm'] = df_adx['TR'].ewm(span=period, adjust=False).mean()
-        df_adx['+DM_ewm'] = df_adx['+DM'].ewm(span=period, adjust=False).mean()
-        df_adx['-DM_ewm'] = df_adx['-DM'].ewm(span=period, adjust=False).mean()
-
-        df_adx['+DI'] = 100 * (df_adx['+DM_ewm'] / df_adx['TR_ewm'])
-        df_adx['-DI'] = 100 * (df_adx['-DM_ewm'] / df_adx['TR_ewm'])
-
-        df_adx['DX'] = 100 * abs(df_adx['+DI'] - df_adx['-DI']) / (df_adx['+DI'] + df_adx['-DI'])
-        df_adx['ADX'] = df_adx['DX'].ewm(span=period, adjust=False).mean()
-
-        adx_value = float(df_adx['ADX'].iloc[-1])
-
-        if adx_value > 25:
-            trend_strength = 'strong'
-        elif adx_value < 20:
-            trend_strength = 'weak'
-        else:
-            trend_strength = 'moderate'
-
-        return {
-            'adx': adx_value,
-            'trend_strength': trend_strength
-        }
-
-    def _analyze_volume_trend(self, df: pd.DataFrame) -> Dict[str, float]:
-        """거래량 트렌드 분석 (talib 제거, pandas 사용)"""
-        volume = df['volume']
-        vol_sma = volume.rolling(window=20).mean()
-        current_vol = float(volume.iloc[-1])
-        vol_sma_current = float(vol_sma.iloc[-1])
-
-        return {
-            'current_volume': current_vol,
-            'volume_sma': vol_sma_current,
-            'volume_trend': 'increasing' if current_vol > vol_sma_current else 'decreasing'
-        }
-
-    def _calculate_obv(self, df: pd.DataFrame) -> Dict[str, float]:
-        """OBV(On Balance Volume) 계산 (talib 제거, pandas 사용)"""
-        # OBV는 close가 전 봉보다 상승하면 거래량을 더하고, 하락하면 거래량을 빼고, 동일하면 변화 없음
-        obv_series = [0]
-        close = df['close'].values
-        volume = df['volume'].values
-
-        for i in range(1, len(close)):
-            if close[i] > close[i - 1]:
-                obv_series.append(obv_series[-1] + volume[i])
-            elif close[i] < close[i - 1]:
-                obv_series.append(obv_series[-1] - volume[i])
-            else:
-                obv_series.append(obv_series[-1])
-
-        df_obv = pd.Series(obv_series, index=df.index)
-        obv_sma = df_obv.rolling(window=20).mean()
-
-        current_obv = float(df_obv.iloc[-1])
-        sma_obv = float(obv_sma.iloc[-1]) if not np.isnan(obv_sma.iloc[-1]) else 0.0
-
-        trend = 'bullish' if current_obv > sma_obv else 'bearish'
-
-        return {
-            'current': current_obv,
-            'sma': sma_obv,
-            'trend': trend
-        }
-
-    def _get_open_interest(self, symbol: str) -> float:
-        """오픈 인터레스트 조회"""
-        try:
-            # 바이비트의 선물 오픈 인터레스트 데이터 조회
-            oi_data = self.exchange.fetch_open_interest(symbol)
-            if isinstance(oi_data, dict) and 'info' in oi_data:
-                return float(oi_data['info'].get('openInterest', 0))
-            return 0.0
-        except Exception as e:
-            logger.error(f"Open interest fetch error: {str(e)}")
-            return 0.0
-
-    def _get_funding_rate(self, symbol: str) -> float:
-        """펀딩비 조회"""
-        try:
-            funding_data = self.exchange.fetch_funding_rate(symbol)
-            if isinstance(funding_data, dict) and 'info' in funding_data:
-                return float(funding_data['info'].get('fundingRate', 0))
-            return 0.0
-        except Exception as e:
-            logger.error(f"Funding rate fetch error: {str(e)}")
-            return 0.0
-
-    def _get_oi_change(self, symbol: str) -> float:
-        """오픈 인터레스트 변화율 계산"""
-        try:
-            # 현재 OI 조회
-            current_oi = self._get_open_interest(symbol)
-
-            # 24시간 전 데이터 조회
-            yesterday = int((datetime.now() - timedelta(days=1)).timestamp() * 1000)
-            history = self.exchange.fetch_open_interest_history(symbol, since=yesterday, limit=1)
-
-            if history and len(history) > 0 and 'info' in history[0]:
-                yesterday_oi = float(history[0]['info'].get('openInterest', 0))
-                if yesterday_oi > 0:
-                    return ((current_oi - yesterday_oi) / yesterday_oi) * 100
-            return 0.0
-        except Exception as e:
-            logger.error(f"OI change calculation error: {str(e)}")
-            return 0.0
-
     def _format_for_llm(self, analysis_result: Dict) -> str:
         """분석 결과를 보기 좋게 포맷팅"""
         def format_patterns(patterns_list):
-            return ', '.join(f"{p['pattern']}({p['confidence']:.1f}%)" for p in patterns_list)
+            if not patterns_list:
+                return '없음'
+            return ', '.join(
+                f"{p['pattern']}({p['confidence']:.1f}%, {'현재 봉' if p['bars_ago'] == 0 else str(p['bars_ago']) + '봉 전'})"
+                for p in patterns_list
+            )
+
+        def fmt(value, spec):
+            return 'N/A' if value is None or np.isnan(value) else format(value, spec)
+
+        def format_multi_timeframe(summary):
+            return '\n'.join(
+                f"- {tf} ({s['bars']}봉): 추세 {s['trend']}, 종가 {fmt(s['close'], '.2f')}, "
+                f"RSI {fmt(s['rsi'], '.1f')}, MACD 히스토그램 {fmt(s['macd_hist'], '+.2f')}, "
+                f"볼린저 위치 {fmt(s['bb_position'], '.0%')}, ADX {fmt(s['adx'], '.1f')}"
+                for tf, s in summary.items()
+            )
 
         template = f"""
 시장 분석 리포트 - {analysis_result['symbol']}
 시간: {analysis_result['timestamp']}
 
 1. 최근 50봉 가격정보:
-{json.dumps(analysis_result['price_history'], indent=2, ensure_ascii=False)}
+{encode_price_history(analysis_result['price_history'], self.price_history_format, self.price_decimals)}
 
 2. 기술적 지표:
 이동평균선:
@@ -333,6 +103,7 @@ MACD:
 
 ATR: {analysis_result['indicators']['atr']:.2f}
 ADX: {analysis_result['indicators']['adx']['adx']:.2f} ({analysis_result['indicators']['adx']['trend_strength']})
+캔들 패턴 (최근 3봉): {format_patterns(analysis_result.get('patterns', []))}
 
 3. 거래량 분석:
 - 현재 거래량: {analysis_result['volume']['volume_trend']['current_volume']:.2f}
@@ -343,56 +114,214 @@ ADX: {analysis_result['indicators']['adx']['adx']:.2f} ({analysis_result['indica
 4. 파생상품 데이터:
 - 오픈 인터레스트: {analysis_result['derivatives']['open_interest']:.2f}
 - 펀딩비: {analysis_result['derivatives']['funding_rate']:.4%}
-- OI 변화율: {analysis_result['derivatives']['oi_change']:.2f}%
+- OI 변화율: 24시간 {analysis_result['derivatives']['oi_change']:.2f}% (1시간 {analysis_result['derivatives']['oi_change_1h']:.2f}%, 4시간 {analysis_result['derivatives']['oi_change_4h']:.2f}%)
+"""
+        if analysis_result.get('multi_timeframe'):
+            template += f"""
+5. 멀티 타임프레임 요약:
+{format_multi_timeframe(analysis_result['multi_timeframe'])}
 """
+        logger.info(f"리포트 추정 토큰 수: {section_token_counts(template)}")
         return template
 
     def get_technical_indicators(self, df: pd.DataFrame) -> Dict[str, float]:
-        """기술적 지표 계산"""
-        indicators = {
-            'ma': self._calculate_moving_averages(df),
-            'rsi': self._calculate_rsi(df),
-            'macd': self._calculate_macd(df),
-            'bollinger': self._calculate_bollinger(df),
-            'atr': self._calculate_atr(df),
-            'adx': self._calculate_adx(df)
-        }
-        return indicators
+        """기술적 지표 계산 (OHLCV 배열을 한 번만 읽는 통합 커널 사용)"""
+        close = df['close'].to_numpy(dtype=float)
+        series = kernel.compute_indicator_series(
+            df['high'].to_numpy(dtype=float), df['low'].to_numpy(dtype=float), close,
+            tail=kernel.SUMMARY_TAIL
+        )
+        return kernel.summarize_indicators(series, close)
 
     def get_volume_analysis(self, df: pd.DataFrame) -> Dict[str, dict]:
         """거래량 분석"""
-        volume_data = {
-            'volume_trend': self._analyze_volume_trend(df),
-            'obv': self._calculate_obv(df)
-        }
-        return volume_data
+        volume = df['volume'].to_numpy(dtype=float)
+        series = kernel.compute_volume_series(df['close'].to_numpy(dtype=float), volume)
+        return kernel.summarize_volume(series, volume)
+
+    def _get_indicator_engine(self, symbol: str, timeframe: str, window: Dict[str, np.ndarray]) -> IncrementalIndicatorEngine:
+        """지표 엔진을 window(열별 배열, timestamp 는 ms) 의 마지막 확정봉까지 갱신 (새로 들어온 봉만 반영)"""
+        key = (symbol, timeframe)
+        engine = self.indicator_engines.get(key)
+        timestamps = window['timestamp']
+
+        # 엔진이 없거나 마지막으로 반영한 봉이 현재 구간에 없으면 (장기간 중단 등) 재구성
+        if engine is None or engine.last_timestamp is None or not (timestamps == engine.last_timestamp).any():
+            engine = IncrementalIndicatorEngine()
+            engine.warm_up(window)
+            self.indicator_engines[key] = engine
+            return engine
+
+        start = int(np.searchsorted(timestamps, engine.last_timestamp, side='right'))
+        engine.warm_up({name: values[start:] for name, values in window.items()})
+        return engine
+
+    def get_candle_patterns(self, df, lookback: int = 3, min_confidence: float = 55.0) -> List[Dict]:
+        """최근 봉들에서 탐지된 캔들 패턴 (신뢰도 포함, df 는 DataFrame 또는 열별 배열)"""
+        patterns = detect_patterns(
+            np.asarray(df['open'], dtype=float),
+            np.asarray(df['high'], dtype=float),
+            np.asarray(df['low'], dtype=float),
+            np.asarray(df['close'], dtype=float)
+        )
+        return recent_patterns(patterns, lookback=lookback, min_confidence=min_confidence)
+
+    def get_multi_timeframe_summary(self, df, base_timeframe: str,
+                                    timeframes=MTF_TIMEFRAMES) -> Dict[str, Dict]:
+        """기준 캔들(DataFrame 또는 열별 배열)에서 상위 타임프레임을 만들어 타임프레임별 핵심 지표 요약"""
+        summary = {}
+        for timeframe, tf_df in resample_many(df, base_timeframe, timeframes).items():
+            if len(tf_df) == 0:
+                continue
+            close = tf_df['close'].to_numpy(dtype=float)
+            series = kernel.compute_indicator_series(
+                tf_df['high'].to_numpy(dtype=float), tf_df['low'].to_numpy(dtype=float), close,
+                ma_periods=(20, 50), tail=1
+            )
+            ema_fast, ema_slow = series['ema_20'][-1], series['ema_50'][-1]
+            if len(tf_df) < 50:
+                trend = '판단불가'
+            elif ema_fast > ema_slow and close[-1] > ema_fast:
+                trend = '상승'
+            elif ema_fast < ema_slow and close[-1] < ema_fast:
+                trend = '하락'
+            else:
+                trend = '횡보'
+            band = series['bb_upper'][-1] - series['bb_lower'][-1]
+            summary[timeframe] = {
+                'bars': len(tf_df),
+                'close': float(close[-1]),
+                'trend': trend,
+                'rsi': float(series['rsi'][-1]),
+                'macd_hist': float(series['macd_hist'][-1]),
+                'bb_position': float((close[-1] - series['bb_lower'][-1]) / band) if band else float('nan'),
+                'adx': float(series['adx'][-1])
+            }
+        return summary
+
+    def _base_history_limit(self, timeframe: str, limit: int, higher_timeframes) -> int:
+        """상위 타임프레임별로 MTF_MIN_BARS 개를 만들 수 있을 만큼의 기준 봉 수"""
+        ratios = [
+            timeframe_to_ms(tf) // timeframe_to_ms(timeframe)
+            for tf in higher_timeframes if can_resample(timeframe, tf)
+        ]
+        return max([limit] + [ratio * MTF_MIN_BARS for ratio in ratios])
 
     def get_derivatives_data(self, symbol: str) -> Dict[str, float]:
-        """파생상품 데이터 수집"""
-        derivatives = {
-            'open_interest': self._get_open_interest(symbol),
-            'funding_rate': self._get_funding_rate(symbol),
-            'oi_change': self._get_oi_change(symbol)
+        """파생상품 데이터 수집 (OI/히스토리 1회씩 조회, 펀딩비는 다음 펀딩 시각까지 캐시)"""
+        return self.derivatives_cache.get_snapshot(symbol).to_dict()
+
+    def collect_market_data(self, symbols: List[str], timeframes: Sequence[str] = ('1h',),
+                            limit: int = 500, as_frames: bool = True) -> Dict[str, Dict]:
+        """여러 심볼/타임프레임의 캔들과 파생상품 데이터를 병렬 수집
+
+        Args:
+            as_frames: False 면 캔들은 저장소 캐시만 갱신하고 DataFrame 대신 보관 중인 봉 수를 담음
+                       (리포트는 read_window 로 캐시를 직접 읽으므로 매 사이클 DataFrame 을 만들지 않음)
+
+        Returns:
+            {symbol: {'candles': {timeframe: DataFrame 또는 봉 수}, 'derivatives': dict, 'errors': [str]}}
+        """
+        # 마켓 정보는 한 번만 로드하고 작업 스레드들이 공유
+        if not self.exchange.markets:
+            self.rate_limiter.acquire()
+            self.exchange.load_markets()
+
+        results = {
+            symbol: {'candles': {}, 'derivatives': None, 'errors': []}
+            for symbol in symbols
         }
-        return derivatives
-
-    def prepare_llm_input(self, symbol: str, timeframe: str = '1h') -> str:
-        """LLM 입력용 데이터 준비"""
-        df = self._get_historical_data(symbol, timeframe=timeframe)
+        fetch_candles = self._get_historical_data if as_frames else self.candle_store.refresh
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            candle_futures = {
+                (symbol, timeframe): pool.submit(fetch_candles, symbol, timeframe, limit)
+                for symbol in symbols for timeframe in timeframes
+            }
+            derivative_futures = {
+                symbol: pool.submit(self.get_derivatives_data, symbol)
+                for symbol in symbols
+            }
 
-        # 최근 50봉 가격정보를 JSON 형식으로 변환
-        recent_candles = df.tail(50).copy()
-        recent_candles['timestamp'] = recent_candles['timestamp'].dt.strftime('%Y-%m-%d %H:%M:%S')
-        price_history = recent_candles.to_dict('records')
+            for (symbol, timeframe), future in candle_futures.items():
+                try:
+                    results[symbol]['candles'][timeframe] = future.result()
+                except Exception as e:
+                    results[symbol]['errors'].append(f"{timeframe} candles: {e}")
+            for symbol, future in derivative_futures.items():
+                try:
+                    results[symbol]['derivatives'] = future.result()
+                except Exception as e:
+                    results[symbol]['errors'].append(f"derivatives: {e}")
+
+        for symbol, result in results.items():
+            if result['errors']:
+                logger.error(f"{symbol} 데이터 수집 실패: {result['errors']}")
+        return results
+
+    @staticmethod
+    def _price_history(window: Dict[str, np.ndarray], bars: int = 50) -> List[Dict]:
+        """최근 bars 봉 가격정보 레코드 (timestamp 는 'YYYY-MM-DD HH:MM:SS')"""
+        stamps = np.asarray(window['timestamp'][-bars:], dtype='datetime64[ms]').astype('datetime64[s]').astype(str)
+        columns = {name: window[name][-bars:].tolist() for name in ('open', 'high', 'low', 'close', 'volume')}
+        return [
+            {'timestamp': stamp.replace('T', ' '), **{name: values[i] for name, values in columns.items()}}
+            for i, stamp in enumerate(stamps)
+        ]
+
+    def _build_report(self, symbol: str, timeframe: str, limit: int, derivatives: Dict,
+                      higher_timeframes=MTF_TIMEFRAMES) -> str:
+        """저장소의 캔들 구간과 수집된 파생상품 데이터로 LLM 입력용 리포트 생성
+
+        캔들은 DataFrame 으로 만들지 않고 링 버퍼의 열별 뷰를 읽는다. 뷰를 읽는 동안은 키 잠금을 잡고 있고,
+        블록 밖에서 쓰는 값(가격 이력, 저널용 구간)만 복사한다.
+        """
+        with self.candle_store.read_window(symbol, timeframe, limit) as window:
+            if len(window['timestamp']) == 0:
+                raise RuntimeError(f"{symbol} {timeframe} 캔들 없음")
+            multi_timeframe = self.get_multi_timeframe_summary(window, timeframe, higher_timeframes)
+            # 지표 계산은 기존과 같이 최근 500봉 기준 (상위 타임프레임용으로 더 길게 받은 앞부분 제외)
+            window = {name: values[-500:] for name, values in window.items()}
+            engine = self._get_indicator_engine(symbol, timeframe, window)
+            # 저널용으로 결정에 쓴 구간을 복사해 보관
+            self.latest_windows[symbol] = {name: np.array(values) for name, values in window.items()}
+            price_history = self._price_history(window)
+            patterns = self.get_candle_patterns(window)
+            close = float(window['close'][-1])
 
         analysis_result = {
             'timestamp': datetime.now().isoformat(),
             'symbol': symbol,
             'timeframe': timeframe,
             'price_history': price_history,
-            'indicators': self.get_technical_indicators(df),
-            'volume': self.get_volume_analysis(df),
-            'derivatives': self.get_derivatives_data(symbol)
+            'indicators': engine.get_technical_indicators(),
+            'volume': engine.get_volume_analysis(),
+            'derivatives': derivatives,
+            'multi_timeframe': multi_timeframe,
+            'patterns': patterns
+        }
+        self.latest_metrics[symbol] = {
+            'close': close,
+            **{k: v for k, v in analysis_result.items() if k != 'price_history'}
         }
 
         return self._format_for_llm(analysis_result)
+
+    def prepare_llm_inputs(self, symbols: List[str], timeframe: str = '1h',
+                           higher_timeframes=MTF_TIMEFRAMES) -> Dict[str, str]:
+        """여러 심볼의 LLM 입력용 데이터를 병렬 수집 후 준비 (실패한 심볼은 제외)"""
+        limit = self._base_history_limit(timeframe, 500, higher_timeframes)
+        collected = self.collect_market_data(symbols, timeframes=[timeframe], limit=limit, as_frames=False)
+        reports = {}
+        for symbol, result in collected.items():
+            if not result['candles'].get(timeframe) or result['derivatives'] is None:
+                continue
+            reports[symbol] = self._build_report(symbol, timeframe, limit, result['derivatives'], higher_timeframes)
+        return reports
+
+    def prepare_llm_input(self, symbol: str, timeframe: str = '1h', higher_timeframes=MTF_TIMEFRAMES) -> str:
+        """LLM 입력용 데이터 준비 (캔들과 파생상품 데이터를 동시에 조회)"""
+        limit = self._base_history_limit(timeframe, 500, higher_timeframes)
+        result = self.collect_market_data([symbol], timeframes=[timeframe], limit=limit, as_frames=False)[symbol]
+        if not result['candles'].get(timeframe) or result['derivatives'] is None:
+            raise RuntimeError(f"{symbol} 데이터 수집 실패: {result['errors']}")
+        return self._build_report(symbol, timeframe, limit, result['derivatives'], higher_timeframes)
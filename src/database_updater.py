@@ -1,10 +1,14 @@
 from datetime import datetime
-from models import Session, Trade, TradingLog
+from typing import Dict, Optional
+from models import Session, Trade, TradingLog, DecisionLog
+import json
 import logging
+from metrics import DB_WRITE_SECONDS
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@DB_WRITE_SECONDS.timed(operation='log_message')
 def log_message(log_type: str, message: str, position_type: str = None, profit_loss: float = None, decision_reason: str = None, **kwargs):
     """거래 로그 기록"""
     session = Session()
@@ -29,6 +33,7 @@ def log_message(log_type: str, message: str, position_type: str = None, profit_l
     finally:
         session.close()
 
+@DB_WRITE_SECONDS.timed(operation='update_trade')
 def update_trade(symbol: str, current_price: float):
     """거래 업데이트"""
     session = Session()
@@ -49,10 +54,11 @@ def update_trade(symbol: str, current_price: float):
     finally:
         session.close()
 
+@DB_WRITE_SECONDS.timed(operation='log_trade')
 def log_trade(symbol: str, position_type: str, leverage: int, 
               investment_ratio: float, entry_price: float, 
-              decision_reason: str = None):
-    """거래 기록"""
+              decision_reason: str = None) -> Optional[int]:
+    """거래 기록 (새 포지션을 기록했으면 거래 id 반환)"""
     session = Session()
     try:
         # CLOSE 포지션인 경우 이전 포지션 처리
@@ -121,10 +127,32 @@ def log_trade(symbol: str, position_type: str, leverage: int,
                         f"새로운 포지션 진입: {symbol}, {position_type}, 진입가: {entry_price}", 
                         position_type=position_type,
                         decision_reason=decision_reason)
+            return trade.id
             
     except Exception as e:
         logger.error(f"거래 기록 중 오류 발생: {e}")
         log_message("Error", f"거래 기록 실패: {str(e)}")
         session.rollback()
     finally:
-        session.close()
\ No newline at end of file
+        session.close()
+
+@DB_WRITE_SECONDS.timed(operation='log_decision')
+def log_decision(symbol: str, source: str, position_type: str, details: Dict = None,
+                 trade_id: Optional[int] = None):
+    """결정 출처와 부가 정보(앙상블 합의율 등) 기록"""
+    session = Session()
+    try:
+        session.add(DecisionLog(
+            timestamp=datetime.now(),
+            symbol=symbol,
+            trade_id=trade_id,
+            source=source,
+            position_type=position_type,
+            details=json.dumps(details or {}, ensure_ascii=False, default=str)
+        ))
+        session.commit()
+    except Exception as e:
+        logger.error(f"결정 기록 중 오류 발생: {e}")
+        session.rollback()
+    finally:
+        session.close()
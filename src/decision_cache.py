@@ -0,0 +1,223 @@
+"""LLM 트레이딩 결정 캐시
+
+포지션 상태, 지표, 심리/거시 수치를 구간 단위로 양자화한 특징 벡터의 해시를 키로
+직전 LLM 결정과 근거를 보관한다. 시장 상태가 같은 구간에 머무는 동안에는 LLM 을 다시
+호출하지 않고 저장된 결정을 돌려준다. TTL 과 LRU 개수 제한이 있고, 디스크(JSON)에
+저장해 재시작 후에도 유지된다.
+"""
+
+from typing import Dict, Optional, Tuple
+from collections import OrderedDict
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CACHE_PATH = os.path.join(os.getenv('EXCHANGE_CACHE_DIR', '.cache'), 'decision_cache.json')
+DEFAULT_TTL = 60 * 60  # 초 (1시간봉 한 사이클)
+DEFAULT_MAX_ENTRIES = 256
+
+# 특징별 양자화 간격 (이 폭 안의 변화는 같은 시장 상태로 간주)
+FEATURE_STEPS = {
+    'rsi': 5.0,
+    'bb_position': 0.1,
+    'adx': 5.0,
+    'macd_hist_atr': 0.1,  # MACD 히스토그램 / ATR
+    'close_vs_ma': 0.5,  # 이동평균 대비 종가 괴리율 (%)
+    'funding_rate': 0.0001,
+    'oi_change': 0.5,  # 미결제약정 변화율 (%)
+    'roe': 2.0,  # 포지션 수익률 (%)
+    'fear_greed': 5.0,
+    'btc_dominance': 0.5,
+    'fundamental_dxy': 0.5,  # ICE 달러 인덱스 (DX-Y.NYB)
+    'fundamental_interest_rate': 0.1,  # 미국 10년물 금리 (^TNX, %), 매일 움직이므로 기준금리보다 촘촘하게
+    'external_dxy': 0.5,  # 광의 달러 인덱스 (FRED DTWEXBGS)
+    'external_interest_rate': 0.25,  # 연방기금 실효금리 (FRED DFF, %), 0.25%p 단위로 변경
+    'sp500': 50.0,
+    'news_balance': 2.0,
+}
+
+
+def quantize(value, step: float) -> Optional[float]:
+    """step 간격 구간의 대표값 (값이 없거나 NaN 이면 None)"""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    if math.isnan(value) or math.isinf(value):
+        return None
+    return round(round(value / step) * step, 10)
+
+
+def _significant(value, digits: int = 2) -> Optional[float]:
+    """유효숫자 digits 자리로 반올림 (잔고처럼 크기가 제각각인 값)"""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    if value == 0 or math.isnan(value):
+        return 0.0
+    return round(value, digits - 1 - int(math.floor(math.log10(abs(value)))))
+
+
+def build_features(account: Dict, technical: Dict, sentiment: Dict, macro: Dict,
+                   steps: Dict[str, float] = FEATURE_STEPS) -> Dict:
+    """분석기들의 최신 수치로 정규화/양자화된 특징 벡터 생성
+
+    account: WalletPositionTracker.latest_status, technical: MarketDataCollector.latest_metrics[symbol],
+    sentiment: SentimentAnalyzer.latest_metrics, macro: FundamentalAnalyzer/ExternalAnalyzer.latest_metrics 병합
+    """
+    position = account.get('position', {})
+    wallet = account.get('wallet', {})
+    indicators = technical.get('indicators', {})
+    volume = technical.get('volume', {})
+    derivatives = technical.get('derivatives', {})
+    ma = indicators.get('ma', {})
+    macd = indicators.get('macd', {})
+    close = technical.get('close')
+
+    def vs_ma(period):
+        ma_value = ma.get(f'ma_{period}')
+        if not close or not ma_value:
+            return None
+        return quantize((close / ma_value - 1) * 100, steps['close_vs_ma'])
+
+    # MACD 히스토그램은 가격 단위이므로 ATR 로 나눠 가격 수준과 무관하게 비교
+    atr = indicators.get('atr')
+    macd_hist = macd.get('histogram')
+    macd_hist_atr = macd_hist / atr if atr and macd_hist is not None else None
+    features = {
+        'symbol': technical.get('symbol'),
+        'timeframe': technical.get('timeframe'),
+        'position': {
+            'side': position.get('position_side', 'none') if position.get('has_position') else 'none',
+            'leverage': quantize(position.get('leverage'), 1.0) if position.get('has_position') else 0.0,
+            'roe': quantize(position.get('roe'), steps['roe']) if position.get('has_position') else 0.0,
+            'equity': _significant(wallet.get('total_equity')),
+        },
+        'technical': {
+            'close_vs_ma': {str(p): vs_ma(p) for p in (20, 50, 200)},
+            'golden_cross': bool(ma.get('golden_cross')),
+            'death_cross': bool(ma.get('death_cross')),
+            'rsi': quantize(indicators.get('rsi', {}).get('current'), steps['rsi']),
+            'rsi_divergence': indicators.get('rsi', {}).get('divergence'),
+            'macd_hist_atr': quantize(macd_hist_atr, steps['macd_hist_atr']),
+            'macd_cross': 'above' if macd.get('cross_above') else 'below' if macd.get('cross_below') else None,
+            'bb_position': quantize(indicators.get('bollinger', {}).get('position'), steps['bb_position']),
+            'adx': quantize(indicators.get('adx', {}).get('adx'), steps['adx']),
+            'volume_trend': volume.get('volume_trend', {}).get('volume_trend'),
+            'obv_trend': volume.get('obv', {}).get('trend'),
+            'patterns': sorted(p['name'] for p in technical.get('patterns', []) if p.get('bars_ago') == 0),
+        },
+        'derivatives': {
+            'funding_rate': quantize(derivatives.get('funding_rate'), steps['funding_rate']),
+            'oi_change_1h': quantize(derivatives.get('oi_change_1h'), steps['oi_change']),
+            'oi_change_24h': quantize(derivatives.get('oi_change_24h'), steps['oi_change']),
+        },
+        'sentiment': {k: quantize(v, steps[k]) for k, v in sorted(sentiment.items()) if k in steps},
+        'macro': {k: quantize(v, steps[k]) for k, v in sorted(macro.items()) if k in steps},
+    }
+    return features
+
+
+def feature_key(features: Dict) -> str:
+    """특징 벡터의 내용 해시 (키 순서와 무관)"""
+    encoded = json.dumps(features, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class DecisionCache:
+    """특징 해시 -> (결정, 근거) 캐시 (TTL + LRU, JSON 파일에 저장)"""
+
+    def __init__(self, path: Optional[str] = CACHE_PATH, ttl: float = DEFAULT_TTL,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0, 'saved_seconds': 0.0}
+        self._load()
+
+    def _load(self):
+        if not self.path:
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        # 파일에는 오래된 것부터 저장되어 있으므로 그대로 넣으면 LRU 순서 유지
+        for key, entry in entries.items():
+            if now - entry.get('stored_at', 0) <= self.ttl:
+                self._entries[key] = entry
+        logger.info(f"결정 캐시 로드: {len(self._entries)}개")
+
+    def _save(self):
+        """임시 파일에 쓴 뒤 교체 (_lock 을 잡은 상태에서 호출)"""
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"결정 캐시 저장 실패: {e}")
+
+    def get(self, features: Dict) -> Optional[Tuple[Dict, str]]:
+        """같은 특징의 유효한 결정이 있으면 (결정 사본, 근거) 반환"""
+        key = feature_key(features)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry['stored_at'] > self.ttl:
+                del self._entries[key]
+                self._stats['expired'] += 1
+                entry = None
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            self._stats['saved_seconds'] += entry.get('latency', 0.0)
+            return dict(entry['decision']), entry['response']
+
+    def put(self, features: Dict, decision: Dict, response: str, latency: float = 0.0):
+        """LLM 결정 저장 (latency 는 적중 시 절약한 시간 집계에 사용)"""
+        key = feature_key(features)
+        with self._lock:
+            self._entries[key] = {
+                'stored_at': time.time(),
+                'decision': dict(decision),
+                'response': response,
+                'latency': latency
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+            self._save()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._save()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, float]:
+        """적중/실패 횟수, 적중률, 적중으로 절약한 LLM 호출 시간(초)"""
+        with self._lock:
+            stats = dict(self._stats, entries=len(self._entries))
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,141 @@
+"""결정 캐스케이드: 행동이 필요한 상태만 전체 LLM 조언으로 올려보냄
+
+1단계는 특징 벡터(decision_cache.build_features)에 대한 로컬 점수로, 조용한 상태는
+바로 HOLD 로 끝내고 뚜렷한 신호는 전체 프롬프트로 올린다. 점수가 애매한 구간은
+짧은 출력만 요청하는 저렴한 모델(선택)에게 한 번 더 묻는다.
+"""
+
+from typing import Dict, List, Optional, Tuple
+import json
+import re
+import logging
+from llm_backends import LLMBackend
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TRIAGE_MODEL = 'gemini-1.5-flash-8b'
+
+# 점수 기준 (양자화된 특징 단위와 같음)
+DEFAULT_THRESHOLDS = {
+    'rsi_high': 70.0,
+    'rsi_low': 30.0,
+    'adx': 25.0,
+    'macd_hist_atr': 0.3,
+    'ma_gap': 2.0,  # 20MA 대비 괴리율 (%)
+    'funding_rate': 0.0005,
+    'roe_take': 10.0,  # 포지션 수익률 (%)
+    'roe_stop': -5.0,
+    'hold_score': 0.5,  # 이보다 낮으면 HOLD 로 종료
+    'escalate_score': 1.0,  # 이 이상이면 전체 조언으로
+}
+
+# 단독으로는 방향성이 약한 패턴
+NEUTRAL_PATTERNS = ('doji', 'inside_bar')
+
+TRIAGE_PROMPT = """암호화폐 선물 1시간봉 추세추종 트레이더의 1차 판별입니다.
+아래 지표 요약(JSON)을 보고 지금 포지션 진입/청산/전환을 검토할 필요가 있는지만 판단하세요.
+설명 없이 한 줄로만 답하세요: 판정: ACTION 또는 판정: HOLD
+
+{features}
+"""
+
+
+def actionability(features: Dict, thresholds: Dict[str, float] = DEFAULT_THRESHOLDS) -> Tuple[float, List[str]]:
+    """행동 필요성 점수와 근거 목록"""
+    technical = features.get('technical', {})
+    position = features.get('position', {})
+    derivatives = features.get('derivatives', {})
+    score, reasons = 0.0, []
+
+    def add(points, reason):
+        nonlocal score
+        score += points
+        reasons.append(reason)
+
+    rsi = technical.get('rsi')
+    if rsi is not None and (rsi >= thresholds['rsi_high'] or rsi <= thresholds['rsi_low']):
+        add(1.0, f"RSI {rsi}")
+    adx = technical.get('adx')
+    momentum = technical.get('macd_hist_atr')
+    if adx is not None and momentum is not None and adx >= thresholds['adx'] \
+            and abs(momentum) >= thresholds['macd_hist_atr']:
+        add(1.0, f"강한 추세 (ADX {adx}, MACD/ATR {momentum})")
+    if technical.get('macd_cross'):
+        add(1.0, f"MACD {technical['macd_cross']} 교차")
+    gap = technical.get('close_vs_ma', {}).get('20')
+    if gap is not None and abs(gap) >= thresholds['ma_gap']:
+        add(0.5, f"20MA 괴리 {gap}%")
+    patterns = [p for p in technical.get('patterns', []) if p not in NEUTRAL_PATTERNS]
+    if patterns:
+        add(0.5, f"캔들 패턴 {', '.join(patterns)}")
+    funding = derivatives.get('funding_rate')
+    if funding is not None and abs(funding) >= thresholds['funding_rate']:
+        add(0.5, f"펀딩비 {funding}")
+
+    side = position.get('side', 'none')
+    if side != 'none':
+        roe = position.get('roe') or 0.0
+        if roe >= thresholds['roe_take'] or roe <= thresholds['roe_stop']:
+            add(1.0, f"포지션 수익률 {roe}%")
+        trend_gap = technical.get('close_vs_ma', {}).get('50')
+        if momentum is not None and trend_gap is not None:
+            against = (side == 'long' and momentum < 0 and trend_gap < 0) or \
+                      (side == 'short' and momentum > 0 and trend_gap > 0)
+            if against:
+                add(1.0, "포지션과 반대 방향 추세")
+    return score, reasons
+
+
+def parse_thresholds(spec: str) -> Dict[str, float]:
+    """'rsi_high:75,hold_score:0.8' -> DEFAULT_THRESHOLDS 중 바꿀 기준값 (모르는 이름이면 ValueError)"""
+    thresholds: Dict[str, float] = {}
+    for item in spec.split(','):
+        name, _, value = item.strip().partition(':')
+        name = name.strip().lower()
+        if not name:
+            continue
+        if name not in DEFAULT_THRESHOLDS:
+            raise ValueError(f"알 수 없는 캐스케이드 기준값: {name} (가능: {', '.join(DEFAULT_THRESHOLDS)})")
+        thresholds[name] = float(value)
+    return thresholds
+
+
+class ModelCascade:
+    """로컬 점수 -> (선택) 저렴한 모델 -> 전체 조언 순서의 판별기"""
+
+    def __init__(self, triage_backend: Optional[LLMBackend] = None, thresholds: Optional[Dict[str, float]] = None):
+        self.triage_backend = triage_backend
+        self.thresholds = dict(DEFAULT_THRESHOLDS, **(thresholds or {}))
+        self.stats = {'rules_hold': 0, 'rules_escalate': 0, 'triage_hold': 0, 'triage_escalate': 0}
+
+    def _ask_triage_model(self, features: Dict) -> Optional[bool]:
+        """저렴한 모델의 판정 (실패하거나 형식이 다르면 None)"""
+        prompt = TRIAGE_PROMPT.format(features=json.dumps(features, ensure_ascii=False, separators=(',', ':')))
+        try:
+            answer = self.triage_backend.generate(prompt, temperature=0.0)
+        except Exception as e:
+            logger.warning(f"1차 판별 모델 호출 실패: {e}")
+            return None
+        match = re.search(r'판정:\s*(ACTION|HOLD)', answer or '', re.IGNORECASE)
+        return match.group(1).upper() == 'ACTION' if match else None
+
+    def triage(self, features: Dict) -> Tuple[bool, str, Dict]:
+        """(전체 조언 필요 여부, 판별한 단계, 상세) 반환"""
+        score, reasons = actionability(features, self.thresholds)
+        info = {'score': score, 'reasons': reasons}
+        if score < self.thresholds['hold_score']:
+            self.stats['rules_hold'] += 1
+            return False, 'triage_rules', info
+        if score >= self.thresholds['escalate_score'] or self.triage_backend is None:
+            self.stats['rules_escalate'] += 1
+            return True, 'triage_rules', info
+
+        verdict = self._ask_triage_model(features)
+        info['triage_model'] = getattr(self.triage_backend, 'name', 'llm')
+        if verdict is False:
+            self.stats['triage_hold'] += 1
+            return False, 'triage_llm', info
+        # 판정을 못 받았으면 놓치지 않도록 전체 조언으로
+        self.stats['triage_escalate'] += 1
+        return True, 'triage_llm', info
@@ -0,0 +1,148 @@
+"""심볼별 파생상품 데이터(OI, 펀딩비, OI 히스토리) 스냅샷과 필드별 TTL 캐시"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+import logging
+from rate_limiter import RateLimiter
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+OI_CHANGE_HORIZONS = (1, 4, 24)  # 시간
+
+
+class DerivativesSnapshot:
+    """한 심볼의 파생상품 데이터 (OI 변화율은 하나의 히스토리 응답에서 계산)"""
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.open_interest = 0.0
+        self.funding_rate = 0.0
+        self.next_funding_time: Optional[int] = None  # ms
+        self.oi_history: List[Tuple[int, float]] = []  # (timestamp ms, OI) 오름차순
+
+        # 필드별 만료 시각 (epoch 초)
+        self.oi_expires = 0.0
+        self.funding_expires = 0.0
+        self.history_expires = 0.0
+
+    def oi_change(self, hours: int, now_ms: Optional[int] = None) -> float:
+        """hours 시간 전 대비 OI 변화율 (%)"""
+        if not self.oi_history or self.open_interest <= 0:
+            return 0.0
+        now_ms = now_ms if now_ms is not None else int(time.time() * 1000)
+        target = now_ms - hours * 3600 * 1000
+        past = [oi for ts, oi in self.oi_history if ts <= target]
+        # 히스토리가 목표 시점보다 짧으면 가장 오래된 값 사용
+        past_oi = past[-1] if past else self.oi_history[0][1]
+        if past_oi <= 0:
+            return 0.0
+        return ((self.open_interest - past_oi) / past_oi) * 100
+
+    def to_dict(self, now_ms: Optional[int] = None) -> Dict[str, float]:
+        data = {
+            'open_interest': self.open_interest,
+            'funding_rate': self.funding_rate,
+            'next_funding_time': self.next_funding_time,
+        }
+        for hours in OI_CHANGE_HORIZONS:
+            data[f'oi_change_{hours}h'] = self.oi_change(hours, now_ms)
+        # 기존 리포트 호환 (24시간 변화율)
+        data['oi_change'] = data['oi_change_24h']
+        return data
+
+
+class DerivativesCache:
+    """파생상품 스냅샷 캐시
+
+    만료된 필드만 다시 조회한다. OI 는 oi_ttl, OI 히스토리는 history_ttl 동안 재사용하고,
+    펀딩비는 다음 펀딩 시각까지 바뀌지 않으므로 그때까지 재사용한다.
+    """
+
+    def __init__(self, exchange, rate_limiter: Optional[RateLimiter] = None,
+                 oi_ttl: float = 60, history_ttl: float = 300, funding_ttl: float = 300,
+                 clock: Callable[[], float] = time.time):
+        self.exchange = exchange
+        self.rate_limiter = rate_limiter
+        self.oi_ttl = oi_ttl
+        self.history_ttl = history_ttl
+        self.funding_ttl = funding_ttl  # 다음 펀딩 시각을 모를 때 사용
+        # 현재 시각(epoch 초) 함수
+        self.clock = clock
+        self._snapshots: Dict[str, DerivativesSnapshot] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _acquire(self):
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+
+    def _refresh_open_interest(self, snapshot: DerivativesSnapshot, now: float):
+        try:
+            self._acquire()
+            oi_data = self.exchange.fetch_open_interest(snapshot.symbol)
+            if isinstance(oi_data, dict) and 'info' in oi_data:
+                snapshot.open_interest = float(oi_data['info'].get('openInterest', 0))
+            snapshot.oi_expires = now + self.oi_ttl
+        except Exception as e:
+            logger.error(f"Open interest fetch error: {str(e)}")
+
+    def _refresh_funding(self, snapshot: DerivativesSnapshot, now: float):
+        try:
+            self._acquire()
+            funding_data = self.exchange.fetch_funding_rate(snapshot.symbol)
+            if isinstance(funding_data, dict) and 'info' in funding_data:
+                snapshot.funding_rate = float(funding_data['info'].get('fundingRate', 0))
+                snapshot.next_funding_time = funding_data.get('fundingTimestamp')
+            if snapshot.next_funding_time and snapshot.next_funding_time / 1000 > now:
+                snapshot.funding_expires = snapshot.next_funding_time / 1000
+            else:
+                snapshot.funding_expires = now + self.funding_ttl
+        except Exception as e:
+            logger.error(f"Funding rate fetch error: {str(e)}")
+
+    def _refresh_history(self, snapshot: DerivativesSnapshot, now: float):
+        try:
+            self._acquire()
+            hours = max(OI_CHANGE_HORIZONS)
+            since = int((now - (hours + 1) * 3600) * 1000)
+            history = self.exchange.fetch_open_interest_history(
+                snapshot.symbol, '1h', since=since, limit=hours + 2
+            )
+            points = []
+            for item in history or []:
+                ts = item.get('timestamp') or int(item.get('info', {}).get('timestamp', 0))
+                oi = item.get('openInterestAmount') or item.get('info', {}).get('openInterest', 0)
+                if ts:
+                    points.append((int(ts), float(oi)))
+            snapshot.oi_history = sorted(points)
+            snapshot.history_expires = now + self.history_ttl
+        except Exception as e:
+            logger.error(f"OI history fetch error: {str(e)}")
+
+    def _lock_for(self, symbol: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(symbol, threading.Lock())
+
+    def get_snapshot(self, symbol: str) -> DerivativesSnapshot:
+        """만료된 필드만 (병렬로) 갱신한 스냅샷 반환"""
+        with self._lock_for(symbol):
+            snapshot = self._snapshots.setdefault(symbol, DerivativesSnapshot(symbol))
+            now = self.clock()
+            refreshers = []
+            if now >= snapshot.oi_expires:
+                refreshers.append(self._refresh_open_interest)
+            if now >= snapshot.funding_expires:
+                refreshers.append(self._refresh_funding)
+            if now >= snapshot.history_expires:
+                refreshers.append(self._refresh_history)
+
+            if len(refreshers) == 1:
+                refreshers[0](snapshot, now)
+            elif refreshers:
+                with ThreadPoolExecutor(max_workers=len(refreshers)) as pool:
+                    for future in [pool.submit(refresh, snapshot, now) for refresh in refreshers]:
+                        future.result()
+            return snapshot
@@ -0,0 +1,213 @@
+"""가격 급변 시 정규 주기 밖에서 결정 사이클을 실행하는 이벤트 트리거
+
+심볼마다 마지막 결정 시점의 가격, ATR, 볼린저 밴드, 펀딩비를 기준으로 실시간 체결가를 감시한다
+(스트림 체결가, 끊겼으면 REST 시세를 느린 주기로 조회).
+- atr_move: 마지막 결정 이후 가격 변화가 ATR 의 atr_multiple 배 이상
+- bollinger: 결정 당시 밴드 안에 있던 가격이 상단/하단 밴드를 벗어남
+- funding: 펀딩비가 결정 당시보다 funding_spike 이상 변함
+조건이 confirm_seconds 동안 유지돼야 발동하고 (순간적인 꼬리 무시), 마지막 결정/발동 후 cooldown 초
+동안은 발동하지 않으며, 심볼당 한 시간에 max_per_hour 회까지만 추가 사이클을 실행해 LLM 비용을 제한한다.
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+from collections import deque
+import math
+import threading
+import time
+import logging
+from metrics import EVENT_TRIGGERS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+HOUR_SECONDS = 3600
+
+
+def _valid(value) -> bool:
+    return value is not None and not math.isnan(value)
+
+
+class EventTrigger:
+    """실시간 가격/펀딩비를 감시해 조건 충족 시 on_event(symbol, event) 호출 (실행했으면 True 반환)"""
+
+    def __init__(self, symbols: List[str], on_event: Callable[[str, Dict], bool],
+                 price_source: Callable[[str], Optional[float]],
+                 fallback_price_source: Optional[Callable[[str], Optional[float]]] = None,
+                 funding_source: Optional[Callable[[str], Optional[float]]] = None,
+                 atr_multiple: float = 2.0, bollinger: bool = True, funding_spike: float = 0.0005,
+                 confirm_seconds: float = 10.0, cooldown: float = 900.0, max_per_hour: int = 2,
+                 poll_interval: float = 5.0, fallback_interval: float = 30.0,
+                 clock: Callable[[], float] = time.time):
+        self.symbols = list(symbols)
+        self.on_event = on_event
+        self.price_source = price_source
+        self.fallback_price_source = fallback_price_source
+        self.funding_source = funding_source
+        # 0 이면 해당 조건 사용 안 함
+        self.atr_multiple = atr_multiple
+        self.bollinger = bollinger
+        self.funding_spike = funding_spike
+        self.confirm_seconds = confirm_seconds
+        self.cooldown = cooldown
+        self.max_per_hour = max_per_hour
+        self.poll_interval = poll_interval
+        self.fallback_interval = fallback_interval
+        self.clock = clock
+
+        # symbol -> 마지막 결정 시점 기준값
+        self._references: Dict[str, Dict] = {}
+        # symbol -> (조건, 처음 감지한 시각)
+        self._pending: Dict[str, Tuple[str, float]] = {}
+        # symbol -> 최근 한 시간 발동 시각
+        self._fired: Dict[str, deque] = {symbol: deque() for symbol in self.symbols}
+        # symbol -> 지금 조건이 억제된 사유 (같은 조건이 이어지는 동안 한 번만 기록)
+        self._suppressed: Dict[str, str] = {}
+        self._last_fallback: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ---- 기준 갱신 ----
+
+    def record_decision(self, symbol: str, metrics: Dict, price: Optional[float] = None):
+        """결정 사이클(정규/이벤트)이 끝나면 기준값 갱신 (metrics 는 수집기의 latest_metrics[symbol])"""
+        indicators = metrics.get('indicators') or {}
+        bollinger = indicators.get('bollinger') or {}
+        derivatives = metrics.get('derivatives') or {}
+        with self._lock:
+            self._references[symbol] = {
+                'price': price or metrics.get('close'),
+                'atr': indicators.get('atr'),
+                'upper': bollinger.get('upper'),
+                'lower': bollinger.get('lower'),
+                'funding_rate': derivatives.get('funding_rate'),
+                'decided_at': self.clock()
+            }
+            self._pending.pop(symbol, None)
+            self._suppressed.pop(symbol, None)
+
+    # ---- 조건 판정 ----
+
+    def evaluate(self, symbol: str, price: Optional[float],
+                 funding_rate: Optional[float] = None) -> Optional[Tuple[str, str]]:
+        """기준값 대비 충족된 조건 (조건명, 설명), 없으면 None"""
+        reference = self._references.get(symbol)
+        # 조회 실패 시 0 을 돌려주는 시세 함수도 있으므로 0 이하 가격은 무시
+        if reference is None or not reference['price'] or not price or price <= 0:
+            return None
+        move = price - reference['price']
+        atr = reference['atr']
+        if self.atr_multiple > 0 and _valid(atr) and atr > 0 and abs(move) >= self.atr_multiple * atr:
+            return 'atr_move', f"마지막 결정 이후 {move:+.2f} ({abs(move) / atr:.1f} ATR)"
+        upper, lower = reference['upper'], reference['lower']
+        if self.bollinger and _valid(upper) and _valid(lower) and lower <= reference['price'] <= upper:
+            if price > upper:
+                return 'bollinger', f"볼린저 상단 {upper:.2f} 돌파"
+            if price < lower:
+                return 'bollinger', f"볼린저 하단 {lower:.2f} 이탈"
+        if self.funding_spike > 0 and funding_rate is not None and reference['funding_rate'] is not None:
+            if abs(funding_rate - reference['funding_rate']) >= self.funding_spike:
+                return 'funding', f"펀딩비 {reference['funding_rate']:.4%} -> {funding_rate:.4%}"
+        return None
+
+    def _suppress(self, symbol: str, condition: str, reason: str):
+        if self._suppressed.get(symbol) != reason:
+            self._suppressed[symbol] = reason
+            EVENT_TRIGGERS.inc(symbol=symbol, condition=condition, result=reason)
+            logger.info(f"{symbol} 이벤트 조건({condition}) 충족했으나 실행 안 함: {reason}")
+
+    def check(self, symbol: str, price: Optional[float], funding_rate: Optional[float] = None) -> Optional[Dict]:
+        """디바운스/쿨다운/시간당 상한을 통과한 이벤트 (지금 실행해야 하면 반환)"""
+        if not price or price <= 0:
+            # 시세가 없는 회차 (REST 조회 주기 사이 등) 는 감지 상태를 유지
+            return None
+        now = self.clock()
+        with self._lock:
+            hit = self.evaluate(symbol, price, funding_rate)
+            if hit is None:
+                self._pending.pop(symbol, None)
+                self._suppressed.pop(symbol, None)
+                return None
+            condition, detail = hit
+            pending = self._pending.get(symbol)
+            if pending is None or pending[0] != condition:
+                pending = self._pending[symbol] = (condition, now)
+            if now - pending[1] < self.confirm_seconds:
+                return None
+            reference = self._references[symbol]
+            fired = self._fired.setdefault(symbol, deque())
+            last_fired = fired[-1] if fired else 0.0
+            if now - max(reference['decided_at'], last_fired) < self.cooldown:
+                self._suppress(symbol, condition, 'cooldown')
+                return None
+            while fired and now - fired[0] >= HOUR_SECONDS:
+                fired.popleft()
+            if len(fired) >= self.max_per_hour:
+                self._suppress(symbol, condition, 'capped')
+                return None
+            return {
+                'symbol': symbol,
+                'condition': condition,
+                'detail': detail,
+                'price': price,
+                'reference_price': reference['price'],
+                'detected_at': pending[1]
+            }
+
+    def _mark_fired(self, symbol: str, event: Dict):
+        with self._lock:
+            self._fired.setdefault(symbol, deque()).append(self.clock())
+            self._pending.pop(symbol, None)
+            self._suppressed.pop(symbol, None)
+        EVENT_TRIGGERS.inc(symbol=symbol, condition=event['condition'], result='fired')
+        logger.warning(f"{symbol} 이벤트 사이클 실행: {event['detail']} (현재가 {event['price']})")
+
+    # ---- 감시 ----
+
+    def _price(self, symbol: str) -> Optional[float]:
+        price = self.price_source(symbol)
+        if price is not None or self.fallback_price_source is None:
+            return price
+        # 스트림이 끊겼으면 REST 시세를 요청 한도를 아끼도록 느린 주기로 조회
+        now = self.clock()
+        if now - self._last_fallback.get(symbol, 0.0) < self.fallback_interval:
+            return None
+        self._last_fallback[symbol] = now
+        return self.fallback_price_source(symbol)
+
+    def poll_once(self) -> List[Dict]:
+        """모든 심볼을 한 번 확인하고 실행한 이벤트 목록 반환"""
+        launched = []
+        for symbol in self.symbols:
+            try:
+                funding_rate = self.funding_source(symbol) if self.funding_source is not None else None
+                event = self.check(symbol, self._price(symbol), funding_rate)
+                if event is None:
+                    continue
+                if self.on_event(symbol, event):
+                    self._mark_fired(symbol, event)
+                    launched.append(event)
+                else:
+                    with self._lock:
+                        self._suppress(symbol, event['condition'], 'busy')
+            except Exception as e:
+                logger.error(f"{symbol} 이벤트 조건 확인 중 에러 발생: {e}")
+        return launched
+
+    def run_forever(self):
+        logger.info(f"이벤트 트리거 감시 시작: {self.symbols} (ATR {self.atr_multiple}배, "
+                    f"볼린저 {self.bollinger}, 펀딩비 {self.funding_spike}, 시간당 최대 {self.max_per_hour}회)")
+        while not self._stop.is_set():
+            self.poll_once()
+            self._stop.wait(self.poll_interval)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self.run_forever, name='event-trigger', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
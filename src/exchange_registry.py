@@ -0,0 +1,220 @@
+"""프로세스 전역 거래소 클라이언트 레지스트리
+
+ccxt/pybit 클라이언트를 API 키별로 한 번만 만들어 공유하고, 두 클라이언트가 하나의
+HTTP 커넥션 풀(HTTPAdapter)을 함께 쓴다 (세션과 기본 헤더는 클라이언트 종류별로 따로). 마켓 정보와 서버 시간 오차는 디스크에
+TTL 과 함께 캐시해 재시작이나 새 클라이언트 생성 때 다시 조회하지 않는다.
+생성 시점에는 네트워크 요청을 하지 않고, 메타데이터가 처음 필요할 때 로드한다.
+"""
+
+from typing import Dict, Optional, Tuple
+import json
+import os
+import threading
+import time
+import logging
+import ccxt
+import requests
+from requests.adapters import HTTPAdapter
+from pybit.unified_trading import HTTP
+from metrics import InstrumentedSession
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.getenv('EXCHANGE_CACHE_DIR', '.cache')
+MARKETS_TTL = 6 * 60 * 60  # 초
+TIME_DIFFERENCE_TTL = 60 * 60  # 초
+# 수집기 병렬 스레드 수보다 넉넉한 커넥션 풀 크기
+HTTP_POOL_SIZE = 32
+
+
+class MetadataCache:
+    """마켓 정보/서버 시간 오차 디스크 캐시 (JSON, 저장 시각 기준 TTL)"""
+
+    def __init__(self, cache_dir: str = CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.cache_dir, f"{name}.json")
+
+    def load(self, name: str, ttl: float) -> Optional[Tuple[dict, float]]:
+        """(데이터, 저장 시각) 반환 (없거나 만료됐으면 None)"""
+        try:
+            with open(self._path(name), encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        saved_at = entry.get('saved_at', 0)
+        if time.time() - saved_at > ttl:
+            return None
+        return entry.get('data'), saved_at
+
+    def save(self, name: str, data):
+        """임시 파일에 쓴 뒤 교체 (동시에 읽는 프로세스가 깨진 파일을 보지 않도록)"""
+        path = self._path(name)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with self._lock:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump({'saved_at': time.time(), 'data': data}, f, default=str)
+                os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"메타데이터 캐시 저장 실패 ({name}): {e}")
+
+
+class CachedBybit(ccxt.bybit):
+    """마켓 정보와 서버 시간 오차를 디스크 캐시에서 먼저 찾는 ccxt bybit
+
+    ccxt 는 주문/조회 전마다 load_markets() 를 호출하므로 여기서 TTL 을 확인해 만료된 경우에만 갱신한다.
+    """
+
+    def __init__(self, config: Dict, metadata_cache: MetadataCache,
+                 markets_ttl: float = MARKETS_TTL, time_ttl: float = TIME_DIFFERENCE_TTL):
+        # 시간 오차는 아래에서 직접 관리 (fetch_markets 안에서 중복 조회하지 않도록)
+        options = dict(config.get('options', {}), adjustForTimeDifference=False)
+        super().__init__(dict(config, options=options))
+        self.metadata_cache = metadata_cache
+        self.markets_ttl = markets_ttl
+        self.time_ttl = time_ttl
+        self.markets_expires = 0.0
+        self.time_expires = 0.0
+        self._metadata_lock = threading.RLock()
+
+    def load_markets(self, reload=False, params={}):
+        now = time.time()
+        if reload or now >= self.markets_expires or now >= self.time_expires:
+            with self._metadata_lock:
+                # 잠금을 기다리는 동안 다른 스레드가 이미 갱신했을 수 있음
+                now = time.time()
+                if reload or now >= self.markets_expires:
+                    self._refresh_markets(reload, params)
+                if now >= self.time_expires:
+                    self._refresh_time_difference()
+        return self.markets
+
+    def _refresh_markets(self, reload: bool, params: dict):
+        name = f"{self.id}_markets"
+        cached = None if reload else self.metadata_cache.load(name, self.markets_ttl)
+        if cached is not None:
+            data, saved_at = cached
+            self.set_markets(data['markets'], data.get('currencies'))
+            self.markets_expires = saved_at + self.markets_ttl
+            return
+        try:
+            super().load_markets(reload=True, params=params)
+        except Exception:
+            if not self.markets:
+                raise
+            # 기존 마켓 정보로 계속 진행하고 잠시 후 재시도
+            logger.warning("마켓 정보 갱신 실패, 기존 정보 사용")
+            self.markets_expires = time.time() + 60
+            return
+        self.markets_expires = time.time() + self.markets_ttl
+        self.metadata_cache.save(name, {'markets': self.markets, 'currencies': self.currencies})
+
+    def _refresh_time_difference(self):
+        name = f"{self.id}_time_difference"
+        cached = self.metadata_cache.load(name, self.time_ttl)
+        if cached is not None:
+            data, saved_at = cached
+            self.options['timeDifference'] = data
+            self.time_expires = saved_at + self.time_ttl
+            return
+        try:
+            self.load_time_difference()
+        except Exception as e:
+            logger.warning(f"서버 시간 동기화 실패: {e}")
+            self.time_expires = time.time() + 60
+            return
+        self.time_expires = time.time() + self.time_ttl
+        self.metadata_cache.save(name, self.options['timeDifference'])
+
+
+class ExchangeRegistry:
+    """API 키별로 공유되는 ccxt/pybit 클라이언트 보관소"""
+
+    def __init__(self, cache_dir: str = CACHE_DIR, markets_ttl: float = MARKETS_TTL,
+                 time_ttl: float = TIME_DIFFERENCE_TTL):
+        self.metadata_cache = MetadataCache(cache_dir)
+        self.markets_ttl = markets_ttl
+        self.time_ttl = time_ttl
+        self._adapter: Optional[HTTPAdapter] = None
+        self._session: Optional[requests.Session] = None
+        self._ccxt_clients: Dict[Tuple[str, str], CachedBybit] = {}
+        self._http_clients: Dict[Tuple[str, str], HTTP] = {}
+        self._lock = threading.Lock()
+
+    def _new_session(self) -> requests.Session:
+        """공유 커넥션 풀을 쓰는 세션 (요청별 시간/실패는 지표로 기록, 헤더는 세션마다 따로)"""
+        if self._adapter is None:
+            self._adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_SIZE)
+        session = InstrumentedSession()
+        session.mount('https://', self._adapter)
+        session.mount('http://', self._adapter)
+        return session
+
+    def _http_session(self) -> requests.Session:
+        """ccxt 클라이언트들이 공유하는 세션"""
+        if self._session is None:
+            self._session = self._new_session()
+        return self._session
+
+    def ccxt_client(self, api_key: Optional[str], secret_key: Optional[str]) -> CachedBybit:
+        key = (api_key or '', secret_key or '')
+        with self._lock:
+            client = self._ccxt_clients.get(key)
+            if client is None:
+                client = CachedBybit({
+                    'apiKey': api_key,
+                    'secret': secret_key,
+                    'enableRateLimit': True,
+                    'session': self._http_session(),
+                    'options': {
+                        'defaultType': 'linear',
+                        'recvWindow': 10000
+                    }
+                }, self.metadata_cache, markets_ttl=self.markets_ttl, time_ttl=self.time_ttl)
+                self._ccxt_clients[key] = client
+            return client
+
+    def http_client(self, api_key: Optional[str], secret_key: Optional[str]) -> HTTP:
+        key = (api_key or '', secret_key or '')
+        with self._lock:
+            client = self._http_clients.get(key)
+            if client is None:
+                client = HTTP(
+                    testnet=False,
+                    api_key=api_key,
+                    api_secret=secret_key
+                )
+                # pybit 이 만든 세션 대신 공유 커넥션 풀을 쓰는 자체 세션 사용
+                # (pybit 기본 헤더가 ccxt 요청에 섞이지 않도록 ccxt 세션과는 분리)
+                session = self._new_session()
+                session.headers.update(client.client.headers)
+                client.client = session
+                self._http_clients[key] = client
+            return client
+
+
+_registry: Optional[ExchangeRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> ExchangeRegistry:
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ExchangeRegistry()
+        return _registry
+
+
+def get_ccxt_client(api_key: Optional[str], secret_key: Optional[str]) -> CachedBybit:
+    """공유 ccxt bybit 클라이언트"""
+    return get_registry().ccxt_client(api_key, secret_key)
+
+
+def get_http_client(api_key: Optional[str], secret_key: Optional[str]) -> HTTP:
+    """공유 pybit HTTP 클라이언트"""
+    return get_registry().http_client(api_key, secret_key)
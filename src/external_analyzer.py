@@ -7,6 +7,7 @@ import numpy as np
 import pandas as pd
 import os
 from fredapi import Fred
+from metrics import track_external
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -15,25 +16,32 @@ class ExternalAnalyzer:
     def __init__(self):
         self.api_key = os.getenv('FRED_API_KEY')
         self.fred = Fred(api_key=self.api_key)
+        # 마지막 prepare_external_analysis 에서 수집한 수치 (결정 캐시 키 등에 사용)
+        self.latest_metrics: Dict[str, float] = {}
 
     def prepare_external_analysis(self) -> str:
         try:
             # 기본 분석 결과
             analysis = "외부 요인 분석:\n"
+            self.latest_metrics = {}
             
             # FRED 데이터 수집 시도
             try:
                 # DXY (달러 인덱스) 데이터
-                dxy = self.fred.get_series('DTWEXBGS')
+                with track_external('fred', 'DTWEXBGS'):
+                    dxy = self.fred.get_series('DTWEXBGS')
                 if not dxy.empty:
                     latest_dxy = dxy.iloc[-1]
                     analysis += f"- 달러 인덱스(DXY): {latest_dxy:.2f}\n"
+                    self.latest_metrics['external_dxy'] = float(latest_dxy)
                 
                 # 금리 데이터
-                interest_rate = self.fred.get_series('DFF')
+                with track_external('fred', 'DFF'):
+                    interest_rate = self.fred.get_series('DFF')
                 if not interest_rate.empty:
                     latest_rate = interest_rate.iloc[-1]
                     analysis += f"- 기준금리: {latest_rate:.2f}%\n"
+                    self.latest_metrics['external_interest_rate'] = float(latest_rate)
                 
             except Exception as e:
                 logger.error(f"FRED 데이터 수집 실패: {e}")
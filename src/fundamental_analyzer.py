@@ -1,11 +1,11 @@
 import yfinance as yf
-import requests
 from typing import Dict, List
 from datetime import datetime, timedelta
 import logging
 import json
 from dotenv import load_dotenv
 import os
+from metrics import InstrumentedSession, track_external
 
 # .env 파일 로드
 load_dotenv()
@@ -17,24 +17,28 @@ class FundamentalAnalyzer:
     def __init__(self):
         self.coingecko_base_url = "https://api.coingecko.com/api/v3"
         self.news_api_key = os.getenv("NEWS_API_KEY")
+        # 요청별 시간/실패를 지표로 기록하는 세션
+        self.http = InstrumentedSession()
+        # 마지막 prepare_fundamental_analysis 에서 수집한 수치 (결정 캐시 키 등에 사용)
+        self.latest_metrics: Dict[str, float] = {}
         
     def _get_onchain_data(self) -> Dict:
         """온체인 데이터 수집"""
         try:
             # 네트워크 데이터
-            hashrate = requests.get("https://api.blockchain.info/stats").json()
+            hashrate = self.http.get("https://api.blockchain.info/stats").json()
             
             # 거래소 데이터
-            exchange_data = requests.get(
+            exchange_data = self.http.get(
                 f"{self.coingecko_base_url}/exchanges/binance/tickers",
                 params={'coin_ids': 'bitcoin'}
             ).json()
             
             # 활성 주소 데이터
-            addresses = requests.get("https://api.blockchain.info/charts/n-unique-addresses?timespan=24h&format=json").json()
+            addresses = self.http.get("https://api.blockchain.info/charts/n-unique-addresses?timespan=24h&format=json").json()
             
             # 고래 지갑 데이터 (BitInfoCharts API로 변경)
-            whale_data = requests.get(
+            whale_data = self.http.get(
                 "https://api.coingecko.com/api/v3/companies/public_treasury/bitcoin"
             ).json()
             
@@ -62,17 +66,20 @@ class FundamentalAnalyzer:
         try:
             # DXY (달러 인덱스)
             dxy = yf.Ticker("DX-Y.NYB")
-            dxy_data = dxy.history(period="1d")
+            with track_external('yfinance', 'history'):
+                dxy_data = dxy.history(period="1d")
             dxy_value = dxy_data['Close'].iloc[-1]
             
             # S&P 500
             sp500 = yf.Ticker("^GSPC")
-            sp500_data = sp500.history(period="1d")
+            with track_external('yfinance', 'history'):
+                sp500_data = sp500.history(period="1d")
             sp500_value = sp500_data['Close'].iloc[-1]
             
             # 금리 데이터 (미국 10년물 국채)
             rates = yf.Ticker("^TNX")
-            rates_data = rates.history(period="1d")
+            with track_external('yfinance', 'history'):
+                rates_data = rates.history(period="1d")
             interest_rate = rates_data['Close'].iloc[-1]
             
             return {
@@ -119,7 +126,7 @@ class FundamentalAnalyzer:
     def _calculate_correlation(self) -> str:
         """BTC와 S&P 500의 상관관계"""
         try:
-            btc_data = requests.get(
+            btc_data = self.http.get(
                 f"{self.coingecko_base_url}/coins/bitcoin/market_chart",
                 params={'vs_currency': 'usd', 'days': '30', 'interval': 'daily'}
             ).json()
@@ -149,7 +156,7 @@ class FundamentalAnalyzer:
     def _get_news(self) -> List[str]:
         """뉴스 데이터 수집"""
         try:
-            response = requests.get(
+            response = self.http.get(
                 "https://newsapi.org/v2/everything",
                 params={
                     'q': 'bitcoin',
@@ -167,6 +174,7 @@ class FundamentalAnalyzer:
 
     def prepare_fundamental_analysis(self) -> str:
         """기본적 분석 데이터 준비"""
+        self.latest_metrics = {}
         try:
             onchain_data = self._get_onchain_data()
             market_conditions = self._get_market_conditions()
@@ -177,6 +185,14 @@ class FundamentalAnalyzer:
             positive_count = sentiment_results.count('positive')
             negative_count = sentiment_results.count('negative')
             neutral_count = sentiment_results.count('neutral')
+            # 외부 요인 분석기도 달러 인덱스/금리를 내지만 다른 지표이므로 (DX-Y.NYB vs DTWEXBGS, 10년물 vs 기준금리)
+            # 합쳐도 덮어쓰지 않도록 출처 접두어를 붙임
+            metric_names = {'dxy': 'fundamental_dxy', 'sp500': 'sp500', 'interest_rate': 'fundamental_interest_rate'}
+            self.latest_metrics = {
+                metric: float(market_conditions[name]['current'])
+                for name, metric in metric_names.items() if name in market_conditions
+            }
+            self.latest_metrics['news_balance'] = float(positive_count - negative_count)
             
             analysis = f"""
 기본적 분석 리포트 - BTC
@@ -0,0 +1,317 @@
+from typing import Dict, Optional, Sequence, Union
+from collections import deque
+import math
+import numpy as np
+import pandas as pd
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+NAN = float('nan')
+
+
+def _div(a: float, b: float) -> float:
+    """pandas/numpy 와 같은 규칙의 나눗셈 (0으로 나누면 inf 또는 nan)"""
+    if b == 0 or math.isnan(b):
+        if math.isnan(a) or math.isnan(b) or a == 0:
+            return NAN
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return a / b
+
+
+class _EWM:
+    """pandas ``Series.ewm(...).mean()`` 의 점화식을 한 값씩 계산 (ignore_na=False)"""
+
+    def __init__(self, alpha: float, adjust: bool = False, min_periods: int = 0):
+        self.alpha = alpha
+        self.adjust = adjust
+        self.min_periods = max(min_periods, 1)
+        self.weighted = NAN
+        self.old_wt = 1.0
+        self.nobs = 0
+        self.value = NAN
+
+    @classmethod
+    def from_span(cls, span: int, **kwargs) -> '_EWM':
+        return cls(2.0 / (span + 1.0), **kwargs)
+
+    @classmethod
+    def from_com(cls, com: float, **kwargs) -> '_EWM':
+        return cls(1.0 / (1.0 + com), **kwargs)
+
+    def update(self, x: float) -> float:
+        is_observation = not math.isnan(x)
+        self.nobs += is_observation
+        if not math.isnan(self.weighted):
+            self.old_wt *= 1.0 - self.alpha
+            if is_observation:
+                new_wt = 1.0 if self.adjust else self.alpha
+                if self.weighted != x:
+                    self.weighted = (self.old_wt * self.weighted + new_wt * x) / (self.old_wt + new_wt)
+                if self.adjust:
+                    self.old_wt += new_wt
+                else:
+                    self.old_wt = 1.0
+        elif is_observation:
+            self.weighted = x
+        self.value = self.weighted if self.nobs >= self.min_periods else NAN
+        return self.value
+
+
+class _Rolling:
+    """고정 길이 이동창의 평균/표준편차 (rolling(window).mean()/std() 와 동일한 결과)"""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+        self.total_sq = 0.0
+        self._updates = 0
+
+    def update(self, x: float):
+        if len(self.values) == self.window:
+            old = self.values[0]
+            self.total -= old
+            self.total_sq -= old * old
+        self.values.append(x)
+        self.total += x
+        self.total_sq += x * x
+        # 누적 합의 부동소수점 오차가 쌓이지 않도록 창 길이마다 다시 합산 (분할상환 O(1))
+        self._updates += 1
+        if self._updates >= self.window:
+            self._updates = 0
+            self.total = math.fsum(self.values)
+            self.total_sq = math.fsum(v * v for v in self.values)
+
+    @property
+    def ready(self) -> bool:
+        return len(self.values) == self.window
+
+    def mean(self) -> float:
+        return self.total / self.window if self.ready else NAN
+
+    def std(self) -> float:
+        if not self.ready or self.window < 2:
+            return NAN
+        mean = self.total / self.window
+        var = (self.total_sq - self.window * mean * mean) / (self.window - 1)
+        return math.sqrt(var) if var > 0 else 0.0
+
+
+class IncrementalIndicatorEngine:
+    """확정봉이 하나 들어올 때마다 모든 지표를 O(1)로 갱신하는 상태 기반 지표 엔진
+
+    ``MarketDataCollector.get_technical_indicators`` / ``get_volume_analysis`` 와
+    같은 구조의 결과를 반환하며, 같은 봉 구간에 대해 배치(pandas) 계산과 일치한다.
+    """
+
+    def __init__(self, ma_periods: Sequence[int] = (5, 20, 50, 200), rsi_period: int = 14,
+                 bb_period: int = 20, atr_period: int = 14, adx_period: int = 14,
+                 volume_period: int = 20):
+        self.ma_periods = tuple(ma_periods)
+        # 마지막으로 반영한 봉의 시각 (update 에 넘긴 값: Timestamp 또는 ms)
+        self.last_timestamp: Optional[Union[int, pd.Timestamp]] = None
+        self.bars = 0
+
+        self._sma = {p: _Rolling(p) for p in self.ma_periods}
+        self._ema = {p: _EWM.from_span(p) for p in self.ma_periods}
+
+        self._avg_gain = _EWM.from_com(rsi_period - 1, adjust=True, min_periods=rsi_period)
+        self._avg_loss = _EWM.from_com(rsi_period - 1, adjust=True, min_periods=rsi_period)
+        self._recent_close = deque(maxlen=5)
+        self._recent_rsi = deque(maxlen=5)
+
+        self._ema12 = _EWM.from_span(12)
+        self._ema26 = _EWM.from_span(26)
+        self._macd_signal = _EWM.from_span(9)
+        self._macd = NAN
+        self._prev_macd = NAN
+        self._prev_signal = NAN
+
+        self._bb = _Rolling(bb_period)
+
+        self._atr = _EWM.from_span(atr_period)
+        self._tr_ewm = _EWM.from_span(adx_period)
+        self._plus_dm_ewm = _EWM.from_span(adx_period)
+        self._minus_dm_ewm = _EWM.from_span(adx_period)
+        self._adx = _EWM.from_span(adx_period)
+
+        self._volume_sma = _Rolling(volume_period)
+        self._obv = 0.0
+        self._obv_sma = _Rolling(volume_period)
+
+        self._prev_high = NAN
+        self._prev_low = NAN
+        self._prev_close = NAN
+        self._close = NAN
+        self._volume = NAN
+
+    def update(self, high: float, low: float, close: float, volume: float,
+               timestamp: Optional[Union[int, pd.Timestamp]] = None):
+        """확정봉 하나 반영"""
+        high, low, close, volume = float(high), float(low), float(close), float(volume)
+        first = self.bars == 0
+        prev_close = self._prev_close
+
+        for period in self.ma_periods:
+            self._sma[period].update(close)
+            self._ema[period].update(close)
+
+        # RSI (첫 봉은 diff 가 NaN 이므로 상승/하락폭 0)
+        delta = 0.0 if first else close - prev_close
+        self._avg_gain.update(delta if delta > 0 else 0.0)
+        self._avg_loss.update(-delta if delta < 0 else 0.0)
+        rs = _div(self._avg_gain.value, self._avg_loss.value)
+        rsi = 100 - _div(100, 1 + rs)
+        self._recent_close.append(close)
+        self._recent_rsi.append(rsi)
+
+        # MACD
+        self._prev_macd = self._macd
+        self._prev_signal = self._macd_signal.value
+        self._macd = self._ema12.update(close) - self._ema26.update(close)
+        self._macd_signal.update(self._macd)
+
+        self._bb.update(close)
+
+        # True Range (ATR/ADX 공통)
+        if first:
+            tr = high - low
+        else:
+            tr = max(abs(high - low), abs(high - prev_close), abs(low - prev_close))
+        self._atr.update(tr)
+
+        # ADX
+        up_move = high - self._prev_high
+        down_move = self._prev_low - low
+        plus_dm = max(up_move, 0.0) if up_move > down_move else 0.0
+        minus_dm = max(down_move, 0.0) if down_move > up_move else 0.0
+        tr_ewm = self._tr_ewm.update(tr)
+        plus_di = 100 * _div(self._plus_dm_ewm.update(plus_dm), tr_ewm)
+        minus_di = 100 * _div(self._minus_dm_ewm.update(minus_dm), tr_ewm)
+        dx = 100 * _div(abs(plus_di - minus_di), plus_di + minus_di)
+        self._adx.update(dx)
+
+        # 거래량 / OBV
+        self._volume_sma.update(volume)
+        if not first:
+            if close > prev_close:
+                self._obv += volume
+            elif close < prev_close:
+                self._obv -= volume
+        self._obv_sma.update(self._obv)
+
+        self._prev_high = high
+        self._prev_low = low
+        self._prev_close = close
+        self._close = close
+        self._volume = volume
+        self.last_timestamp = timestamp
+        self.bars += 1
+
+    def warm_up(self, df):
+        """DataFrame (또는 CandleStore.read_window 의 열별 배열) 의 봉들을 순서대로 반영"""
+        close_values = np.asarray(df['close'], dtype=float)
+        timestamps = df['timestamp'].tolist() if 'timestamp' in df else [None] * len(close_values)
+        for ts, high, low, close, volume in zip(
+                timestamps, np.asarray(df['high'], dtype=float), np.asarray(df['low'], dtype=float),
+                close_values, np.asarray(df['volume'], dtype=float)):
+            self.update(high, low, close, volume, timestamp=ts)
+
+    def _moving_averages(self) -> Dict[str, float]:
+        mas = {}
+        for period in self.ma_periods:
+            mas[f'ma_{period}'] = self._sma[period].mean()
+            mas[f'ema_{period}'] = self._ema[period].value
+        if all(f'ma_{p}' in mas for p in (5, 20, 50)):
+            mas['golden_cross'] = mas['ma_5'] > mas['ma_20'] and mas['ma_20'] > mas['ma_50']
+            mas['death_cross'] = mas['ma_5'] < mas['ma_20'] and mas['ma_20'] < mas['ma_50']
+        return mas
+
+    def _rsi(self) -> Dict[str, float]:
+        divergence = 'none'
+        if len(self._recent_close) >= 2:
+            recent_close_diff = np.diff(np.asarray(self._recent_close)).mean()
+            recent_rsi_diff = np.diff(np.asarray(self._recent_rsi)).mean()
+            if recent_close_diff < 0 and recent_rsi_diff > 0:
+                divergence = 'bullish'
+            elif recent_close_diff > 0 and recent_rsi_diff < 0:
+                divergence = 'bearish'
+        return {
+            'current': self._recent_rsi[-1] if self._recent_rsi else NAN,
+            'divergence': divergence
+        }
+
+    def _macd_values(self) -> Dict[str, float]:
+        signal = self._macd_signal.value
+        if self.bars < 2:
+            cross_above = False
+            cross_below = False
+        else:
+            cross_above = (self._macd > signal) and (self._prev_macd <= self._prev_signal)
+            cross_below = (self._macd < signal) and (self._prev_macd >= self._prev_signal)
+        return {
+            'macd': self._macd,
+            'signal': signal,
+            'histogram': self._macd - signal,
+            'cross_above': cross_above,
+            'cross_below': cross_below
+        }
+
+    def _bollinger(self) -> Dict[str, float]:
+        middle = self._bb.mean()
+        std = self._bb.std()
+        upper = middle + 2 * std
+        lower = middle - 2 * std
+        bandwidth = (upper - lower) / middle if middle != 0 else 0.0
+        position = (self._close - lower) / (upper - lower) if (upper - lower) != 0 else 0.0
+        return {
+            'upper': upper,
+            'middle': middle,
+            'lower': lower,
+            'bandwidth': bandwidth,
+            'position': position
+        }
+
+    def _adx_values(self) -> Dict[str, float]:
+        adx_value = self._adx.value
+        if adx_value > 25:
+            trend_strength = 'strong'
+        elif adx_value < 20:
+            trend_strength = 'weak'
+        else:
+            trend_strength = 'moderate'
+        return {
+            'adx': adx_value,
+            'trend_strength': trend_strength
+        }
+
+    def get_technical_indicators(self) -> Dict[str, dict]:
+        """현재 상태의 기술적 지표 (get_technical_indicators 와 같은 구조)"""
+        return {
+            'ma': self._moving_averages(),
+            'rsi': self._rsi(),
+            'macd': self._macd_values(),
+            'bollinger': self._bollinger(),
+            'atr': self._atr.value,
+            'adx': self._adx_values()
+        }
+
+    def get_volume_analysis(self) -> Dict[str, dict]:
+        """현재 상태의 거래량 분석 (get_volume_analysis 와 같은 구조)"""
+        vol_sma = self._volume_sma.mean()
+        obv_sma = self._obv_sma.mean()
+        obv_sma = 0.0 if math.isnan(obv_sma) else obv_sma
+        return {
+            'volume_trend': {
+                'current_volume': self._volume,
+                'volume_sma': vol_sma,
+                'volume_trend': 'increasing' if self._volume > vol_sma else 'decreasing'
+            },
+            'obv': {
+                'current': self._obv,
+                'sma': obv_sma,
+                'trend': 'bullish' if self._obv > obv_sma else 'bearish'
+            }
+        }
@@ -0,0 +1,287 @@
+"""OHLCV 배열을 한 번만 읽어 모든 기술적 지표 시계열을 계산하는 벡터화 커널
+
+TR, 가격 변화량, 상승/하락폭 같은 중간 결과는 한 번만 계산해 지표들이 공유하고,
+DataFrame 복사나 임시 컬럼 없이 numpy 배열만 사용한다. 재귀식(EWM)과 이동창 연산은
+배열을 복사 없이 감싼 Series 에서 pandas 의 컴파일된 루틴을 그대로 사용하므로
+기존 pandas 계산과 같은 값을 낸다.
+"""
+
+from typing import Dict, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+MA_PERIODS = (5, 20, 50, 200)
+# summarize_* 에 필요한 최소 길이 (RSI 다이버전스가 최근 5봉 사용)
+SUMMARY_TAIL = 5
+
+
+def _as_array(values) -> np.ndarray:
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def ewm_mean(values: np.ndarray, span: Optional[float] = None, com: Optional[float] = None,
+             adjust: bool = False, min_periods: int = 0) -> np.ndarray:
+    """지수이동평균 (Series.ewm(...).mean() 과 동일)"""
+    series = pd.Series(values, copy=False)
+    return series.ewm(span=span, com=com, adjust=adjust, min_periods=min_periods).mean().to_numpy()
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    return pd.Series(values, copy=False).rolling(window=window).mean().to_numpy()
+
+
+def rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    return pd.Series(values, copy=False).rolling(window=window).std().to_numpy()
+
+
+def shift(values: np.ndarray) -> np.ndarray:
+    """한 칸 뒤로 민 배열 (첫 값은 NaN)"""
+    shifted = np.empty_like(values)
+    shifted[0] = np.nan
+    shifted[1:] = values[:-1]
+    return shifted
+
+
+def true_range(high: np.ndarray, low: np.ndarray, prev_close: np.ndarray) -> np.ndarray:
+    """True Range (첫 봉은 고가-저가)"""
+    tr = np.abs(high - low)
+    np.fmax(tr, np.abs(high - prev_close), out=tr)
+    np.fmax(tr, np.abs(low - prev_close), out=tr)
+    return tr
+
+
+def directional_movement(high: np.ndarray, low: np.ndarray):
+    """+DM, -DM"""
+    up_move = high - shift(high)
+    down_move = shift(low) - low
+    plus_dm = np.where(up_move > down_move, np.maximum(up_move, 0), 0.0)
+    minus_dm = np.where(down_move > up_move, np.maximum(down_move, 0), 0.0)
+    return plus_dm, minus_dm
+
+
+def adx_series(high: np.ndarray, low: np.ndarray, tr_ewm: np.ndarray, period: int = 14):
+    """+DI, -DI, ADX (평활화된 TR 을 받아 재사용)"""
+    plus_dm, minus_dm = directional_movement(high, low)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        plus_di = 100 * ewm_mean(plus_dm, span=period) / tr_ewm
+        minus_di = 100 * ewm_mean(minus_dm, span=period) / tr_ewm
+        del plus_dm, minus_dm
+        dx = 100 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
+    return plus_di, minus_di, ewm_mean(dx, span=period)
+
+
+def trend_strength(adx_value: float) -> str:
+    if adx_value > 25:
+        return 'strong'
+    elif adx_value < 20:
+        return 'weak'
+    return 'moderate'
+
+
+def on_balance_volume(delta: np.ndarray, volume: np.ndarray) -> np.ndarray:
+    """OBV = sign(종가 변화) * 거래량 의 누적합"""
+    direction = np.sign(delta)
+    direction[0] = 0.0
+    return np.cumsum(direction * volume)
+
+
+def compute_indicator_series(high, low, close, volume=None,
+                             ma_periods: Sequence[int] = MA_PERIODS, rsi_period: int = 14,
+                             bb_period: int = 20, atr_period: int = 14, adx_period: int = 14,
+                             volume_period: int = 20, tail: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """모든 지표의 시계열 계산
+
+    Args:
+        tail: 지정하면 각 지표의 마지막 tail 개 값만 보관하고 전체 길이 배열은 바로 해제
+              (마지막 값만 필요한 실시간 분석에서 메모리 사용량을 줄이기 위함)
+
+    Returns:
+        지표 이름 -> float64 배열 (tail 이 없으면 입력과 같은 길이)
+    """
+    high = _as_array(high)
+    low = _as_array(low)
+    close = _as_array(close)
+    out: Dict[str, np.ndarray] = {}
+
+    def keep(name: str, values: np.ndarray):
+        out[name] = values[-tail:].copy() if tail else values
+
+    # 공유 중간값
+    prev_close = shift(close)
+    delta = close - prev_close
+
+    # 이동평균 (MACD/볼린저와 공유되는 기간은 전체 배열을 잠시 유지)
+    shared = {}
+    for period in ma_periods:
+        sma = rolling_mean(close, period)
+        ema = ewm_mean(close, span=period)
+        if period == bb_period:
+            shared['sma_bb'] = sma
+        if period in (12, 26):
+            shared[f'ema_{period}'] = ema
+        keep(f'ma_{period}', sma)
+        keep(f'ema_{period}', ema)
+        del sma, ema
+
+    # RSI
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    avg_gain = ewm_mean(gain, com=rsi_period - 1, adjust=True, min_periods=rsi_period)
+    avg_loss = ewm_mean(loss, com=rsi_period - 1, adjust=True, min_periods=rsi_period)
+    del gain, loss
+    with np.errstate(divide='ignore', invalid='ignore'):
+        keep('rsi', 100 - (100 / (1 + avg_gain / avg_loss)))
+    del avg_gain, avg_loss
+
+    # MACD
+    ema12 = shared.pop('ema_12', None)
+    ema12 = ewm_mean(close, span=12) if ema12 is None else ema12
+    ema26 = shared.pop('ema_26', None)
+    ema26 = ewm_mean(close, span=26) if ema26 is None else ema26
+    macd = ema12 - ema26
+    del ema12, ema26
+    signal = ewm_mean(macd, span=9)
+    keep('macd_hist', macd - signal)
+    keep('macd', macd)
+    keep('macd_signal', signal)
+    del macd, signal
+
+    # 볼린저 밴드
+    middle = shared.pop('sma_bb', None)
+    middle = rolling_mean(close, bb_period) if middle is None else middle
+    std2 = 2 * rolling_std(close, bb_period)
+    keep('bb_upper', middle + std2)
+    keep('bb_lower', middle - std2)
+    keep('bb_middle', middle)
+    del middle, std2
+
+    # ATR / ADX (TR 공유, 기간이 같으면 평활화된 TR 도 공유)
+    tr = true_range(high, low, prev_close)
+    del prev_close
+    tr_ewm = ewm_mean(tr, span=atr_period)
+    keep('atr', tr_ewm)
+    if adx_period != atr_period:
+        tr_ewm = ewm_mean(tr, span=adx_period)
+    del tr
+
+    plus_di, minus_di, adx = adx_series(high, low, tr_ewm, adx_period)
+    del tr_ewm
+    keep('plus_di', plus_di)
+    keep('minus_di', minus_di)
+    keep('adx', adx)
+    del plus_di, minus_di, adx
+
+    if volume is not None:
+        for name, values in compute_volume_series(close, volume, volume_period=volume_period, delta=delta).items():
+            keep(name, values)
+    return out
+
+
+def compute_volume_series(close, volume, volume_period: int = 20,
+                          delta: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """거래량 이동평균과 OBV 시계열"""
+    volume = _as_array(volume)
+    if delta is None:
+        close = _as_array(close)
+        delta = close - shift(close)
+    obv = on_balance_volume(delta, volume)
+    return {
+        'volume_sma': rolling_mean(volume, volume_period),
+        'obv': obv,
+        'obv_sma': rolling_mean(obv, volume_period)
+    }
+
+
+def _last(values: np.ndarray) -> float:
+    return float(values[-1])
+
+
+def summarize_indicators(series: Dict[str, np.ndarray], close,
+                         ma_periods: Sequence[int] = MA_PERIODS) -> Dict[str, dict]:
+    """지표 시계열의 마지막 값으로 get_technical_indicators 와 같은 구조의 결과 생성"""
+    close = _as_array(close)
+
+    mas = {}
+    for period in ma_periods:
+        mas[f'ma_{period}'] = _last(series[f'ma_{period}'])
+        mas[f'ema_{period}'] = _last(series[f'ema_{period}'])
+    mas['golden_cross'] = mas['ma_5'] > mas['ma_20'] and mas['ma_20'] > mas['ma_50']
+    mas['death_cross'] = mas['ma_5'] < mas['ma_20'] and mas['ma_20'] < mas['ma_50']
+
+    rsi = series['rsi']
+    divergence = 'none'
+    if len(close) >= 2:
+        recent_close_diff = np.diff(close[-5:]).mean()
+        recent_rsi_diff = np.diff(rsi[-5:]).mean()
+        if recent_close_diff < 0 and recent_rsi_diff > 0:
+            divergence = 'bullish'
+        elif recent_close_diff > 0 and recent_rsi_diff < 0:
+            divergence = 'bearish'
+
+    macd = series['macd']
+    signal = series['macd_signal']
+    if len(macd) < 2:
+        cross_above = False
+        cross_below = False
+    else:
+        cross_above = bool((macd[-1] > signal[-1]) and (macd[-2] <= signal[-2]))
+        cross_below = bool((macd[-1] < signal[-1]) and (macd[-2] >= signal[-2]))
+
+    upper_val = _last(series['bb_upper'])
+    middle_val = _last(series['bb_middle'])
+    lower_val = _last(series['bb_lower'])
+    bandwidth = (upper_val - lower_val) / middle_val if middle_val != 0 else 0.0
+    if (upper_val - lower_val) != 0:
+        position = (float(close[-1]) - lower_val) / (upper_val - lower_val)
+    else:
+        position = 0.0
+
+    adx_value = _last(series['adx'])
+
+    return {
+        'ma': mas,
+        'rsi': {
+            'current': _last(rsi),
+            'divergence': divergence
+        },
+        'macd': {
+            'macd': _last(macd),
+            'signal': _last(signal),
+            'histogram': _last(series['macd_hist']),
+            'cross_above': cross_above,
+            'cross_below': cross_below
+        },
+        'bollinger': {
+            'upper': upper_val,
+            'middle': middle_val,
+            'lower': lower_val,
+            'bandwidth': bandwidth,
+            'position': position
+        },
+        'atr': _last(series['atr']),
+        'adx': {
+            'adx': adx_value,
+            'trend_strength': trend_strength(adx_value)
+        }
+    }
+
+
+def summarize_volume(series: Dict[str, np.ndarray], volume) -> Dict[str, dict]:
+    """거래량 시계열의 마지막 값으로 get_volume_analysis 와 같은 구조의 결과 생성"""
+    current_vol = float(volume[-1])
+    vol_sma_current = _last(series['volume_sma'])
+    current_obv = _last(series['obv'])
+    sma_obv = _last(series['obv_sma'])
+    sma_obv = 0.0 if np.isnan(sma_obv) else sma_obv
+    return {
+        'volume_trend': {
+            'current_volume': current_vol,
+            'volume_sma': vol_sma_current,
+            'volume_trend': 'increasing' if current_vol > vol_sma_current else 'decreasing'
+        },
+        'obv': {
+            'current': current_obv,
+            'sma': sma_obv,
+            'trend': 'bullish' if current_obv > sma_obv else 'bearish'
+        }
+    }
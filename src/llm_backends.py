@@ -0,0 +1,260 @@
+"""트레이딩 조언용 LLM 백엔드와 마감 시간/헤지 요청
+
+TradingAdvisor 는 LLMBackend 인터페이스(generate, stream)만 사용하므로 Gemini 대신
+LocalBackend 를 넣으면 네트워크 없이 지연/장애 상황을 재현할 수 있다.
+
+HedgedRequest 는 첫 요청이 최근 지연 시간의 백분위수를 넘기면 같은 요청을 한 번 더 보내고
+(헤지), 마감 시간 안에 먼저 도착한 유효한 응답을 사용한다. 마감까지 아무것도 없으면 None.
+
+generate 의 timeout 은 호출 하나가 쓸 수 있는 남은 시간(초)이다. 백엔드는 그 안에 끝내지 못하면
+TimeoutError 를 내고, ConcurrencyLimitedBackend 는 자리를 기다린 시간까지 포함해 적용하므로
+마감을 넘긴 호출이 다음 사이클의 자리를 붙잡거나 그 뒤에 줄 서지 않는다.
+"""
+
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Union
+from collections import deque
+import os
+import queue
+import threading
+import time
+import logging
+import numpy as np
+import google.generativeai as genai
+from metrics import LLM_REQUEST_SECONDS, LLM_FIRST_CHUNK_SECONDS, LLM_REQUEST_ERRORS, LLM_SLOT_WAIT_SECONDS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+GEMINI_MODEL = 'gemini-2.0-flash-exp'
+# 헤지 포함 요청 하나가 동시에 보내는 최대 호출 수
+HEDGE_MAX_REQUESTS = 2
+
+
+class LLMBackend:
+    """프롬프트 -> 응답 텍스트 (temperature 가 None 이면 모델 기본값)"""
+
+    name = 'llm'
+
+    def generate(self, prompt: str, temperature: Optional[float] = None, timeout: Optional[float] = None) -> str:
+        raise NotImplementedError
+
+    def stream(self, prompt: str, temperature: Optional[float] = None) -> Iterator[str]:
+        """응답을 조각 단위로 생성 (기본 구현은 전체 응답 한 조각)"""
+        yield self.generate(prompt, temperature)
+
+
+class GeminiBackend(LLMBackend):
+    name = 'gemini'
+
+    def __init__(self, model_name: str = GEMINI_MODEL, api_key: Optional[str] = None,
+                 timeout: Optional[float] = None):
+        api_key = api_key or os.getenv('GEMINI_API_KEY')
+        if not api_key:
+            raise ValueError("Gemini API 키가 설정되지 않았습니다. .env 파일을 확인해주세요.")
+        genai.configure(api_key=api_key)
+        self.model = genai.GenerativeModel(model_name)
+        # 마감 시간을 넘긴 요청이 스레드를 계속 붙잡지 않도록 HTTP 타임아웃도 지정
+        self.request_options = {'timeout': timeout} if timeout else None
+
+    @staticmethod
+    def _generation_config(temperature: Optional[float]) -> Optional[Dict]:
+        return {'temperature': temperature} if temperature is not None else None
+
+    def generate(self, prompt: str, temperature: Optional[float] = None, timeout: Optional[float] = None) -> str:
+        request_options = {'timeout': timeout} if timeout else self.request_options
+        try:
+            with LLM_REQUEST_SECONDS.time(backend=self.name, mode='generate'):
+                response = self.model.generate_content(prompt, generation_config=self._generation_config(temperature),
+                                                       request_options=request_options)
+        except Exception:
+            LLM_REQUEST_ERRORS.inc(backend=self.name, mode='generate')
+            raise
+        return response.text if response else ''
+
+    def stream(self, prompt: str, temperature: Optional[float] = None) -> Iterator[str]:
+        started = time.perf_counter()
+        first = True
+        try:
+            for chunk in self.model.generate_content(prompt, stream=True,
+                                                     generation_config=self._generation_config(temperature),
+                                                     request_options=self.request_options):
+                if first:
+                    LLM_FIRST_CHUNK_SECONDS.observe(time.perf_counter() - started, backend=self.name)
+                    first = False
+                yield chunk.text
+        except Exception:
+            LLM_REQUEST_ERRORS.inc(backend=self.name, mode='stream')
+            raise
+        LLM_REQUEST_SECONDS.observe(time.perf_counter() - started, backend=self.name, mode='stream')
+
+
+class LocalBackend(LLMBackend):
+    """오프라인 대역 백엔드 (고정/함수 응답, 호출별 지연 시간 지정)
+
+    latency 가 시퀀스면 호출 순서대로 사용하고 마지막 값을 반복한다.
+    response 가 함수면 (prompt, temperature) 로 호출한다.
+    generate 에 timeout 보다 긴 지연이 걸리면 HTTP 타임아웃처럼 timeout 만큼 기다린 뒤 TimeoutError.
+    """
+
+    name = 'local'
+
+    def __init__(self, response: Union[str, Callable[[str, Optional[float]], str]],
+                 latency: Union[float, Sequence[float]] = 0.0, chunk_size: int = 16):
+        self.response = response
+        self.latencies = list(latency) if isinstance(latency, (list, tuple)) else [latency]
+        self.chunk_size = chunk_size
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _next_latency(self) -> float:
+        with self._lock:
+            latency = self.latencies[min(self.calls, len(self.latencies) - 1)]
+            self.calls += 1
+        return latency
+
+    def _respond(self, prompt: str, temperature: Optional[float]) -> str:
+        return self.response(prompt, temperature) if callable(self.response) else self.response
+
+    def generate(self, prompt: str, temperature: Optional[float] = None, timeout: Optional[float] = None) -> str:
+        latency = self._next_latency()
+        if timeout is not None and latency > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"{timeout:.1f}초 안에 응답 없음")
+        time.sleep(latency)
+        return self._respond(prompt, temperature)
+
+    def stream(self, prompt: str, temperature: Optional[float] = None) -> Iterator[str]:
+        time.sleep(self._next_latency())
+        text = self._respond(prompt, temperature)
+        for i in range(0, len(text), self.chunk_size):
+            yield text[i:i + self.chunk_size]
+
+
+class ConcurrencyLimitedBackend(LLMBackend):
+    """여러 심볼의 조언기가 공유하는 동시 호출 한도 (스트리밍은 응답을 다 받을 때까지 한 자리 차지)
+
+    헤지 요청과 앙상블 표본도 각각 한 자리를 차지하므로, 한도는 사이클 하나의 최대 동시 호출 수
+    (앙상블 표본 수, 아니면 HEDGE_MAX_REQUESTS) 이상이어야 하고 동시에 결정하는 심볼 수만큼 곱해야
+    대기 없이 호출 한 번 시간에 끝난다. 자리를 기다린 시간은 LLM_SLOT_WAIT_SECONDS 에 기록한다.
+    """
+
+    def __init__(self, backend: LLMBackend, semaphore: threading.BoundedSemaphore):
+        self.backend = backend
+        self.semaphore = semaphore
+        self.name = backend.name
+
+    def _acquire(self, timeout: Optional[float] = None) -> float:
+        """자리를 얻을 때까지 기다린 시간(초) 반환, timeout 안에 못 얻으면 TimeoutError"""
+        started = time.perf_counter()
+        acquired = self.semaphore.acquire(timeout=timeout)
+        waited = time.perf_counter() - started
+        LLM_SLOT_WAIT_SECONDS.observe(waited, backend=self.name)
+        if not acquired:
+            raise TimeoutError(f"LLM 호출 자리 대기 시간 초과 ({timeout:.1f}초)")
+        return waited
+
+    def generate(self, prompt: str, temperature: Optional[float] = None, timeout: Optional[float] = None) -> str:
+        waited = self._acquire(timeout)
+        try:
+            remaining = None if timeout is None else timeout - waited
+            if remaining is not None and remaining <= 0:
+                raise TimeoutError("LLM 호출 자리를 얻었지만 남은 시간 없음")
+            return self.backend.generate(prompt, temperature, remaining)
+        finally:
+            self.semaphore.release()
+
+    def stream(self, prompt: str, temperature: Optional[float] = None) -> Iterator[str]:
+        self._acquire()
+        try:
+            yield from self.backend.stream(prompt, temperature)
+        finally:
+            self.semaphore.release()
+
+
+class HedgedRequest:
+    """마감 시간 안에서 지연 백분위수를 넘긴 요청을 한 번 더 보내는 실행기"""
+
+    def __init__(self, deadline: float, hedge_percentile: float = 90.0, max_requests: int = HEDGE_MAX_REQUESTS,
+                 window: int = 100, min_samples: int = 5, initial_hedge_delay: Optional[float] = None):
+        self.deadline = deadline
+        self.hedge_percentile = hedge_percentile
+        self.max_requests = max_requests
+        self.min_samples = min_samples
+        # 지연 기록이 충분하지 않을 때는 마감 시간의 절반에서 헤지
+        self.initial_hedge_delay = initial_hedge_delay if initial_hedge_delay is not None else deadline / 2
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'hedged': 0, 'hedge_wins': 0, 'timeouts': 0, 'errors': 0}
+
+    def hedge_delay(self) -> float:
+        with self._lock:
+            latencies = list(self._latencies)
+        if len(latencies) < self.min_samples:
+            return min(self.initial_hedge_delay, self.deadline)
+        return min(float(np.percentile(latencies, self.hedge_percentile)), self.deadline)
+
+    def run(self, request: Callable[[], object], is_valid: Callable[[object], bool] = bool):
+        """request 를 실행해 마감 안에 처음 도착한 유효한 결과 반환 (없으면 None)
+
+        마감을 넘긴 요청은 취소할 수 없으므로 데몬 스레드에 남겨두고 결과는 버린다.
+        """
+        results: 'queue.Queue' = queue.Queue()
+        started = time.monotonic()
+        deadline_at = started + self.deadline
+        hedge_at = started + self.hedge_delay()
+
+        def attempt(index: int):
+            attempt_started = time.monotonic()
+            try:
+                results.put((index, request(), None, time.monotonic() - attempt_started))
+            except Exception as e:
+                results.put((index, None, e, time.monotonic() - attempt_started))
+
+        def launch(index: int):
+            threading.Thread(target=attempt, args=(index,), daemon=True, name=f'llm-request-{index}').start()
+
+        launched, finished = 1, 0
+        launch(0)
+        with self._lock:
+            self.stats['requests'] += 1
+        while True:
+            now = time.monotonic()
+            if now >= deadline_at:
+                break
+            can_hedge = launched < self.max_requests
+            wait_until = min(hedge_at, deadline_at) if can_hedge else deadline_at
+            try:
+                index, result, error, latency = results.get(timeout=max(0.0, wait_until - now))
+            except queue.Empty:
+                if can_hedge and time.monotonic() < deadline_at:
+                    logger.info(f"LLM 응답 지연 ({time.monotonic() - started:.1f}초), 헤지 요청 발송")
+                    launch(launched)
+                    launched += 1
+                    with self._lock:
+                        self.stats['hedged'] += 1
+                continue
+            finished += 1
+            if error is None and is_valid(result):
+                with self._lock:
+                    self._latencies.append(latency)
+                    if index > 0:
+                        self.stats['hedge_wins'] += 1
+                return result
+            with self._lock:
+                self.stats['errors'] += 1
+            logger.warning(f"LLM 요청 {index} 실패: {error or '유효하지 않은 응답'}")
+            # 실패한 요청이 있으면 헤지 시점을 기다리지 않고 바로 다음 요청 발송
+            if can_hedge:
+                launch(launched)
+                launched += 1
+            elif finished >= launched:
+                return None
+
+        with self._lock:
+            self.stats['timeouts'] += 1
+        logger.warning(f"LLM 마감 시간 초과 ({self.deadline:.1f}초, 요청 {launched}개)")
+        return None
+
+    def recent_latencies(self) -> List[float]:
+        with self._lock:
+            return list(self._latencies)
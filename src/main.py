@@ -1,17 +1,30 @@
 import os
 import time
 import threading
-from datetime import datetime, timedelta
+from typing import Dict, Optional
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from datetime import datetime
 from dotenv import load_dotenv
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Response, render_template, jsonify, request
 from data_collector import MarketDataCollector
 from fundamental_analyzer import FundamentalAnalyzer
 from sentiment_analyzer import SentimentAnalyzer
 from external_analyzer import ExternalAnalyzer
 from trading_advisor import TradingAdvisor
+from decision_cache import DecisionCache, build_features
+from decision_cascade import ModelCascade, TRIAGE_MODEL, parse_thresholds
+from llm_backends import GeminiBackend, ConcurrencyLimitedBackend, HEDGE_MAX_REQUESTS
+from rate_limiter import RateLimiter
 from wallet_position_tracker import WalletPositionTracker
 from trade_executor import TradeExecutor
-from database_updater import log_trade, update_trade, log_message
+from market_stream import BybitMarketStream
+from pipeline import Stage, StagePipeline, StageResult
+from cycle_scheduler import ServerClock, CycleScheduler
+from event_triggers import EventTrigger
+from symbol_scheduler import SymbolJob, SymbolScheduler, parse_allocations, parse_symbols
+from cycle_journal import CycleJournal, candle_columns
+from metrics import REGISTRY, CONTENT_TYPE, CYCLES, DECISIONS, EVENT_REACTION_SECONDS, instrument_flask
+from database_updater import log_trade, update_trade, log_message, log_decision
 from models import Session, Trade, TradingLog
 from sqlalchemy import func
 import logging
@@ -21,6 +34,10 @@ import json
 
 # Flask 앱 초기화
 app = Flask(__name__)
+# 트레이딩 스레드가 초기화한 공유 구성요소 (대시보드가 같은 실행기/요청 한도를 쓰도록)
+BOT_STATE: Dict = {}
+# 라우트별 처리 시간 지표
+instrument_flask(app)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -30,6 +47,11 @@ logger = logging.getLogger(__name__)
 def dashboard():
     return render_template('dashboard.html')
 
+@app.route('/metrics')
+def metrics():
+    """프로메테우스 수집용 지표"""
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
 @app.route('/api/trading_stats')
 def get_trading_stats():
     session = Session()
@@ -298,51 +320,376 @@ def get_trading_logs():
     finally:
         session.close()
 
+def _position_payload(executor: TradeExecutor, symbol: str) -> Dict:
+    position = executor._get_current_position(symbol)
+    return {
+        'symbol': symbol,
+        'side': position.get('side', 'NONE'),
+        'entry_price': position.get('entry_price', '0'),
+        'current_price': executor.get_current_price(symbol),
+        'size': position.get('size', '0'),
+        'leverage': position.get('leverage', '0'),
+        'unrealized_pnl': position.get('unrealised_pnl', '0')
+    }
+
 @app.route('/api/current_position')
 def get_current_position():
+    """심볼별 현재 포지션 (?symbol= 로 한 심볼, 없으면 첫 심볼을 최상위에 두고 전체 심볼은 positions 에)
+
+    트레이딩 스레드의 실행기를 재사용하므로 대시보드 조회도 공유 요청 한도 안에서 실행된다.
+    """
+    executor = BOT_STATE.get('executor')
+    if executor is None:
+        return jsonify({'error': '트레이딩 봇 초기화 중입니다'}), 503
     try:
-        executor = TradeExecutor(
-            api_key=os.getenv('BYBIT_API_KEY'),
-            secret_key=os.getenv('BYBIT_SECRET_KEY')
-        )
-        position = executor._get_current_position("BTCUSDT")
+        symbol = request.args.get('symbol')
+        if symbol:
+            return jsonify(_position_payload(executor, symbol.upper()))
+        positions = [_position_payload(executor, symbol) for symbol in BOT_STATE['symbols']]
+        return jsonify(dict(positions[0], positions=positions))
+    except Exception as e:
+        logger.error(f"현재 포지션 조회 실패: {e}")
+        return jsonify({'error': str(e)}), 500
+
+# 수집 단계별 기본 마감 시간 (초). STAGE_DEADLINE_<단계명> 환경 변수로 조정
+STAGE_DEADLINES = {
+    'technical': 45,
+    'fundamental': 20,
+    'sentiment': 10,
+    'external': 20,
+    'wallet': 10,
+}
+
+# 캔들 마감 전에 미리 실행하는 단계
+PREFETCH_STAGES = ['fundamental', 'sentiment', 'external', 'wallet']
+
+def build_cycle_stages(collector, wallet_tracker, symbol, timeframe='1h'):
+    """사이클의 독립적인 수집 단계 목록 (각 단계는 (리포트 문자열, 특징용 지표) 반환)"""
+    def technical():
+        report = collector.prepare_llm_input(symbol=symbol, timeframe=timeframe)
+        # 저널에는 결정에 쓴 캔들 구간을 이 시점에 복사해 남김 (주문 후 다시 조회하면 새 봉이 섞일 수 있음)
+        candles = collector.latest_windows.get(symbol)
+        return report, collector.latest_metrics.get(symbol, {}), candle_columns(candles) if candles is not None else {}
+
+    def fundamental():
+        analyzer = FundamentalAnalyzer()
+        return analyzer.prepare_fundamental_analysis(), analyzer.latest_metrics
+
+    def sentiment():
+        analyzer = SentimentAnalyzer()
+        return analyzer.prepare_sentiment_analysis(), analyzer.latest_metrics
+
+    def external():
+        analyzer = ExternalAnalyzer()
+        return analyzer.prepare_external_analysis(), analyzer.latest_metrics
+
+    def wallet():
+        report = wallet_tracker.prepare_account_status(symbol=symbol)
+        return report, wallet_tracker.latest_status
+
+    def deadline(name):
+        return float(os.getenv(f'STAGE_DEADLINE_{name.upper()}', STAGE_DEADLINES[name]))
+
+    return [
+        # 기술적 분석과 지갑 상태 없이는 결정하지 않음. 포지션 정보는 이전 값을 재사용하지 않음
+        Stage('technical', technical, deadline('technical'), max_stale=0, required=True),
+        Stage('fundamental', fundamental, deadline('fundamental'),
+              placeholder=("기본적 분석 데이터를 수집할 수 없습니다. (응답 지연)", {}), max_stale=6 * 3600),
+        Stage('sentiment', sentiment, deadline('sentiment'),
+              placeholder=("시장 심리 분석을 수행할 수 없습니다. (응답 지연)", {}), max_stale=6 * 3600),
+        Stage('external', external, deadline('external'),
+              placeholder=("외부 요인 분석을 수행할 수 없습니다. (응답 지연)", {}), max_stale=6 * 3600),
+        Stage('wallet', wallet, deadline('wallet'), max_stale=0, required=True),
+    ]
+
+def stage_section(result: StageResult):
+    """단계 결과를 (리포트 문자열, 지표) 로 변환. 이전 사이클 값이면 리포트에 표시"""
+    report, metrics = result.value[:2]
+    if result.status == 'stale':
+        report = f"[지연된 데이터: {result.age / 60:.0f}분 전 수집]\n{report}"
+    return report, metrics
+
+def wait_rationale(rationale: Future, timeout: float) -> str:
+    """스트리밍 결정 근거를 기다려 반환 (timeout 초 안에 끝나지 않거나 실패하면 사유 문자열, 0 이면 제한 없음)"""
+    try:
+        return rationale.result(timeout=timeout or None)
+    except FutureTimeoutError:
+        logger.error(f"결정 근거 수신이 {timeout:g}초 안에 끝나지 않음")
+        return f"결정 근거 수신 시간 초과 ({timeout:g}초)"
+    except Exception as e:
+        logger.error(f"결정 근거 수신 중 에러 발생: {e}")
+        return f"결정 근거 수신 실패: {e}"
+
+def build_symbol_job(symbol, timeframe, api_key, api_secret, shared):
+    """심볼별 구성요소 (지갑 조회, 수집 단계, 조언기, 스케줄러) 생성. 거래소/LLM 한도와 주문 실행기는 공유"""
+    config = shared['config']
+    collector = shared['collector']
+    wallet_tracker = WalletPositionTracker(
+        api_key=api_key,
+        secret_key=api_secret,
+        rate_limiter=shared['rate_limiter']
+    )
+    trading_advisor = TradingAdvisor(
+        decision_cache=shared['decision_cache'],
+        backend=shared['llm_backend'],
+        deadline=config['llm_deadline'] if config['llm_deadline'] > 0 else None,
+        hedge_percentile=config['llm_hedge_percentile'],
+        ensemble_size=config['llm_ensemble_size'],
+        ensemble_vote=config['llm_ensemble_vote'],
+        cascade=ModelCascade(
+            triage_backend=shared['triage_backend'],
+            thresholds=config['llm_cascade_thresholds']
+        ) if config['llm_cascade'] in ('rules', 'llm') else None
+    )
+    scheduler = CycleScheduler(shared['server_clock'], timeframe=timeframe,
+                               prefetch_lead=config['prefetch_lead'])
+    return SymbolJob(symbol, scheduler, components={
+        'shared': shared,
+        'stream': shared['streams'][timeframe],
+        'trading_advisor': trading_advisor,
+        # 독립적인 수집 단계를 동시에 실행 (단계별 마감 초과 시 이전 값 또는 데이터 없음으로 진행)
+        'stage_pipeline': StagePipeline(build_cycle_stages(collector, wallet_tracker, symbol, timeframe),
+                                        name=symbol),
+    })
+
+def prefetch_symbol_cycle(job: SymbolJob, close_ms: int) -> Dict:
+    """마감 전 사전 수집: 캔들과 무관한 단계(펀더멘털/심리/외부/계정)를 미리 실행"""
+    job.scheduler.clock.maybe_sync()
+    stage_pipeline = job.components['stage_pipeline']
+    logger.info(f"=== 트레이딩 봇 실행 시작: {job.symbol} {job.timeframe} ===")
+    logger.info(f"현재 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    stages = stage_pipeline.run(PREFETCH_STAGES, phase='prefetch')
+    return {'stages': stages, 'timing': {'prefetch': stage_pipeline.last_timing}}
+
+def run_symbol_cycle(job: SymbolJob, close_ms: Optional[int], prefetched: Optional[Dict] = None,
+                     event: Optional[Dict] = None):
+    """심볼 하나의 마감 단계: 기술적 분석 -> 조언 -> 주문 -> 기록
+
+    스케줄러가 확정봉을 조회할 수 있을 때 넘기므로 여기서는 기다리지 않는다. 사전 수집 결과가 없으면
+    (실패) 모든 단계를 함께 수집한다. event 가 있으면 (이벤트 트리거) 모든 단계를 바로 실행하고,
+    리포트 앞에 트리거 사유와 현재가를 붙인다.
+    """
+    symbol, timeframe = job.symbol, job.timeframe
+    shared = job.components['shared']
+    config = shared['config']
+    collector = shared['collector']
+    executor = shared['executor']
+    cycle_journal = shared['cycle_journal']
+    event_trigger = shared.get('event_trigger')
+    trading_advisor = job.components['trading_advisor']
+    stage_pipeline = job.components['stage_pipeline']
+    scheduler = job.scheduler
+    current_price = None
+    try:
+        if event is None and prefetched is not None:
+            # 마감 직후에는 확정봉만 받아 기술적 분석 실행
+            stages, stage_timing = dict(prefetched['stages']), dict(prefetched['timing'])
+            stages.update(stage_pipeline.run(['technical'], phase='close'))
+            stage_timing['close'] = stage_pipeline.last_timing
+        elif event is None:
+            stages = stage_pipeline.run(phase='close')
+            stage_timing = {'close': stage_pipeline.last_timing}
+        else:
+            close_ms = scheduler.clock.now_ms()
+            logger.info(f"=== 이벤트 사이클 실행 시작: {symbol} ({event['condition']}: {event['detail']}) ===")
+            stages = stage_pipeline.run(phase='event')
+            stage_timing = {'event': stage_pipeline.last_timing}
+        technical_analysis, technical_metrics = stage_section(stages['technical'])
+        fundamental_analysis, fundamental_metrics = stage_section(stages['fundamental'])
+        sentiment_analysis, sentiment_metrics = stage_section(stages['sentiment'])
+        external_analysis, external_metrics = stage_section(stages['external'])
+        account_status, account_metrics = stage_section(stages['wallet'])
         
-        # 현재가 조회
-        response = executor.client.get_tickers(
-            category="linear",
-            symbol="BTCUSDT"
+        # 트레이딩 조언 얻기
+        features = build_features(
+            account=account_metrics,
+            technical=technical_metrics,
+            sentiment=sentiment_metrics,
+            macro={**fundamental_metrics, **external_metrics}
         )
-        current_price = float(response['result']['list'][0]['lastPrice'])
+        report = f"{account_status}\n{technical_analysis}\n{fundamental_analysis}\n{sentiment_analysis}\n{external_analysis}"
+        if event is not None:
+            # 기술적 분석은 확정봉 기준이므로 봉 중간에 발생한 움직임을 리포트에 명시
+            report = (f"[정규 주기 밖 이벤트 사이클: {event['detail']}, "
+                      f"마지막 결정 시 가격 {event['reference_price']} -> 현재가 {event['price']}]\n{report}")
+        rationale, full_analysis = None, None
+        if config['llm_ensemble_size'] > 1:
+            decision, full_analysis, _ = trading_advisor.get_ensemble_advice(report, features=features)
+        elif config['llm_streaming']:
+            decision, rationale = trading_advisor.get_trading_advice_streaming(report, features=features)
+        else:
+            decision, full_analysis = trading_advisor.get_trading_advice(report, features=features)
+        
+        # 포지션 신호 표준화
+        position_mapping = {
+            'CLOSE': ['CLOSE', 'Close', 'close'],
+            'LONG->SHORT': ['LONG->SHORT', 'Long->Short', 'long->short'],
+            'SHORT->LONG': ['SHORT->LONG', 'Short->Long', 'short->long'],
+            'LONG': ['LONG', 'Long', 'long'],
+            'SHORT': ['SHORT', 'Short', 'short'],
+            'HOLD': ['HOLD', 'Hold', 'hold']
+        }
+        
+        position_signal = decision.get('position', 'Hold')
+        for standard_position, variants in position_mapping.items():
+            if position_signal in variants:
+                decision['position'] = standard_position
+                break
+        else:
+            decision['position'] = 'HOLD'
+        
+        logger.info(f"{symbol} 결정된 포지션: {decision['position']}")
+        
+        # TradeExecutor로 거래 실행
+        try:
+            result = executor.execute_trade(symbol=symbol, trading_decision=decision)
+            if event is None:
+                close_to_order = scheduler.record_order(close_ms, symbol=symbol)
+            else:
+                # 이벤트 사이클은 조건을 처음 감지한 시각부터 주문까지
+                close_to_order = time.time() - event['detected_at']
+                EVENT_REACTION_SECONDS.observe(close_to_order, symbol=symbol, condition=event['condition'])
+            current_price = executor.get_current_price(symbol)
+            if rationale is not None:
+                # 주문 이후 백그라운드에서 생성이 끝난 결정 근거를 받아 기록
+                full_analysis = wait_rationale(rationale, config['llm_rationale_timeout'])
+            
+            trade_id = None
+            if result:  # 거래가 성공했을 때
+                trade_id = log_trade(
+                    symbol=symbol,
+                    position_type=decision['position'],
+                    leverage=int(decision.get('leverage', 0)),
+                    investment_ratio=float(decision.get('investment_ratio', 0)),
+                    entry_price=current_price,
+                    decision_reason=full_analysis
+                )
+                update_trade(symbol, current_price)
+            else:
+                if decision['position'] == 'HOLD':
+                    log_message("Info", f"HOLD 포지션 유지 ({symbol})", decision_reason=full_analysis)
+                else:
+                    log_message("Warning", 
+                               f"거래 실행 건너뜀 ({symbol}, 포지션: {decision['position']})", 
+                               position_type=decision['position'],
+                               decision_reason=full_analysis)
+            # 결정을 내린 단계(캐시/1차 판별/LLM/앙상블/대체)와 앙상블 합의 통계를 거래와 연결해서 보관
+            decision_info = trading_advisor.last_decision_info
+            DECISIONS.inc(tier=decision_info.get('tier', 'llm'), position=decision['position'])
+            log_decision(symbol, decision_info.get('tier', 'llm'), decision['position'],
+                         details=dict(decision_info, stages=stage_timing,
+                                      close_to_order=round(close_to_order, 3),
+                                      event=event),
+                         trade_id=trade_id)
+                    
+        except Exception as e:
+            if rationale is not None and full_analysis is None:
+                full_analysis = wait_rationale(rationale, config['llm_rationale_timeout'])
+            error_msg = f"거래 실행 중 예외 발생 ({symbol}): {str(e)}"
+            log_message("Error", error_msg, 
+                        position_type=decision.get('position'),
+                        decision_reason=full_analysis)
+            logger.error(error_msg)
+
+        # 사이클 입력 전체를 저널에 기록 (기록 실패는 거래에 영향 없음)
+        if cycle_journal is not None:
+            try:
+                cycle_journal.append({
+                    'cycle_ms': close_ms,
+                    'symbol': symbol,
+                    'timeframe': timeframe,
+                    'candles': stages['technical'].value[2],
+                    'technical': technical_metrics,
+                    'sentiment': sentiment_metrics,
+                    'macro': {**fundamental_metrics, **external_metrics},
+                    'account': account_metrics,
+                    'features': features,
+                    'report': report,
+                    'prompt': trading_advisor.last_prompt,
+                    'response': full_analysis,
+                    'decision': decision,
+                    'decision_info': trading_advisor.last_decision_info,
+                    'stages': stage_timing,
+                    'event': event,
+                })
+            except Exception as e:
+                logger.error(f"사이클 저널 기록 실패: {e}")
+
+        # 이벤트 트리거 기준값(가격, ATR, 볼린저 밴드, 펀딩비)을 이번 결정 시점으로 갱신
+        if event_trigger is not None:
+            event_trigger.record_decision(symbol, collector.latest_metrics.get(symbol, {}), price=current_price)
+
+        CYCLES.inc(symbol=symbol, result='ok')
+        logger.info(f"=== 트레이딩 봇 실행 완료: {symbol} ===\n")
         
-        return jsonify({
-            'side': position.get('side', 'NONE'),
-            'entry_price': position.get('entry_price', '0'),
-            'current_price': current_price,
-            'size': position.get('size', '0'),
-            'leverage': position.get('leverage', '0'),
-            'unrealized_pnl': position.get('unrealised_pnl', '0')
-        })
     except Exception as e:
-        logger.error(f"현재 포지션 조회 실패: {e}")
-        return jsonify({'error': str(e)}), 500
+        CYCLES.inc(symbol=symbol, result='error')
+        error_msg = f"트레이딩 봇 실행 중 에러 발생 ({symbol}): {str(e)}"
+        log_message("Error", error_msg)
+        logger.error(error_msg)
+
+def llm_slots_needed(config: Dict) -> int:
+    """심볼 하나의 사이클이 동시에 보내는 최대 LLM 호출 수
+
+    앙상블 모드면 표본 수만큼 동시에 보내고, 아니면 마감 시간이 있을 때 헤지 요청까지 HEDGE_MAX_REQUESTS 개.
+    공유 동시 호출 한도가 이보다 작으면 나머지 호출이 한도 대기 중에 마감을 넘겨 앙상블/헤지가 호출 한 번 시간에
+    끝나지 않는다.
+    """
+    if config['llm_ensemble_size'] > 1:
+        return config['llm_ensemble_size']
+    return HEDGE_MAX_REQUESTS if config['llm_deadline'] > 0 else 1
+
+def llm_concurrency_limit(config: Dict) -> int:
+    """공유 LLM 동시 호출 한도 (지정하지 않으면 모든 심볼이 동시에 결정해도 기다리지 않는 값)"""
+    needed = llm_slots_needed(config)
+    limit = config['llm_max_concurrency'] or needed * len(config['symbols'])
+    if limit < needed:
+        logger.warning(f"LLM_MAX_CONCURRENCY={limit} 가 사이클 하나의 동시 호출 수({needed})보다 작아 "
+                       f"앙상블/헤지 호출이 한도를 기다리다 마감 시간을 넘길 수 있습니다")
+    elif limit < needed * len(config['symbols']):
+        logger.info(f"LLM 동시 호출 한도 {limit}: 여러 심볼이 동시에 결정하면 일부는 한도를 기다림")
+    return limit
 
 def run_trading_bot():
-    """트레이딩 봇 실행"""
+    """트레이딩 봇 실행 (TRADING_SYMBOLS 의 심볼별 주기로 사이클 실행)"""
+    config = {
+        # 운용 심볼과 주기 ('BTCUSDT:1h,ETHUSDT:4h', 주기 생략 시 1h)
+        'symbols': parse_symbols(os.getenv('TRADING_SYMBOLS', 'BTCUSDT:1h')),
+        # 심볼별 자본 배분 비율 ('BTCUSDT:0.5,ETHUSDT:0.3', 지정하지 않은 심볼은 나머지를 똑같이 나눔)
+        'symbol_allocations': os.getenv('SYMBOL_ALLOCATIONS', ''),
+        # 동시에 실행할 심볼 사이클 수 (기본: 심볼 수)
+        'symbol_workers': int(os.getenv('SYMBOL_WORKERS', '0')),
+        # 모든 심볼이 공유하는 Gemini 동시 호출 수 (0 이면 사이클당 최대 호출 수 * 심볼 수, llm_slots_needed 참고)
+        'llm_max_concurrency': int(os.getenv('LLM_MAX_CONCURRENCY', '0')),
+        # 마감 몇 초 전에 캔들과 무관한 단계(펀더멘털/심리/외부/계정)를 시작할지
+        'prefetch_lead': float(os.getenv('PREFETCH_LEAD_SECONDS', '180')),
+        # 결정 캐시 유효 시간 (초, 0 이면 매 사이클 LLM 호출)
+        'decision_cache_ttl': float(os.getenv('DECISION_CACHE_TTL', '0')),
+        # 스트리밍 모드: 트레이딩 신호가 나오는 즉시 주문하고 결정 근거는 주문 후 기록
+        'llm_streaming': os.getenv('LLM_STREAMING', '0') == '1',
+        # 주문 후 결정 근거를 기다리는 최대 시간 (초, 0 이면 제한 없음)
+        'llm_rationale_timeout': float(os.getenv('LLM_RATIONALE_TIMEOUT', '120')),
+        # LLM 마감 시간 (초, 0 이면 제한 없음). 넘기면 지표 기반 규칙으로 결정
+        'llm_deadline': float(os.getenv('LLM_DEADLINE', '30')),
+        'llm_hedge_percentile': float(os.getenv('LLM_HEDGE_PERCENTILE', '90')),
+        # 앙상블 모드: 2 이상이면 프롬프트 여러 개를 동시에 보내 투표 ('majority' 또는 'confidence')
+        'llm_ensemble_size': int(os.getenv('LLM_ENSEMBLE_SIZE', '1')),
+        'llm_ensemble_vote': os.getenv('LLM_ENSEMBLE_VOTE', 'majority'),
+        # 캐스케이드: off, rules (지표 점수로만 1차 판별), llm (애매한 구간은 저렴한 모델에 한 번 더 확인)
+        'llm_cascade': os.getenv('LLM_CASCADE', 'off'),
+        # 캐스케이드 점수 기준 ('rsi_high:75,hold_score:0.8', 지정하지 않은 값은 decision_cascade.DEFAULT_THRESHOLDS)
+        'llm_cascade_thresholds': parse_thresholds(os.getenv('LLM_CASCADE_THRESHOLDS', '')),
+        # 이벤트 트리거: 급변 시 정규 주기 밖에서 사이클 실행 (조건별 0 이면 사용 안 함)
+        'event_triggers': os.getenv('EVENT_TRIGGERS', '0') == '1',
+        'event_atr_multiple': float(os.getenv('EVENT_ATR_MULTIPLE', '2.0')),
+        'event_bollinger': os.getenv('EVENT_BOLLINGER', '1') == '1',
+        'event_funding_spike': float(os.getenv('EVENT_FUNDING_SPIKE', '0.0005')),
+        'event_confirm_seconds': float(os.getenv('EVENT_CONFIRM_SECONDS', '10')),
+        'event_cooldown': float(os.getenv('EVENT_COOLDOWN_SECONDS', '900')),
+        'event_max_per_hour': int(os.getenv('EVENT_MAX_PER_HOUR', '2')),
+    }
     while True:
         try:
-            current_time = datetime.now()
-            # 다음 시간 정각 계산
-            next_hour = current_time.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
-            # 다음 실행까지 대기 시간 계산 (1분 추가)
-            wait_seconds = (next_hour - current_time).total_seconds() + 60
-            
-            logger.info(f"다음 실행 시간까지 대기: {wait_seconds/60:.1f}분")
-            time.sleep(wait_seconds)
-            
-            current_time = datetime.now()
-            logger.info(f"=== 트레이딩 봇 실행 시작 ===")
-            logger.info(f"현재 시간: {current_time.strftime('%Y-%m-%d %H:%M:%S')}")
-            
             # API 키 가져오기
             api_key = os.getenv('BYBIT_API_KEY')
             api_secret = os.getenv('BYBIT_SECRET_KEY')
@@ -350,106 +697,90 @@ def run_trading_bot():
             if not api_key or not api_secret:
                 raise ValueError("API 키가 설정되지 않았습니다. .env 파일을 확인해주세요.")
             
-            # 데이터 수집 및 분석
+            # 모든 심볼이 하나의 바이비트 요청 예산과 LLM 동시 호출 한도를 공유
+            rate_limiter = RateLimiter()
+            llm_slots = threading.BoundedSemaphore(llm_concurrency_limit(config))
+            llm_deadline = config['llm_deadline']
+            # 캔들 캐시를 유지하기 위해 데이터 수집기와 거래소 클라이언트를 쓰는 구성요소는 사이클 간에 재사용
             collector = MarketDataCollector(
                 api_key=api_key,
-                secret_key=api_secret
+                secret_key=api_secret,
+                rate_limiter=rate_limiter
             )
-            symbol = "BTCUSDT"
-            technical_analysis = collector.prepare_llm_input(symbol=symbol, timeframe="1h")
-            
-            fundamental_analyzer = FundamentalAnalyzer()
-            fundamental_analysis = fundamental_analyzer.prepare_fundamental_analysis()
-            
-            sentiment_analyzer = SentimentAnalyzer()
-            sentiment_analysis = sentiment_analyzer.prepare_sentiment_analysis()
-            
-            external_analyzer = ExternalAnalyzer()
-            external_analysis = external_analyzer.prepare_external_analysis()
-            
-            # 지갑 및 포지션 상태 조회
-            wallet_tracker = WalletPositionTracker(
-                api_key=api_key,
-                secret_key=api_secret
-            )
-            account_status = wallet_tracker.prepare_account_status(symbol="BTCUSDT")
-            
-            # 트레이딩 조언 얻기
-            trading_advisor = TradingAdvisor()
-            decision, full_analysis = trading_advisor.get_trading_advice(
-                f"{account_status}\n{technical_analysis}\n{fundamental_analysis}\n{sentiment_analysis}\n{external_analysis}"
-            )
-            
-            # 트레이딩 실행
+            # 캔들 마감은 로컬 시계가 아닌 거래소 서버 시간 기준
+            server_clock = ServerClock(collector.exchange)
+            server_clock.sync()
+            collector.candle_store.clock = server_clock.now_ms
+            # 확정봉/체결가 실시간 수신 (타임프레임별 연결 하나, 끊기면 REST 조회로 대체)
+            streams = {}
+            for timeframe in sorted({tf for _, tf in config['symbols']}):
+                streams[timeframe] = BybitMarketStream(
+                    symbols=[s for s, tf in config['symbols'] if tf == timeframe],
+                    timeframe=timeframe,
+                    candle_store=collector.candle_store
+                )
+                streams[timeframe].start()
+            # 심볼별 주문 잠금/포지션 상태는 실행기 안에서 관리
+            # (체결가 피드는 첫 타임프레임 연결을 쓰고, 그 연결에 없는 심볼은 REST 로 시세 조회)
             executor = TradeExecutor(
                 api_key=api_key,
-                secret_key=api_secret
+                secret_key=api_secret,
+                price_feed=next(iter(streams.values())),
+                rate_limiter=rate_limiter,
+                allocations=parse_allocations(config['symbol_allocations'],
+                                              [symbol for symbol, _ in config['symbols']])
             )
-            symbol = "BTCUSDT"
-            
-            # 포지션 신호 표준화
-            position_mapping = {
-                'CLOSE': ['CLOSE', 'Close', 'close'],
-                'LONG->SHORT': ['LONG->SHORT', 'Long->Short', 'long->short'],
-                'SHORT->LONG': ['SHORT->LONG', 'Short->Long', 'short->long'],
-                'LONG': ['LONG', 'Long', 'long'],
-                'SHORT': ['SHORT', 'Short', 'short'],
-                'HOLD': ['HOLD', 'Hold', 'hold']
+            shared = {
+                'config': config,
+                'rate_limiter': rate_limiter,
+                'collector': collector,
+                'server_clock': server_clock,
+                'streams': streams,
+                'executor': executor,
+                # 마감 시간(초)이 있으면 HTTP 요청에도 같은 타임아웃 적용
+                'llm_backend': ConcurrencyLimitedBackend(
+                    GeminiBackend(timeout=llm_deadline if llm_deadline > 0 else None), llm_slots),
+                'triage_backend': ConcurrencyLimitedBackend(
+                    GeminiBackend(os.getenv('LLM_TRIAGE_MODEL', TRIAGE_MODEL), timeout=10), llm_slots
+                ) if config['llm_cascade'] == 'llm' else None,
+                # 결정 캐시 키에 심볼이 들어가므로 모든 심볼이 하나의 캐시를 공유
+                'decision_cache': DecisionCache(ttl=config['decision_cache_ttl'])
+                if config['decision_cache_ttl'] > 0 else None,
+                # 사이클 입력 저널 (오프라인 재생용, CYCLE_JOURNAL=0 이면 기록 안 함)
+                'cycle_journal': CycleJournal() if os.getenv('CYCLE_JOURNAL', '1') == '1' else None,
             }
-            
-            position_signal = decision.get('position', 'Hold')
-            for standard_position, variants in position_mapping.items():
-                if position_signal in variants:
-                    decision['position'] = standard_position
-                    break
-            else:
-                decision['position'] = 'HOLD'
-            
-            logger.info(f"결정된 포지션: {decision['position']}")
-            
-            # TradeExecutor로 거래 실행
-            try:
-                result = executor.execute_trade(symbol=symbol, trading_decision=decision)
-                current_price = executor.get_current_price(symbol)
-                
-                if result:  # 거래가 성공했을 때
-                    log_trade(
-                        symbol=symbol,
-                        position_type=decision['position'],
-                        leverage=int(decision.get('leverage', 0)),
-                        investment_ratio=float(decision.get('investment_ratio', 0)),
-                        entry_price=current_price,
-                        decision_reason=full_analysis
-                    )
-                    update_trade(symbol, current_price)
-                else:
-                    if decision['position'] == 'HOLD':
-                        log_message("Info", "HOLD 포지션 유지", decision_reason=full_analysis)
-                    else:
-                        log_message("Warning", 
-                                   f"거래 실행 건너뜀 (포지션: {decision['position']})", 
-                                   position_type=decision['position'],
-                                   decision_reason=full_analysis)
-                        
-            except Exception as e:
-                error_msg = f"거래 실행 중 예외 발생: {str(e)}"
-                log_message("Error", error_msg, 
-                            position_type=decision.get('position'),
-                            decision_reason=full_analysis)
-                logger.error(error_msg)
-            
-            logger.info("=== 트레이딩 봇 실행 완료 ===\n")
-            
-            # 테스트를 위해 10초 대기 후 다시 실행
-            time.sleep(60)
-            
+            jobs = [build_symbol_job(symbol, timeframe, api_key, api_secret, shared)
+                    for symbol, timeframe in config['symbols']]
+            BOT_STATE.update(executor=executor, symbols=[symbol for symbol, _ in config['symbols']])
+            break
         except Exception as e:
-            error_msg = f"트레이딩 봇 실행 중 에러 발생: {str(e)}"
+            error_msg = f"트레이딩 봇 초기화 중 에러 발생: {str(e)}"
             log_message("Error", error_msg)
             logger.error(error_msg)
             # 에러 발생 시 1분 대기 후 재시도
             time.sleep(60)
 
+    symbol_scheduler = SymbolScheduler(jobs, run_symbol_cycle, prefetch=prefetch_symbol_cycle,
+                                       max_workers=config['symbol_workers'] or None)
+    if config['event_triggers']:
+        stream_for = {symbol: streams[timeframe] for symbol, timeframe in config['symbols']}
+        # 기준값은 각 심볼의 첫 결정 사이클이 끝난 뒤부터 생김 (그 전에는 발동하지 않음)
+        shared['event_trigger'] = EventTrigger(
+            [symbol for symbol, _ in config['symbols']],
+            on_event=symbol_scheduler.trigger,
+            price_source=lambda symbol: stream_for[symbol].get_last_price(symbol),
+            fallback_price_source=executor.get_current_price,
+            funding_source=lambda symbol: stream_for[symbol].get_funding_rate(symbol),
+            atr_multiple=config['event_atr_multiple'],
+            bollinger=config['event_bollinger'],
+            funding_spike=config['event_funding_spike'],
+            confirm_seconds=config['event_confirm_seconds'],
+            cooldown=config['event_cooldown'],
+            max_per_hour=config['event_max_per_hour']
+        )
+        shared['event_trigger'].start()
+    symbol_scheduler.run_forever()
+
 def main():
     load_dotenv()
     
@@ -0,0 +1,204 @@
+"""바이비트 v5 공개 WebSocket(kline/tickers) 실시간 시세 수신기
+
+확정봉은 캔들 저장소에 바로 반영하고 최신 체결가는 메모리에 보관한다.
+연결이 끊기거나 데이터가 오래되면 조회 함수가 None 을 반환하므로
+호출하는 쪽은 기존 REST 조회로 대체하면 된다.
+"""
+
+from typing import Callable, Dict, List, Optional
+import json
+import threading
+import time
+import logging
+import websocket
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BYBIT_PUBLIC_LINEAR_URL = "wss://stream.bybit.com/v5/public/linear"
+
+# 바이비트 kline interval <-> ccxt 타임프레임
+INTERVAL_TO_TIMEFRAME = {
+    '1': '1m', '3': '3m', '5': '5m', '15': '15m', '30': '30m',
+    '60': '1h', '120': '2h', '240': '4h', '360': '6h', '720': '12h',
+    'D': '1d', 'W': '1w', 'M': '1M'
+}
+TIMEFRAME_TO_INTERVAL = {tf: interval for interval, tf in INTERVAL_TO_TIMEFRAME.items()}
+
+
+class BybitMarketStream:
+    """kline/tickers 토픽을 구독해 최신 확정봉과 체결가를 유지"""
+
+    def __init__(self, symbols: List[str], timeframe: str = '1h', url: str = BYBIT_PUBLIC_LINEAR_URL,
+                 candle_store=None, on_closed_bar: Optional[Callable[[str, str, list], None]] = None,
+                 heartbeat_interval: float = 20, max_backoff: float = 30):
+        self.symbols = list(symbols)
+        self.timeframe = timeframe
+        self.interval = TIMEFRAME_TO_INTERVAL[timeframe]
+        self.url = url
+        self.candle_store = candle_store
+        self.on_closed_bar = on_closed_bar
+        self.heartbeat_interval = heartbeat_interval
+        self.max_backoff = max_backoff
+
+        self.connected = False
+        self._running = False
+        self._ws: Optional[websocket.WebSocketApp] = None
+        self._thread: Optional[threading.Thread] = None
+        self._condition = threading.Condition()
+
+        # symbol -> (가격, 수신 시각 epoch 초)
+        self._last_price: Dict[str, tuple] = {}
+        # symbol -> [timestamp, open, high, low, close, volume]
+        self._last_closed_bar: Dict[str, list] = {}
+        # symbol -> 펀딩비
+        self._funding_rate: Dict[str, float] = {}
+
+    # ---- 공개 API ----
+
+    def start(self):
+        """백그라운드 스레드에서 연결 (끊기면 지수 백오프로 재연결)"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="bybit-market-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._ws:
+            self._ws.close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def get_last_price(self, symbol: str, max_age: float = 5.0) -> Optional[float]:
+        """최신 체결가 (연결이 끊겼거나 max_age 초보다 오래됐으면 None)"""
+        entry = self._last_price.get(symbol)
+        if not self.connected or entry is None:
+            return None
+        price, received_at = entry
+        if time.time() - received_at > max_age:
+            return None
+        return price
+
+    def get_funding_rate(self, symbol: str) -> Optional[float]:
+        """최신 펀딩비 (delta 메시지는 값이 바뀔 때만 오므로 수신 시각과 무관하게 연결 중이면 유효)"""
+        if not self.connected:
+            return None
+        return self._funding_rate.get(symbol)
+
+    def get_last_closed_bar(self, symbol: str) -> Optional[list]:
+        return self._last_closed_bar.get(symbol)
+
+    def wait_for_closed_bar(self, symbol: str, start_ms: int, timeout: float) -> Optional[list]:
+        """시작 시각이 start_ms 이상인 확정봉이 들어올 때까지 대기 (시간 초과 시 None)"""
+        deadline = time.time() + timeout
+        with self._condition:
+            while True:
+                bar = self._last_closed_bar.get(symbol)
+                if bar is not None and bar[0] >= start_ms:
+                    return bar
+                remaining = deadline - time.time()
+                if remaining <= 0 or not self._running:
+                    return None
+                self._condition.wait(remaining)
+
+    # ---- 내부 처리 ----
+
+    def _topics(self) -> List[str]:
+        topics = []
+        for symbol in self.symbols:
+            topics.append(f"kline.{self.interval}.{symbol}")
+            topics.append(f"tickers.{symbol}")
+        return topics
+
+    def _run(self):
+        backoff = 1.0
+        while self._running:
+            self._ws = websocket.WebSocketApp(
+                self.url,
+                on_open=self._on_open,
+                on_message=self._on_message,
+                on_error=self._on_error,
+                on_close=self._on_close
+            )
+            started = time.time()
+            self._ws.run_forever()
+            self.connected = False
+            if not self._running:
+                break
+            # 한동안 정상 연결돼 있었다면 백오프 초기화
+            if time.time() - started > self.max_backoff:
+                backoff = 1.0
+            logger.warning(f"WebSocket 연결 끊김, {backoff:.0f}초 후 재연결 (그동안 REST 사용)")
+            time.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    def _on_open(self, ws):
+        self.connected = True
+        ws.send(json.dumps({"op": "subscribe", "args": self._topics()}))
+        threading.Thread(target=self._heartbeat, args=(ws,), daemon=True).start()
+        logger.info(f"WebSocket 연결 및 구독: {self._topics()}")
+
+    def _heartbeat(self, ws):
+        while self._running and self.connected and ws is self._ws:
+            time.sleep(self.heartbeat_interval)
+            try:
+                ws.send(json.dumps({"op": "ping"}))
+            except Exception:
+                break
+
+    def _on_error(self, ws, error):
+        logger.error(f"WebSocket 에러: {error}")
+
+    def _on_close(self, ws, status_code, message):
+        self.connected = False
+        with self._condition:
+            self._condition.notify_all()
+
+    def _on_message(self, ws, message: str):
+        try:
+            data = json.loads(message)
+        except ValueError:
+            return
+        topic = data.get('topic', '')
+        if topic.startswith('kline.'):
+            self._handle_kline(topic, data.get('data', []))
+        elif topic.startswith('tickers.'):
+            self._handle_ticker(topic, data.get('data', {}))
+
+    def _handle_kline(self, topic: str, klines: List[Dict]):
+        _, interval, symbol = topic.split('.', 2)
+        timeframe = INTERVAL_TO_TIMEFRAME.get(interval, self.timeframe)
+        for kline in klines:
+            if not kline.get('confirm'):
+                continue
+            bar = [
+                int(kline['start']),
+                float(kline['open']),
+                float(kline['high']),
+                float(kline['low']),
+                float(kline['close']),
+                float(kline['volume'])
+            ]
+            # 저장소에 먼저 반영해야 대기 중인 사이클이 바로 새 봉을 조회할 수 있음
+            if self.candle_store is not None:
+                self.candle_store.append_closed_bar(symbol, timeframe, bar)
+            with self._condition:
+                self._last_closed_bar[symbol] = bar
+                self._condition.notify_all()
+            if self.on_closed_bar is not None:
+                try:
+                    self.on_closed_bar(symbol, timeframe, bar)
+                except Exception as e:
+                    logger.error(f"확정봉 콜백 처리 중 에러: {e}")
+
+    def _handle_ticker(self, topic: str, ticker: Dict):
+        symbol = ticker.get('symbol') or topic.split('.', 1)[1]
+        # delta 메시지에는 바뀐 필드만 들어있으므로 lastPrice 가 있을 때만 갱신
+        last_price = ticker.get('lastPrice')
+        if last_price:
+            self._last_price[symbol] = (float(last_price), time.time())
+        funding_rate = ticker.get('fundingRate')
+        if funding_rate:
+            self._funding_rate[symbol] = float(funding_rate)
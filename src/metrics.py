@@ -0,0 +1,271 @@
+"""프로메테우스 텍스트 형식 지표 (카운터, 게이지, 히스토그램)
+
+외부 라이브러리 없이 프로세스 메모리에 지표를 보관하고 Flask /metrics 에서 텍스트 형식으로 내보낸다.
+기록 비용은 레이블 튜플 조회와 잠금 한 번 정도라서 운영 중에도 항상 켜둔다.
+"""
+
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from urllib.parse import urlsplit
+import threading
+import time
+import logging
+import requests
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+PREFIX = 'trading_bot_'
+
+# 초 단위 지연 버킷 (HTTP 수십 ms ~ LLM 수십 초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = PREFIX + name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        try:
+            if len(labels) == len(self.labelnames):
+                return tuple(str(labels[name]) for name in self.labelnames)
+        except KeyError:
+            pass
+        raise ValueError(f"{self.name} 레이블이 다름: {sorted(labels)} != {list(self.labelnames)}")
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return '\n'.join(lines)
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(f"{name}_total", documentation, labelnames)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    """누적 버킷 히스토그램 (레이블별 [버킷 개수..., 합계, 개수])"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def timed(self, **labels) -> Callable:
+        """함수 실행 시간을 기록하는 데코레이터"""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.time(**labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def count(self, **labels) -> int:
+        state = self._values.get(self._key(labels))
+        return state[-1] if state else 0
+
+    def _samples(self):
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), state):
+                cumulative += count
+                le = f'le="{_format_value(float(bound))}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(state[-2])}"
+            yield f"{self.name}_count{labels} {state[-1]}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        return '\n'.join(metric.render() for metric in self._metrics) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+# 사이클 단계
+STAGE_SECONDS = REGISTRY.histogram('stage_seconds', '사이클 단계 실행 시간 (마감 안에 끝난 단계)', ['pipeline', 'stage'])
+STAGE_RESULTS = REGISTRY.counter('stage_results', '사이클 단계 결과 (ok, stale, unavailable)',
+                                 ['pipeline', 'stage', 'status'])
+PIPELINE_WALL_SECONDS = REGISTRY.histogram('pipeline_wall_seconds', '동시 실행한 단계 묶음의 전체 시간',
+                                           ['pipeline', 'phase'])
+CLOSE_TO_ORDER_SECONDS = REGISTRY.histogram('close_to_order_seconds', '캔들 마감부터 주문 완료까지 지연', ['symbol'])
+CYCLES = REGISTRY.counter('cycles', '트레이딩 사이클 실행 횟수', ['symbol', 'result'])
+CYCLE_SKIPS = REGISTRY.counter('cycle_skips', '이전 사이클이 끝나지 않아 건너뛴 사이클', ['symbol'])
+DECISIONS = REGISTRY.counter('decisions', '결정 단계/포지션별 결정 수', ['tier', 'position'])
+EVENT_TRIGGERS = REGISTRY.counter('event_triggers', '이벤트 트리거 (fired, cooldown, capped, busy)',
+                                  ['symbol', 'condition', 'result'])
+EVENT_REACTION_SECONDS = REGISTRY.histogram('event_reaction_seconds', '이벤트 조건 감지부터 주문 완료까지 지연',
+                                            ['symbol', 'condition'])
+
+# 외부 호출
+EXTERNAL_REQUEST_SECONDS = REGISTRY.histogram('external_request_seconds', '외부 HTTP/거래소 호출 시간',
+                                              ['service', 'endpoint'])
+EXTERNAL_REQUEST_ERRORS = REGISTRY.counter('external_request_errors', '외부 호출 실패 (예외 또는 4xx/5xx)',
+                                           ['service', 'endpoint'])
+LLM_REQUEST_SECONDS = REGISTRY.histogram('llm_request_seconds', 'LLM 호출 시간 (스트리밍은 전체 응답 기준)',
+                                         ['backend', 'mode'])
+LLM_FIRST_CHUNK_SECONDS = REGISTRY.histogram('llm_first_chunk_seconds', 'LLM 스트리밍 첫 조각까지 시간', ['backend'])
+LLM_REQUEST_ERRORS = REGISTRY.counter('llm_request_errors', 'LLM 호출 실패', ['backend', 'mode'])
+LLM_SLOT_WAIT_SECONDS = REGISTRY.histogram('llm_slot_wait_seconds', '공유 LLM 동시 호출 한도 대기 시간', ['backend'])
+
+# 저장소/대시보드
+DB_WRITE_SECONDS = REGISTRY.histogram('db_write_seconds', 'DB 쓰기 시간', ['operation'])
+HTTP_REQUEST_SECONDS = REGISTRY.histogram('http_request_seconds', '대시보드 요청 처리 시간',
+                                          ['route', 'method', 'status'])
+
+
+@contextmanager
+def track_external(service: str, endpoint: str):
+    """외부 호출 시간과 실패(예외) 기록"""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        EXTERNAL_REQUEST_ERRORS.inc(service=service, endpoint=endpoint)
+        raise
+    finally:
+        EXTERNAL_REQUEST_SECONDS.observe(time.perf_counter() - started, service=service, endpoint=endpoint)
+
+
+class InstrumentedSession(requests.Session):
+    """모든 요청의 시간/실패를 호스트와 경로(쿼리 제외) 레이블로 기록하는 requests 세션"""
+
+    def request(self, method, url, *args, **kwargs):
+        parts = urlsplit(url)
+        service, endpoint = parts.hostname or 'unknown', parts.path or '/'
+        with track_external(service, endpoint):
+            response = super().request(method, url, *args, **kwargs)
+        if response.status_code >= 400:
+            EXTERNAL_REQUEST_ERRORS.inc(service=service, endpoint=endpoint)
+        return response
+
+
+def instrument_flask(app):
+    """Flask 라우트별 처리 시간 기록 (레이블은 URL 이 아닌 라우트 규칙)"""
+    from flask import g, request
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _record(response):
+        started = g.pop('metrics_started', None)
+        if started is not None:
+            route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, route=route,
+                                         method=request.method, status=str(response.status_code))
+        return response
+
+    return app
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Text
+from sqlalchemy import create_engine, Column, Integer, BigInteger, String, Float, DateTime, Text, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -37,5 +37,32 @@ class TradingLog(Base):
     def __repr__(self):
         return f"<TradingLog(timestamp={self.timestamp}, type={self.log_type}, message={self.message})>"
 
+class Candle(Base):
+    __tablename__ = 'candles'
+    __table_args__ = (
+        UniqueConstraint('symbol', 'timeframe', 'timestamp', name='uq_candle_symbol_timeframe_ts'),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    symbol = Column(String, index=True)
+    timeframe = Column(String)
+    timestamp = Column(BigInteger)  # 봉 시작 시각 (ms)
+    open = Column(Float)
+    high = Column(Float)
+    low = Column(Float)
+    close = Column(Float)
+    volume = Column(Float)
+
+class DecisionLog(Base):
+    __tablename__ = 'decision_logs'
+    
+    id = Column(Integer, primary_key=True)
+    timestamp = Column(DateTime, default=datetime.now)
+    symbol = Column(String, index=True)
+    trade_id = Column(Integer, nullable=True)  # 실제 진입한 거래 (trades.id)
+    source = Column(String)  # llm, ensemble, cache, fallback 등 결정 출처
+    position_type = Column(String)
+    details = Column(Text)  # JSON (앙상블 득표/합의율 등)
+
 # 데이터베이스 테이블 생성
 Base.metadata.create_all(engine) 
\ No newline at end of file
@@ -0,0 +1,160 @@
+"""지표/포지션 크기 설정의 병렬 파라미터 스윕
+
+캔들 배열은 공유 메모리에 한 번만 올리고 워커 프로세스는 이름으로 붙어서 읽는다
+(작업마다 DataFrame 을 pickle 해서 보내지 않음). 같은 지표 설정끼리 묶어서 보내므로
+워커는 지표를 한 번 계산한 뒤 크기/규칙 설정만 바꿔 백테스트를 반복한다.
+"""
+
+from typing import Dict, Iterable, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import functools
+import itertools
+import os
+import random
+import time
+import logging
+import numpy as np
+import pandas as pd
+from backtester import Backtester, trend_rule, DecisionRule
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+INDICATOR_KEYS = ('ma_periods', 'rsi_period', 'bb_period', 'atr_period', 'adx_period', 'volume_period')
+SIZING_KEYS = ('leverage', 'investment_ratio')
+BACKTESTER_KEYS = ('flip_buffer', 'fee_rate', 'slippage', 'initial_equity')
+
+# 현재 하드코딩된 값 주변의 기본 탐색 범위
+DEFAULT_SPACE = {
+    'rsi_period': [7, 14, 21],
+    'bb_period': [20],
+    'fast': [5, 10, 20],
+    'slow': [50, 100, 200],
+    'leverage': [1, 2, 3, 5, 10],
+    'investment_ratio': [0.1, 0.25, 0.5, 1.0],
+    'flip_buffer': [0.9, 0.95, 1.0],
+}
+
+_COLUMNS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+
+# 워커 프로세스 전역 상태 (initializer 에서 설정)
+_worker: Dict = {}
+
+
+def grid(space: Dict[str, list]) -> List[Dict]:
+    """모든 조합"""
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+
+
+def random_search(space: Dict[str, list], n: int, seed: Optional[int] = None) -> List[Dict]:
+    """조합 중 n개 무작위 추출 (중복 없이, 전체 조합보다 많으면 전체)"""
+    rng = random.Random(seed)
+    sizes = [len(v) for v in space.values()]
+    total = int(np.prod(sizes))
+    keys = list(space)
+    picks = rng.sample(range(total), min(n, total))
+    configs = []
+    for pick in picks:
+        config = {}
+        # 혼합 진법으로 인덱스를 조합으로 변환 (전체 조합 목록을 만들지 않음)
+        for key, size in zip(reversed(keys), reversed(sizes)):
+            pick, i = divmod(pick, size)
+            config[key] = space[key][i]
+        configs.append({k: config[k] for k in keys})
+    return configs
+
+
+def _split(config: Dict):
+    indicator_params = {k: config[k] for k in INDICATOR_KEYS if k in config}
+    sizing = {k: config[k] for k in SIZING_KEYS if k in config}
+    backtester_params = {k: config[k] for k in BACKTESTER_KEYS if k in config}
+    rule_params = {k: v for k, v in config.items()
+                   if k not in INDICATOR_KEYS + SIZING_KEYS + BACKTESTER_KEYS}
+    return indicator_params, sizing, backtester_params, rule_params
+
+
+def _indicator_key(config: Dict) -> tuple:
+    return tuple((k, tuple(v) if isinstance(v, (list, tuple)) else v)
+                 for k, v in sorted(_split(config)[0].items()))
+
+
+def _attach(shm_name: str, n_rows: int, rule: DecisionRule, timeframe: str):
+    """워커 initializer: 공유 메모리의 캔들 배열에 연결"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    data = np.ndarray((len(_COLUMNS), n_rows), dtype=np.float64, buffer=shm.buf)
+    df = pd.DataFrame({
+        'timestamp': pd.to_datetime(data[0].astype(np.int64), unit='ms'),
+        **{name: data[i] for i, name in enumerate(_COLUMNS) if name != 'timestamp'}
+    }, copy=False)
+    _worker.update(shm=shm, df=df, rule=rule, timeframe=timeframe, indicators_key=None, indicators=None)
+
+
+def _evaluate(config: Dict) -> Dict:
+    """설정 하나를 백테스트 (지표 설정이 직전과 같으면 계산 결과 재사용)"""
+    indicator_params, sizing, backtester_params, rule_params = _split(config)
+    backtester = Backtester(indicator_params=indicator_params, **backtester_params)
+    key = _indicator_key(config)
+    if _worker['indicators_key'] != key:
+        _worker['indicators'] = backtester.compute_indicators(_worker['df'])
+        _worker['indicators_key'] = key
+    rule = functools.partial(_worker['rule'], **rule_params) if rule_params else _worker['rule']
+    started = time.perf_counter()
+    try:
+        stats = backtester.run(_worker['df'], rule, timeframe=_worker['timeframe'],
+                               indicators=_worker['indicators'], **sizing)['stats']
+        error = None
+    except Exception as e:
+        stats, error = {}, str(e)
+    return {**config, **stats, 'error': error, 'elapsed': time.perf_counter() - started}
+
+
+class ParameterSweep:
+    """캔들 하나에 대해 여러 설정을 프로세스 풀로 백테스트"""
+
+    def __init__(self, df: pd.DataFrame, rule: DecisionRule = trend_rule, timeframe: str = '1h',
+                 max_workers: Optional[int] = None):
+        self.df = df
+        self.rule = rule
+        self.timeframe = timeframe
+        self.max_workers = max_workers or os.cpu_count()
+
+    def _to_shared_memory(self) -> shared_memory.SharedMemory:
+        n_rows = len(self.df)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, len(_COLUMNS) * n_rows * 8))
+        data = np.ndarray((len(_COLUMNS), n_rows), dtype=np.float64, buffer=shm.buf)
+        data[0] = self.df['timestamp'].values.astype('datetime64[ms]').astype(np.int64)
+        for i, name in enumerate(_COLUMNS[1:], start=1):
+            data[i] = self.df[name].to_numpy(dtype=float)
+        return shm
+
+    def run(self, configs: Iterable[Dict], sort_by: str = 'sharpe', output_csv: Optional[str] = None) -> pd.DataFrame:
+        """모든 설정을 평가해 sort_by 기준 내림차순 결과표 반환 (output_csv 가 있으면 저장)"""
+        # 같은 지표 설정끼리 붙여서 보내야 워커의 지표 캐시가 잘 맞음
+        configs = sorted(configs, key=lambda c: repr(_indicator_key(c)))
+        if not configs:
+            return pd.DataFrame()
+        workers = min(self.max_workers, len(configs))
+        chunksize = max(1, len(configs) // (workers * 4))
+
+        started = time.time()
+        shm = self._to_shared_memory()
+        try:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_attach,
+                initargs=(shm.name, len(self.df), self.rule, self.timeframe)
+            ) as pool:
+                rows = list(pool.map(_evaluate, configs, chunksize=chunksize))
+        finally:
+            shm.close()
+            shm.unlink()
+
+        results = pd.DataFrame(rows)
+        if sort_by in results:
+            results = results.sort_values(sort_by, ascending=False, ignore_index=True)
+        logger.info(f"파라미터 스윕 완료: {len(configs)}개 설정, {workers}개 프로세스, {time.time() - started:.1f}초")
+        if output_csv:
+            results.to_csv(output_csv, index=False)
+        return results
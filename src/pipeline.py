@@ -0,0 +1,164 @@
+"""사이클 단계 병렬 실행기
+
+서로 독립적인 수집 단계(기술적 분석, 펀더멘털, 심리, 외부 요인, 지갑 상태)를 동시에 실행하고
+단계마다 마감 시간을 둔다. 마감을 넘기거나 실패한 단계는 사이클을 막지 않고 마지막으로 성공한 값
+(허용 시간 이내) 또는 '데이터 없음' 자리표시로 대체된다. 사이클 지연은 단계 시간의 합이 아니라
+가장 느린 단계(임계 경로) 시간이 된다.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import threading
+import time
+import logging
+from metrics import STAGE_SECONDS, STAGE_RESULTS, PIPELINE_WALL_SECONDS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class StageUnavailable(RuntimeError):
+    """필수 단계가 새 값도, 허용 시간 이내의 이전 값도 없음"""
+
+
+class Stage:
+    """사이클 단계 정의
+
+    placeholder: 값이 없을 때 대신 쓸 값
+    max_stale: 마감 초과/실패 시 이전 성공 값을 재사용할 수 있는 최대 경과 시간 (초, None 이면 무제한, 0 이면 재사용 안 함)
+    required: 값이 전혀 없으면 사이클을 중단 (StageUnavailable)
+    """
+
+    def __init__(self, name: str, func: Callable[[], Any], deadline: Optional[float] = None,
+                 placeholder: Any = None, max_stale: Optional[float] = None, required: bool = False):
+        self.name = name
+        self.func = func
+        self.deadline = deadline
+        self.placeholder = placeholder
+        self.max_stale = max_stale
+        self.required = required
+
+
+class StageResult:
+    """단계 결과 (status: ok, stale, unavailable)"""
+
+    def __init__(self, name: str, value: Any, status: str, elapsed: Optional[float],
+                 age: Optional[float] = None, error: Optional[str] = None):
+        self.name = name
+        self.value = value
+        self.status = status
+        self.elapsed = elapsed
+        self.age = age
+        self.error = error
+
+    @property
+    def fresh(self) -> bool:
+        return self.status == 'ok'
+
+
+class StagePipeline:
+    """단계를 동시에 실행하고 단계별 마감 시간 이후의 결과는 기다리지 않음"""
+
+    def __init__(self, stages: List[Stage], max_workers: Optional[int] = None, name: str = 'cycle'):
+        self.stages = stages
+        # 지표 레이블 (심볼별 파이프라인 구분)
+        self.name = name
+        self._pool = ThreadPoolExecutor(max_workers=max_workers or len(stages),
+                                        thread_name_prefix=f'stage-{name}')
+        self._lock = threading.Lock()
+        # 단계별 마지막 성공 값 (값, 완료 시각)
+        self._last_good: Dict[str, tuple] = {}
+        # 이전 사이클에서 마감을 넘겨 아직 실행 중인 단계
+        self._running: Dict[str, Any] = {}
+        self.last_timing: Dict = {}
+        self.stats = {'cycles': 0, 'missed': 0, 'errors': 0, 'stale': 0, 'unavailable': 0}
+
+    def _call(self, stage: Stage):
+        started = time.perf_counter()
+        value = stage.func()
+        with self._lock:
+            self._last_good[stage.name] = (value, time.time())
+        return value, time.perf_counter() - started
+
+    def _substitute(self, stage: Stage, elapsed: Optional[float], error: str) -> StageResult:
+        """마감 초과/실패 단계를 이전 값 또는 자리표시로 대체"""
+        with self._lock:
+            last = self._last_good.get(stage.name)
+        if last is not None:
+            age = time.time() - last[1]
+            if stage.max_stale is None or age <= stage.max_stale:
+                self.stats['stale'] += 1
+                logger.warning(f"{stage.name} 단계 {error}: {age:.0f}초 전 값 사용")
+                return StageResult(stage.name, last[0], 'stale', elapsed, age=age, error=error)
+        self.stats['unavailable'] += 1
+        logger.warning(f"{stage.name} 단계 {error}: 데이터 없음으로 진행")
+        return StageResult(stage.name, stage.placeholder, 'unavailable', elapsed, error=error)
+
+    def run(self, names: Optional[List[str]] = None, phase: str = 'cycle') -> Dict[str, StageResult]:
+        """단계(names 를 주면 그 단계만)를 실행하고 단계 이름별 결과 반환 (phase 는 지표 레이블)"""
+        stages = [s for s in self.stages if names is None or s.name in names]
+        cycle_start = time.perf_counter()
+        self.stats['cycles'] += 1
+        results: Dict[str, StageResult] = {}
+        pending = {}
+        for stage in stages:
+            previous = self._running.get(stage.name)
+            if previous is not None and not previous.done():
+                # 지난 사이클의 호출이 아직 끝나지 않음 -> 중복 호출하지 않고 바로 대체
+                self.stats['missed'] += 1
+                results[stage.name] = self._substitute(stage, None, '이전 호출 진행 중')
+                continue
+            future = self._pool.submit(self._call, stage)
+            self._running[stage.name] = future
+            pending[future] = stage
+
+        while pending:
+            now = time.perf_counter() - cycle_start
+            deadlines = [s.deadline - now for s in pending.values() if s.deadline is not None]
+            timeout = max(min(deadlines), 0) if deadlines else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = pending.pop(future)
+                try:
+                    value, elapsed = future.result()
+                    results[stage.name] = StageResult(stage.name, value, 'ok', elapsed)
+                except Exception as e:
+                    self.stats['errors'] += 1
+                    results[stage.name] = self._substitute(stage, time.perf_counter() - cycle_start,
+                                                           f"실패 ({e})")
+            now = time.perf_counter() - cycle_start
+            for future, stage in list(pending.items()):
+                if stage.deadline is not None and now >= stage.deadline:
+                    # 스레드는 계속 실행되고 끝나면 다음 사이클의 이전 값이 됨
+                    del pending[future]
+                    self.stats['missed'] += 1
+                    results[stage.name] = self._substitute(stage, None, f"마감 {stage.deadline}초 초과")
+
+        self._record_timing(results, time.perf_counter() - cycle_start, phase)
+        for stage in stages:
+            if stage.required and results[stage.name].status == 'unavailable':
+                raise StageUnavailable(f"{stage.name} 단계 데이터 없음: {results[stage.name].error}")
+        return {stage.name: results[stage.name] for stage in stages}
+
+    def _record_timing(self, results: Dict[str, StageResult], wall: float, phase: str):
+        """단계별 시간, 임계 경로, 순차 실행 대비 시간 기록"""
+        stages = {name: round(r.elapsed, 3) if r.fresh else None for name, r in results.items()}
+        completed = {name: elapsed for name, elapsed in stages.items() if elapsed is not None}
+        critical = max(completed, key=completed.get) if completed else None
+        self.last_timing = {
+            'wall': round(wall, 3),
+            'sum': round(sum(completed.values()), 3),
+            'critical_path': critical,
+            'stages': stages,
+            'status': {name: r.status for name, r in results.items()},
+        }
+        for name, r in results.items():
+            STAGE_RESULTS.inc(pipeline=self.name, stage=name, status=r.status)
+            if r.fresh:
+                STAGE_SECONDS.observe(r.elapsed, pipeline=self.name, stage=name)
+        PIPELINE_WALL_SECONDS.observe(wall, pipeline=self.name, phase=phase)
+        logger.info(f"[{self.name}] 단계 실행 {wall:.2f}초 (순차 합계 {self.last_timing['sum']:.2f}초, "
+                    f"임계 경로: {critical}), 상태: {self.last_timing['status']}")
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
@@ -0,0 +1,56 @@
+import threading
+import time
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 바이비트 REST 한도(IP당 5초에 600회)보다 넉넉히 낮춘 기본 예산
+BYBIT_REQUESTS_PER_SECOND = 20
+
+
+class RateLimiter:
+    """여러 스레드가 공유하는 토큰 버킷 방식의 요청 한도 관리자"""
+
+    def __init__(self, rate_per_second: float = BYBIT_REQUESTS_PER_SECOND, burst: int = None):
+        self.rate = float(rate_per_second)
+        self.capacity = float(burst if burst is not None else max(1, int(rate_per_second)))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """토큰을 얻을 때까지 대기하고, 대기한 시간(초)을 반환"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+
+class RateLimitedClient:
+    """클라이언트(pybit HTTP, ccxt 등)의 메서드 호출마다 공유 한도에서 토큰을 얻은 뒤 호출하는 대리 객체"""
+
+    def __init__(self, client, rate_limiter: RateLimiter):
+        self._client = client
+        self._rate_limiter = rate_limiter
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+
+        def limited(*args, **kwargs):
+            self._rate_limiter.acquire()
+            return attr(*args, **kwargs)
+        return limited
@@ -0,0 +1,103 @@
+"""LLM 리포트용 가격 이력 압축 인코딩과 토큰 수 추정
+
+dict 레코드를 JSON 으로 나열하면 봉마다 키 이름이 반복되므로 열 이름을 한 번만 쓰는
+CSV 형식이나 직전 종가 대비 차이로 적는 delta 형식을 제공한다.
+"""
+
+from typing import Dict, List, Optional
+import json
+import math
+import re
+
+PRICE_HISTORY_FORMATS = ('csv', 'delta', 'json')
+# 가격 표기 유효숫자 (자동 소수점 자릿수 계산용)
+PRICE_SIGNIFICANT_DIGITS = 6
+
+_SECTION_HEADER = re.compile(r'^\d+\. ', re.MULTILINE)
+# 영문 단어, 숫자 3자리 묶음, 그 외 문자 하나를 대략 토큰 하나로 본다
+_TOKEN_PIECE = re.compile(r'[A-Za-z]+|\d{1,3}|\S')
+
+
+def auto_price_decimals(price: float, significant: int = PRICE_SIGNIFICANT_DIGITS) -> int:
+    """가격 크기에 맞춘 소수점 자릿수 (예: 60000 -> 1, 2.5 -> 5)"""
+    if not price or not math.isfinite(price):
+        return 2
+    integer_digits = int(math.floor(math.log10(abs(price)))) + 1
+    return max(0, significant - integer_digits)
+
+
+def _short_time(timestamp: str) -> str:
+    """'2024-01-01 13:00:00' -> '01-01 13:00' (연도와 초는 리포트 시간으로 알 수 있음)"""
+    return timestamp[5:16] if len(timestamp) >= 16 else timestamp
+
+
+def encode_price_history(records: List[Dict], fmt: str = 'csv', price_decimals: Optional[int] = None,
+                         volume_decimals: int = 2) -> str:
+    """가격 이력 레코드(timestamp, open, high, low, close, volume)를 문자열로 인코딩
+
+    csv: 헤더 한 줄 + 봉마다 한 줄 (반올림)
+    delta: 첫 봉은 그대로, 이후 봉은 직전 종가 대비 차이(부호 포함)
+    json: 기존 방식 (들여쓰기 JSON)
+    """
+    if fmt not in PRICE_HISTORY_FORMATS:
+        raise ValueError(f"지원하지 않는 가격 이력 형식: {fmt}")
+    if fmt == 'json':
+        return json.dumps(records, indent=2, ensure_ascii=False)
+    if not records:
+        return ''
+
+    if price_decimals is None:
+        price_decimals = auto_price_decimals(records[-1]['close'])
+    price_spec = f'.{price_decimals}f'
+    delta_spec = f'+.{price_decimals}f'
+    volume_spec = f'.{volume_decimals}f'
+
+    if fmt == 'csv':
+        lines = ['time,open,high,low,close,volume']
+        for r in records:
+            lines.append(','.join([
+                _short_time(str(r['timestamp'])),
+                format(r['open'], price_spec),
+                format(r['high'], price_spec),
+                format(r['low'], price_spec),
+                format(r['close'], price_spec),
+                format(r['volume'], volume_spec)
+            ]))
+        return '\n'.join(lines)
+
+    lines = ['time,open,high,low,close,volume (첫 줄은 가격, 이후 가격은 직전 종가 대비 차이)']
+    prev_close = None
+    for r in records:
+        # 반올림한 가격끼리 차이를 구해야 누적해도 오차가 쌓이지 않음
+        ohlc = [round(r[k], price_decimals) for k in ('open', 'high', 'low', 'close')]
+        if prev_close is None:
+            prices = [format(v, price_spec) for v in ohlc]
+        else:
+            prices = [format(v - prev_close, delta_spec) for v in ohlc]
+        lines.append(','.join([_short_time(str(r['timestamp']))] + prices + [format(r['volume'], volume_spec)]))
+        prev_close = ohlc[3]
+    return '\n'.join(lines)
+
+
+def estimate_tokens(text: str) -> int:
+    """토큰 수 추정 (토크나이저 없이 쓰는 근사치, 형식 간 비교용)"""
+    count = 0
+    for piece in _TOKEN_PIECE.findall(text):
+        # 긴 영문 단어는 약 4자당 1토큰
+        count += math.ceil(len(piece) / 4) if piece[0].isascii() and piece[0].isalpha() else 1
+    return count
+
+
+def section_token_counts(report: str) -> Dict[str, int]:
+    """리포트를 '1. ', '2. ' 형식의 섹션 제목 기준으로 나눠 섹션별 추정 토큰 수 반환"""
+    starts = [m.start() for m in _SECTION_HEADER.finditer(report)]
+    counts = {}
+    if not starts or starts[0] > 0:
+        counts['header'] = estimate_tokens(report[:starts[0] if starts else len(report)])
+    for i, start in enumerate(starts):
+        end = starts[i + 1] if i + 1 < len(starts) else len(report)
+        section = report[start:end]
+        title = section.split('\n', 1)[0].rstrip(':').strip()
+        counts[title] = estimate_tokens(section)
+    counts['total'] = estimate_tokens(report)
+    return counts
@@ -0,0 +1,89 @@
+"""하나의 기준 캔들 시계열에서 상위 타임프레임 캔들을 만드는 벡터화 리샘플러"""
+
+from typing import Dict
+import numpy as np
+import pandas as pd
+
+_UNIT_MS = {
+    'm': 60 * 1000,
+    'h': 60 * 60 * 1000,
+    'd': 24 * 60 * 60 * 1000,
+    'w': 7 * 24 * 60 * 60 * 1000,
+}
+
+# 1970-01-01 은 목요일이므로 주봉(월요일 시작)은 4일 만큼 기준점을 이동
+_WEEK_ORIGIN_MS = 4 * _UNIT_MS['d']
+
+
+def timeframe_to_ms(timeframe: str) -> int:
+    """'15m', '4h', '1d' 형식의 타임프레임을 ms 로 변환"""
+    amount, unit = timeframe[:-1], timeframe[-1]
+    if unit not in _UNIT_MS or not amount.isdigit():
+        raise ValueError(f"지원하지 않는 타임프레임: {timeframe}")
+    return int(amount) * _UNIT_MS[unit]
+
+
+def can_resample(base_timeframe: str, target_timeframe: str) -> bool:
+    """기준 타임프레임으로 목표 타임프레임을 만들 수 있는지 (정수배인 상위 타임프레임만 가능)"""
+    base_ms = timeframe_to_ms(base_timeframe)
+    target_ms = timeframe_to_ms(target_timeframe)
+    return target_ms > base_ms and target_ms % base_ms == 0
+
+
+def _timestamps_ms(values) -> np.ndarray:
+    """datetime 열 또는 ms 정수 배열을 int64 ms 배열로"""
+    values = np.asarray(values)
+    if values.dtype.kind == 'M':
+        return values.astype('datetime64[ms]').astype(np.int64)
+    return values.astype(np.int64, copy=False)
+
+
+def resample_ohlcv(df, target_timeframe: str, base_timeframe: str,
+                   drop_incomplete: bool = True) -> pd.DataFrame:
+    """기준 캔들(DataFrame 또는 CandleStore.read_window 의 열별 배열)을 상위 타임프레임 캔들로 변환
+
+    봉 경계는 거래소와 같이 UTC 기준(주봉은 월요일)으로 정렬하며, drop_incomplete 이면
+    구성 봉이 모자란 봉(아직 진행 중인 마지막 봉, 시작이 잘린 첫 봉, 누락 구간)은 제외한다.
+    """
+    if not can_resample(base_timeframe, target_timeframe):
+        raise ValueError(f"{base_timeframe} 에서 {target_timeframe} 로 리샘플링할 수 없습니다")
+
+    columns = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+    ts = _timestamps_ms(df['timestamp'])
+    if len(ts) == 0:
+        return pd.DataFrame(columns=columns)
+
+    target_ms = timeframe_to_ms(target_timeframe)
+    origin_ms = _WEEK_ORIGIN_MS if target_timeframe.endswith('w') else 0
+
+    bucket = (ts - origin_ms) // target_ms * target_ms + origin_ms
+
+    # 버킷이 바뀌는 지점마다 새 봉 시작
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], len(ts)] - 1
+
+    high = np.asarray(df['high'], dtype=float)
+    low = np.asarray(df['low'], dtype=float)
+    result = pd.DataFrame({
+        'timestamp': pd.to_datetime(bucket[starts], unit='ms'),
+        'open': np.asarray(df['open'], dtype=float)[starts],
+        'high': np.maximum.reduceat(high, starts),
+        'low': np.minimum.reduceat(low, starts),
+        'close': np.asarray(df['close'], dtype=float)[ends],
+        'volume': np.add.reduceat(np.asarray(df['volume'], dtype=float), starts)
+    })
+
+    if drop_incomplete:
+        expected = target_ms // timeframe_to_ms(base_timeframe)
+        counts = ends - starts + 1
+        result = result[counts == expected].reset_index(drop=True)
+    return result
+
+
+def resample_many(df, base_timeframe: str, timeframes) -> Dict[str, pd.DataFrame]:
+    """여러 상위 타임프레임을 한 번에 생성 (만들 수 없는 타임프레임은 건너뜀)"""
+    return {
+        timeframe: resample_ohlcv(df, timeframe, base_timeframe)
+        for timeframe in timeframes
+        if can_resample(base_timeframe, timeframe)
+    }
@@ -0,0 +1,85 @@
+"""LLM 없이 이미 계산된 지표로 내리는 결정 (LLM 마감 초과/장애 시 대체용)
+
+decision_cache.build_features 의 특징 벡터를 입력으로 받아 추세(이동평균 괴리, MACD),
+추세 강도(ADX), 과열(RSI)만으로 보수적인 결정을 만든다. 같은 입력에는 항상 같은 결정을 낸다.
+"""
+
+from typing import Dict, Tuple
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class RuleBasedAdvisor:
+    """결정적 추세추종 규칙 (TradingAdvisor.get_trading_advice 와 같은 반환 형식)"""
+
+    def __init__(self, leverage: int = 2, investment_ratio: float = 0.2, min_adx: float = 20.0,
+                 overbought: float = 75.0, oversold: float = 25.0):
+        self.leverage = leverage
+        self.investment_ratio = investment_ratio
+        self.min_adx = min_adx
+        self.overbought = overbought
+        self.oversold = oversold
+
+    def _trend(self, technical: Dict) -> str:
+        close_vs_ma = technical.get('close_vs_ma', {})
+        vs_ma50 = close_vs_ma.get('50')
+        macd = technical.get('macd_hist_atr')
+        if vs_ma50 is None or macd is None:
+            return 'neutral'
+        if technical.get('golden_cross') or (vs_ma50 > 0 and macd > 0):
+            return 'bullish'
+        if technical.get('death_cross') or (vs_ma50 < 0 and macd < 0):
+            return 'bearish'
+        return 'neutral'
+
+    def decide(self, features: Dict) -> Tuple[str, str]:
+        """(포지션 신호, 근거 한 줄)"""
+        technical = features.get('technical', {})
+        side = features.get('position', {}).get('side', 'none')
+        trend = self._trend(technical)
+        rsi = technical.get('rsi')
+        adx = technical.get('adx')
+        strong = adx is not None and adx >= self.min_adx
+        overbought = rsi is not None and rsi >= self.overbought
+        oversold = rsi is not None and rsi <= self.oversold
+        summary = f"추세 {trend}, ADX {adx}, RSI {rsi}"
+
+        if side == 'long':
+            if trend == 'bearish' and strong and not oversold:
+                return 'LONG->SHORT', f"{summary}: 강한 하락 추세로 전환"
+            if trend == 'bearish' or overbought:
+                return 'CLOSE', f"{summary}: 롱 포지션 청산"
+            return 'HOLD', f"{summary}: 롱 포지션 유지"
+        if side == 'short':
+            if trend == 'bullish' and strong and not overbought:
+                return 'SHORT->LONG', f"{summary}: 강한 상승 추세로 전환"
+            if trend == 'bullish' or oversold:
+                return 'CLOSE', f"{summary}: 숏 포지션 청산"
+            return 'HOLD', f"{summary}: 숏 포지션 유지"
+        if trend == 'bullish' and strong and not overbought:
+            return 'LONG', f"{summary}: 상승 추세 진입"
+        if trend == 'bearish' and strong and not oversold:
+            return 'SHORT', f"{summary}: 하락 추세 진입"
+        return 'HOLD', f"{summary}: 관망"
+
+    def get_trading_advice(self, features: Dict) -> Tuple[Dict, str]:
+        position, reason = self.decide(features)
+        opens = position in ('LONG', 'SHORT', 'LONG->SHORT', 'SHORT->LONG')
+        decision = {
+            'position': position,
+            'leverage': str(self.leverage) if opens else '0',
+            'investment_ratio': str(self.investment_ratio) if opens else '0'
+        }
+        response = f"""[트레이딩 신호]
+- 포지션: {position}
+- 레버리지: {decision['leverage']}
+- 투자비중: {float(decision['investment_ratio']) * 100:.0f}%
+
+[결정 근거]
+규칙 기반 대체 결정 (LLM 응답 없음)
+- {reason}
+"""
+        logger.info(f"규칙 기반 결정: {decision} ({reason})")
+        return decision, response
@@ -1,10 +1,10 @@
-import requests
 import logging
 from typing import Dict, List
 from datetime import datetime
 import json
 from pytrends.request import TrendReq
 from textblob import TextBlob
+from metrics import InstrumentedSession, track_external
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -14,12 +14,16 @@ class SentimentAnalyzer:
         self.dominance_url = "https://api.coingecko.com/api/v3/global"
         self.fear_greed_url = "https://api.alternative.me/fng/"
         self.pytrends = TrendReq(hl='en-US', tz=360)
+        # 요청별 시간/실패를 지표로 기록하는 세션
+        self.http = InstrumentedSession()
+        # 마지막 prepare_sentiment_analysis 에서 수집한 수치 (결정 캐시 키 등에 사용)
+        self.latest_metrics: Dict[str, float] = {}
         
     def _get_fear_greed_index(self) -> Dict:
         """공포와 탐욕 지수 수집"""
         try:
             # Alternative Fear & Greed Index API
-            response = requests.get(
+            response = self.http.get(
                 "https://api.alternative.me/fng/"
             ).json()
             
@@ -37,8 +41,9 @@ class SentimentAnalyzer:
         """소셜 미디어 트렌드 분석"""
         try:
             # Google Trends 데이터
-            self.pytrends.build_payload(['bitcoin', 'crypto', 'btc'], timeframe='now 7-d')
-            interest_over_time = self.pytrends.interest_over_time()
+            with track_external('google_trends', 'interest_over_time'):
+                self.pytrends.build_payload(['bitcoin', 'crypto', 'btc'], timeframe='now 7-d')
+                interest_over_time = self.pytrends.interest_over_time()
             
             # 최근 검색 트렌드
             recent_trend = interest_over_time['bitcoin'].iloc[-1]
@@ -56,7 +61,7 @@ class SentimentAnalyzer:
     def _get_news_sentiment(self) -> List[Dict]:
         """뉴스 헤드라인과 본문 기반 감성 분석"""
         try:
-            response = requests.get(
+            response = self.http.get(
                 "https://min-api.cryptocompare.com/data/v2/news/?lang=EN&categories=BTC"
             ).json()
             
@@ -88,7 +93,7 @@ class SentimentAnalyzer:
         """비트코인 도미넌스 분석"""
         try:
             # CoinGecko Global Data
-            response = requests.get(
+            response = self.http.get(
                 f"{self.coingecko_base_url}/global"
             ).json()
             
@@ -105,9 +110,10 @@ class SentimentAnalyzer:
 
     def prepare_sentiment_analysis(self) -> str:
         """시장 심리 분석 데이터 준비"""
+        self.latest_metrics = {}
         try:
             # 도미넌스 데이터 수집
-            response = requests.get(self.dominance_url)
+            response = self.http.get(self.dominance_url)
             if response.status_code != 200:
                 logger.error("도미넌스 데이터 수집 실패")
                 return "도미넌스 데이터를 수집할 수 없습니다."
@@ -116,13 +122,14 @@ class SentimentAnalyzer:
             btc_dominance = dominance_data.get('data', {}).get('market_cap_percentage', {}).get('btc', 0)
             
             # 공포탐욕지수 수집
-            fear_response = requests.get(self.fear_greed_url)
+            fear_response = self.http.get(self.fear_greed_url)
             if fear_response.status_code != 200:
                 logger.error("공포탐욕지수 수집 실패")
                 return "공포탐욕지수를 수집할 수 없습니다."
             
             fear_data = fear_response.json()
             fear_value = fear_data.get('data', [{}])[0].get('value', 0)
+            self.latest_metrics = {'btc_dominance': float(btc_dominance), 'fear_greed': float(fear_value)}
             
             analysis = f"""시장 심리 분석:
             - BTC 도미넌스: {btc_dominance:.2f}%
@@ -0,0 +1,218 @@
+"""여러 심볼을 각자의 주기로 실행하는 스케줄러
+
+심볼마다 타임프레임(주기)과 CycleScheduler 를 두고, 한 회차를 두 작업으로 나눠 제한된 작업자 풀에 넘긴다.
+- 사전 수집: 마감 prefetch_lead 초 전에 prefetch(job, close_ms) 실행
+- 마감 단계: 확정봉을 조회할 수 있고 사전 수집이 끝나면 run_cycle(job, close_ms, prefetched, None) 실행
+시각 대기는 모두 스케줄러 스레드에서 하므로 작업자는 잠들어 있는 동안 자리를 차지하지 않고,
+작업자 수가 심볼 수보다 적어도 마감이 겹치는 심볼이 다른 심볼의 사이클 전체를 기다리지 않는다.
+같은 심볼의 이전 회차가 아직 끝나지 않았으면 그 회차는 건너뛴다.
+trigger() 는 이벤트 트리거가 정규 주기 밖에서 run_cycle(job, None, None, event) 를 실행할 때 쓴다.
+요청 한도(RateLimiter)와 LLM 동시 호출 한도는 호출하는 쪽에서 모든 심볼이 공유하도록 넘긴다.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+import threading
+import logging
+from cycle_scheduler import CycleScheduler
+from metrics import CYCLE_SKIPS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def parse_symbols(spec: str, default_timeframe: str = '1h') -> List[Tuple[str, str]]:
+    """'BTCUSDT:1h,ETHUSDT:4h,SOLUSDT' -> [(심볼, 타임프레임), ...] (타임프레임 생략 시 기본값)"""
+    symbols = []
+    for item in spec.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        symbol, _, timeframe = item.partition(':')
+        symbols.append((symbol.strip().upper(), timeframe.strip() or default_timeframe))
+    return symbols
+
+
+def parse_allocations(spec: str, symbols: List[str]) -> Dict[str, float]:
+    """'BTCUSDT:0.5,ETHUSDT:0.3' -> 심볼별 자본 배분 비율
+
+    지정하지 않은 심볼은 남은 비율을 똑같이 나눠 갖고 (빈 문자열이면 1/심볼 수),
+    합계가 1 을 넘으면 합계가 1 이 되도록 줄인다.
+    """
+    weights: Dict[str, float] = {}
+    for item in spec.split(','):
+        symbol, _, weight = item.strip().partition(':')
+        if symbol.strip() and weight.strip():
+            weights[symbol.strip().upper()] = max(0.0, float(weight))
+    rest = [symbol for symbol in symbols if symbol not in weights]
+    remaining = max(0.0, 1.0 - sum(weights.values()))
+    for symbol in rest:
+        weights[symbol] = remaining / len(rest)
+    total = sum(weights.values())
+    if total > 1.0:
+        logger.warning(f"심볼별 배분 비율 합계가 {total:.2f} 라서 1 이 되도록 줄임")
+        weights = {symbol: weight / total for symbol, weight in weights.items()}
+    return {symbol: weights[symbol] for symbol in symbols}
+
+
+def _running(future: Optional[Future]) -> bool:
+    return future is not None and not future.done()
+
+
+class SymbolJob:
+    """심볼 하나의 실행 상태 (components 에는 심볼별 조언기/파이프라인 등 사이클에 필요한 것을 보관)"""
+
+    def __init__(self, symbol: str, scheduler: CycleScheduler, components: Optional[Dict] = None):
+        self.symbol = symbol
+        self.scheduler = scheduler
+        self.components = components or {}
+        self.next_close_ms: Optional[int] = None
+        # 사전 수집을 시작했고 마감 단계가 남은 회차의 마감 시각
+        self.pending_close_ms: Optional[int] = None
+        self.prefetch_future: Optional[Future] = None
+        self.cycle_future: Optional[Future] = None
+        # 이벤트 사이클은 정규 회차와 따로 관리 (정규 회차를 건너뛰게 하지 않음)
+        self.event_future: Optional[Future] = None
+        self.skipped = 0
+        self.deferred = False
+
+    @property
+    def timeframe(self) -> str:
+        return self.scheduler.timeframe
+
+    def due_ms(self) -> int:
+        """다음 사이클 시작 시각 (다음 마감 - 사전 수집 시간)"""
+        if self.next_close_ms is None:
+            self.next_close_ms = self.scheduler.next_close_ms()
+        return self.next_close_ms - int(self.scheduler.prefetch_lead * 1000)
+
+    def scheduled_busy(self) -> bool:
+        """정규 회차(사전 수집 ~ 마감 단계)가 진행 중인지"""
+        return self.pending_close_ms is not None or _running(self.cycle_future)
+
+
+class SymbolScheduler:
+    """심볼별 주기에 맞춰 사전 수집/마감 단계를 작업자 풀에서 실행"""
+
+    def __init__(self, jobs: List[SymbolJob],
+                 run_cycle: Callable[[SymbolJob, Optional[int], Any, Optional[Dict]], None],
+                 prefetch: Optional[Callable[[SymbolJob, int], Any]] = None,
+                 max_workers: Optional[int] = None, max_sleep: float = 30.0, poll_interval: float = 0.2):
+        self.jobs = jobs
+        self.run_cycle = run_cycle
+        self.prefetch = prefetch
+        self.max_workers = max_workers or len(jobs)
+        self.max_sleep = max_sleep
+        # 마감이 지났는데 확정봉을 아직 못 받은 심볼이 있을 때의 확인 주기
+        self.poll_interval = poll_interval
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='symbol')
+        self._stop = threading.Event()
+        # 작업이 끝나면 바로 다음 단계를 넘기도록 스케줄러 스레드를 깨움
+        self._wake = threading.Event()
+        # 스케줄러 스레드와 이벤트 트리거 스레드가 같은 심볼 상태를 바꾸지 않도록 보호
+        self._lock = threading.Lock()
+
+    def _submit(self, func, *args) -> Future:
+        future = self._pool.submit(func, *args)
+        future.add_done_callback(lambda _: self._wake.set())
+        return future
+
+    def _run_close(self, job: SymbolJob, close_ms: int, prefetch_future: Optional[Future]):
+        prefetched = None
+        if prefetch_future is not None:
+            try:
+                prefetched = prefetch_future.result()
+            except Exception as e:
+                logger.error(f"{job.symbol} 사전 수집 중 에러 발생 (마감 단계에서 다시 수집): {e}")
+        try:
+            self.run_cycle(job, close_ms, prefetched, None)
+        except Exception as e:
+            logger.error(f"{job.symbol} 사이클 실행 중 에러 발생: {e}")
+
+    def _run_event(self, job: SymbolJob, event: Dict):
+        try:
+            self.run_cycle(job, None, None, event)
+        except Exception as e:
+            logger.error(f"{job.symbol} 이벤트 사이클 실행 중 에러 발생: {e}")
+
+    def _start_due(self, job: SymbolJob, launched: List[Tuple[str, str]]):
+        if job.scheduler.clock.now_ms() < job.due_ms():
+            return
+        if _running(job.event_future):
+            # 이벤트 사이클이 끝나면 바로 시작 (건너뛰지 않음)
+            if not job.deferred:
+                job.deferred = True
+                logger.info(f"{job.symbol} 이벤트 사이클이 끝난 뒤 정규 사이클 시작")
+            return
+        job.deferred = False
+        close_ms = job.next_close_ms
+        # 다음 회차 (오래 멈춰 있었으면 지난 회차는 건너뛰고 다가오는 마감부터)
+        job.next_close_ms = max(close_ms + job.scheduler.tf_ms, job.scheduler.next_close_ms())
+        if job.scheduled_busy():
+            job.skipped += 1
+            CYCLE_SKIPS.inc(symbol=job.symbol)
+            logger.warning(f"{job.symbol} 이전 사이클이 아직 실행 중이라 이번 회차는 건너뜀 ({job.skipped}회)")
+            return
+        job.pending_close_ms = close_ms
+        job.prefetch_future = self._submit(self.prefetch, job, close_ms) if self.prefetch is not None else None
+        launched.append((job.symbol, 'prefetch'))
+
+    def _start_close(self, job: SymbolJob, launched: List[Tuple[str, str]]):
+        close_ms = job.pending_close_ms
+        if close_ms is None or _running(job.prefetch_future):
+            return
+        if not job.scheduler.close_ready(close_ms, stream=job.components.get('stream'), symbol=job.symbol):
+            return
+        job.pending_close_ms = None
+        job.cycle_future = self._submit(self._run_close, job, close_ms, job.prefetch_future)
+        job.prefetch_future = None
+        launched.append((job.symbol, 'close'))
+
+    def run_pending(self) -> List[Tuple[str, str]]:
+        """시작할 때가 된 단계를 풀에 넘기고 (심볼, 'prefetch'/'close') 목록 반환"""
+        launched: List[Tuple[str, str]] = []
+        with self._lock:
+            for job in self.jobs:
+                self._start_due(job, launched)
+                self._start_close(job, launched)
+        return launched
+
+    def trigger(self, symbol: str, event: Dict) -> bool:
+        """정규 주기 밖의 이벤트 사이클 실행
+
+        심볼이 없거나, 이벤트/정규 사이클이 진행 중이거나, 정규 사이클의 사전 수집 시각이 지났으면
+        (곧 정규 결정이 나오므로) 실행하지 않고 False.
+        """
+        job = next((job for job in self.jobs if job.symbol == symbol), None)
+        if job is None:
+            return False
+        with self._lock:
+            if _running(job.event_future) or job.scheduled_busy():
+                return False
+            if job.scheduler.clock.now_ms() >= job.due_ms():
+                return False
+            job.event_future = self._submit(self._run_event, job, event)
+        return True
+
+    def seconds_until_next(self) -> float:
+        waits = []
+        for job in self.jobs:
+            target_ms = job.pending_close_ms if job.pending_close_ms is not None else job.due_ms()
+            remaining = (target_ms - job.scheduler.clock.now_ms()) / 1000
+            # 시각이 지났는데 아직 못 넘긴 단계 (확정봉/사전 수집/이벤트 사이클 대기) 는 짧게 다시 확인
+            waits.append(remaining if remaining > 0 else self.poll_interval)
+        return min(waits)
+
+    def run_forever(self):
+        logger.info(f"심볼 스케줄러 시작: {[(job.symbol, job.timeframe) for job in self.jobs]}, "
+                    f"작업자 {self.max_workers}개")
+        while not self._stop.is_set():
+            self._wake.clear()
+            self.run_pending()
+            # 긴 대기 중에도 시계 오차 갱신/중지 요청을 반영하도록 나눠서 대기
+            self._wake.wait(min(self.seconds_until_next(), self.max_sleep))
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        self._pool.shutdown(wait=False)
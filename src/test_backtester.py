@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+from backtester import Backtester, _target_positions
+
+SIGNALS = ('HOLD', 'LONG', 'SHORT', 'CLOSE', 'LONG->SHORT', 'SHORT->LONG')
+
+
+def _reference_positions(signals):
+    """execute_trade 의 포지션 규칙을 봉 단위로 그대로 따라가는 참조 구현"""
+    state, out = 0, []
+    for signal in signals:
+        if signal in ('LONG', 'SHORT', 'CLOSE', 'LONG->SHORT'):
+            state = {'LONG': 1, 'SHORT': -1, 'CLOSE': 0, 'LONG->SHORT': -1}[signal]
+        elif signal == 'SHORT->LONG' and state != 0:
+            state = 1
+        out.append(state)
+    return np.array(out, dtype=float)
+
+
+def test_target_positions_match_bar_by_bar_rules():
+    rng = np.random.default_rng(7)
+    for _ in range(100):
+        signals = rng.choice(SIGNALS, size=300, p=[0.5, 0.1, 0.1, 0.1, 0.05, 0.15])
+        assert (_target_positions(signals) == _reference_positions(signals)).all()
+
+
+def test_fills_at_next_open_with_sizing_fees_and_flip_buffer():
+    prices = [100.0, 100.0, 110.0, 120.0, 120.0, 90.0, 90.0]
+    df = pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=len(prices), freq='h'),
+        'open': prices, 'high': prices, 'low': prices, 'close': prices, 'volume': 1.0
+    })
+    signals = np.array(['LONG', 'HOLD', 'HOLD', 'LONG->SHORT', 'HOLD', 'CLOSE', 'HOLD'])
+    backtester = Backtester(initial_equity=1000, fee_rate=0.001, slippage=0.0, flip_buffer=0.95)
+    result = backtester.run(df, lambda df, ind: signals, leverage=2, investment_ratio=0.5, indicators={})
+    trades = result['trades']
+
+    # 롱: 1봉 시가 100 진입, 4봉 시가 120 청산 (금액 1000 x 0.5 x 2)
+    long_trade = trades.iloc[0]
+    assert long_trade['side'] == 'LONG'
+    assert long_trade['quantity'] == 10
+    fees = 1000 * 0.001 + 1200 * 0.001
+    assert np.isclose(long_trade['pnl'], 200 - fees)
+
+    # 숏 전환: 자산 x 0.5 x 2 x 0.95, 4봉 시가 120 진입, 6봉 시가 90 청산
+    equity = 1000 + long_trade['pnl']
+    short_trade = trades.iloc[1]
+    assert short_trade['side'] == 'SHORT'
+    assert np.isclose(short_trade['notional'], equity * 0.95)
+    quantity = equity * 0.95 / 120
+    assert np.isclose(short_trade['pnl'], quantity * 30 - equity * 0.95 * 0.001 - quantity * 90 * 0.001)
+
+    stats = result['stats']
+    assert stats['trades'] == 2
+    assert np.isclose(stats['final_equity'], equity + short_trade['pnl'])
+    assert np.isclose(result['equity'].iloc[-1], stats['final_equity'])
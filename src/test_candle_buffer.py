@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from candle_buffer import CandleBuffer
+
+
+def _bar(ts):
+    return [ts, ts + 0.1, ts + 0.5, ts - 0.5, ts + 0.2, 10.0]
+
+
+def test_append_keeps_latest_capacity_bars_contiguous():
+    buffer = CandleBuffer(4, slack=2)
+    for ts in range(10):
+        buffer.append(*_bar(ts))
+    assert len(buffer) == 4
+    assert buffer.timestamps().tolist() == [6, 7, 8, 9]
+    assert buffer.window(2)['close'].tolist() == [8.2, 9.2]
+    # 같은 시각은 교체, 더 오래된 봉은 무시
+    buffer.append(9, 1, 1, 1, 99, 1)
+    buffer.append(3, 1, 1, 1, 1, 1)
+    assert buffer.timestamps().tolist() == [6, 7, 8, 9]
+    assert buffer.window()['close'][-1] == 99
+
+
+def test_extend_merges_gap_rows_in_order():
+    buffer = CandleBuffer(5)
+    buffer.extend([_bar(1), _bar(2), _bar(5)])
+    buffer.extend([_bar(3), _bar(4), [5, 0, 0, 0, 55, 0], _bar(6)])
+    assert buffer.timestamps().tolist() == [2, 3, 4, 5, 6]
+    assert buffer.window()['close'].tolist() == [2.2, 3.2, 4.2, 55, 6.2]
+
+
+def test_views_are_read_only_and_frame_is_a_copy():
+    buffer = CandleBuffer(3, dtype=np.float32)
+    buffer.extend([_bar(1000 * i) for i in range(3)])
+    window = buffer.window()
+    with pytest.raises(ValueError):
+        window['close'][0] = 0
+    assert np.shares_memory(window['close'], buffer.window()['close'])
+
+    frame = buffer.to_frame(2)
+    assert list(frame.columns) == ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+    assert frame['close'].dtype == np.float64
+    assert str(frame['timestamp'].iloc[-1]) == '1970-01-01 00:00:02'
@@ -0,0 +1,47 @@
+import numpy as np
+from candle_patterns import detect_patterns, recent_patterns
+
+
+def _bars(tail, trend=0.0, n=20):
+    """평균 봉 길이 10 인 기준 봉 n개 (봉마다 trend 만큼 이동) 뒤에 tail 봉을 붙임"""
+    rows, price = [], 1000.0
+    for _ in range(n):
+        o, c = price, price + trend
+        rows.append((o, max(o, c) + 4, min(o, c) - 4, c))
+        price = c
+    rows.extend((price + o, price + h, price + l, price + c) for o, h, l, c in tail)
+    return [np.array(col, dtype=float) for col in zip(*rows)]
+
+
+def _last(patterns):
+    return {name: scores[-1] for name, scores in patterns.items() if scores[-1] > 0}
+
+
+def test_bullish_engulfing_after_downtrend():
+    # 하락 추세 뒤 음봉을 감싸는 큰 양봉
+    detected = _last(detect_patterns(*_bars([(0, 1, -6, -5), (-6, 5, -7, 4)], trend=-3)))
+    assert set(detected) == {'bullish_engulfing'}
+    assert detected['bullish_engulfing'] > 70
+
+
+def test_hammer_and_doji():
+    hammer = _last(detect_patterns(*_bars([(0, 2.2, -10, 2)], trend=-3)))
+    assert 'hammer' in hammer and 'shooting_star' not in hammer
+
+    doji = _last(detect_patterns(*_bars([(0, 5, -5, 0.1)])))
+    assert doji['doji'] > 90
+
+
+def test_morning_star_and_inside_bar():
+    morning = _last(detect_patterns(*_bars([(0, 1, -13, -12), (-13, -11, -15, -13.5), (-13, 0, -14, -1)])))
+    assert 'morning_star' in morning
+
+    inside = _last(detect_patterns(*_bars([(0, 10, -10, 5), (4, 6, 1, 3)])))
+    assert 'inside_bar' in inside
+
+
+def test_recent_patterns_lists_latest_first():
+    patterns = {'doji': np.array([0, 90.0, 0, 60.0]), 'inside_bar': np.array([0, 0, 0, 80.0])}
+    found = recent_patterns(patterns, lookback=3, min_confidence=55)
+    assert [(p['name'], p['bars_ago']) for p in found] == [('inside_bar', 0), ('doji', 0), ('doji', 2)]
+    assert found[0]['pattern'] == '인사이드바'
@@ -0,0 +1,115 @@
+import threading
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from models import Base
+from candle_store import CandleStore
+
+HOUR_MS = 3600 * 1000
+START = 1704067200000  # 2024-01-01 00:00 UTC
+
+
+class _FakeExchange:
+    """시각을 옮길 수 있고 kline 조회 요청을 기록하는 거래소"""
+
+    def __init__(self, now_ms, missing=()):
+        self.now = now_ms
+        # 거래소에도 없는 봉 (점검 구간 등)
+        self.missing = set(missing)
+        self.calls = []
+
+    def parse_timeframe(self, timeframe):
+        return 3600
+
+    def milliseconds(self):
+        return self.now
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None, params=None):
+        self.calls.append((since, params['until']))
+        last_closed = (self.now // HOUR_MS) * HOUR_MS - HOUR_MS
+        end = min(params['until'], last_closed)
+        return [[ts, ts / HOUR_MS, 0, 0, float(ts // HOUR_MS), 1.0]
+                for ts in range(since, end + HOUR_MS, HOUR_MS) if ts not in self.missing]
+
+
+def _session_factory(path):
+    engine = create_engine(f'sqlite:///{path}', connect_args={'check_same_thread': False})
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+
+def _now(bars):
+    """START 부터 bars 개의 봉이 확정된 시각"""
+    return START + bars * HOUR_MS + 1000
+
+
+def test_first_fill_then_only_new_tail(tmp_path):
+    exchange = _FakeExchange(_now(10))
+    store = CandleStore(exchange, session_factory=_session_factory(tmp_path / 'candles.db'))
+
+    df = store.get_candles('BTCUSDT', '1h', limit=10)
+    assert exchange.calls == [(START, START + 9 * HOUR_MS)]
+    assert len(df) == 10 and df['close'].iloc[-1] == START // HOUR_MS + 9
+
+    # 같은 봉 안에서는 조회하지 않고, 다음 봉이 확정되면 그 봉만 조회
+    store.get_candles('BTCUSDT', '1h', limit=10)
+    assert len(exchange.calls) == 1
+    exchange.now = _now(12)
+    df = store.get_candles('BTCUSDT', '1h', limit=10)
+    assert exchange.calls[1:] == [(START + 10 * HOUR_MS, START + 11 * HOUR_MS)]
+    assert df['close'].iloc[-1] == START // HOUR_MS + 11
+
+
+def test_gap_is_backfilled_and_unavailable_bars_are_not_refetched(tmp_path):
+    exchange = _FakeExchange(_now(10), missing={START + 3 * HOUR_MS})
+    store = CandleStore(exchange, session_factory=_session_factory(tmp_path / 'candles.db'))
+    store.get_candles('BTCUSDT', '1h', limit=10)
+    # 거래소에도 없는 봉은 기록해두고 다시 조회하지 않음
+    assert store.get_candles('BTCUSDT', '1h', limit=10)['timestamp'].size == 9
+    assert len(exchange.calls) == 1
+
+    # 실시간 피드가 끊겨 중간 봉을 놓친 경우: 갭 구간만 조회해 채움
+    exchange.now = _now(14)
+    store.append_closed_bar('BTCUSDT', '1h', [START + 13 * HOUR_MS, 1, 1, 1, 1, 1])
+    df = store.get_candles('BTCUSDT', '1h', limit=10)
+    assert exchange.calls[1:] == [(START + 10 * HOUR_MS, START + 12 * HOUR_MS)]
+    # 빈 봉(3번)은 창 밖으로 밀려남
+    assert len(df) == 10
+    assert df['close'].tolist()[-4:] == [START // HOUR_MS + 10, START // HOUR_MS + 11, START // HOUR_MS + 12, 1]
+
+
+def test_candles_persist_across_restart(tmp_path):
+    path = tmp_path / 'candles.db'
+    exchange = _FakeExchange(_now(10))
+    CandleStore(exchange, session_factory=_session_factory(path)).get_candles('BTCUSDT', '1h', limit=10)
+
+    # 재시작: 새 저장소/세션이 DB 에서 로드하고 그 뒤에 확정된 봉만 조회
+    exchange.calls.clear()
+    exchange.now = _now(11)
+    restarted = CandleStore(exchange, session_factory=_session_factory(path))
+    df = restarted.get_candles('BTCUSDT', '1h', limit=10)
+    assert exchange.calls == [(START + 10 * HOUR_MS, START + 10 * HOUR_MS)]
+    assert len(df) == 10 and df['close'].iloc[0] == START // HOUR_MS + 1
+
+
+def test_read_window_blocks_stream_appends_while_borrowed(tmp_path):
+    exchange = _FakeExchange(_now(10))
+    store = CandleStore(exchange, session_factory=_session_factory(tmp_path / 'candles.db'))
+    closed_bar = [START + 10 * HOUR_MS, 1, 1, 1, 1, 1]
+    appender = threading.Thread(target=store.append_closed_bar, args=('BTCUSDT', '1h', closed_bar))
+
+    with store.read_window('BTCUSDT', '1h', limit=10) as window:
+        closes = window['close']
+        before = closes.tolist()
+        appender.start()
+        # 뷰를 빌려준 동안에는 실시간 피드가 버퍼를 바꾸지 못함
+        appender.join(0.2)
+        assert appender.is_alive()
+        assert closes.tolist() == before
+    appender.join(5)
+
+    # 피드로 받은 봉은 조회 없이 다음 구간에 포함
+    exchange.now = _now(11)
+    assert store.refresh('BTCUSDT', '1h', limit=10) == 10
+    with store.read_window('BTCUSDT', '1h', limit=10) as window:
+        assert window['timestamp'][-1] == START + 10 * HOUR_MS
+    assert len(exchange.calls) == 1
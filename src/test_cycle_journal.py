@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+from cycle_journal import CycleJournal, candle_columns, read_journal, replay
+from trading_advisor import TradingAdvisor
+from decision_cascade import ModelCascade
+from llm_backends import LocalBackend
+from test_decision_cache import _features
+from test_trading_advisor import RESPONSE
+
+DAY_MS = 86400 * 1000
+START_MS = 1704067200000  # 2024-01-01 00:00 UTC
+
+
+def _record(cycle_ms, rsi=60, response=RESPONSE, position='LONG'):
+    window = {'timestamp': np.arange(3, dtype=np.int64) * 3600000 + cycle_ms,
+              'close': np.array([42000.0, 42100.5, 42050.0])}
+    return {
+        'cycle_ms': cycle_ms,
+        'symbol': 'BTCUSDT',
+        'candles': candle_columns(window),
+        'technical': {'rsi': np.float64(rsi)},
+        'features': _features(rsi),
+        'report': '리포트',
+        'response': response,
+        'decision': {'position': position, 'leverage': '5', 'investment_ratio': '0.3'},
+    }
+
+
+def test_append_and_read_range(tmp_path):
+    journal = CycleJournal(str(tmp_path))
+    for i in range(3):
+        journal.append(_record(START_MS + i * DAY_MS))
+    assert len(list(tmp_path.glob('cycles-*.jnl'))) == 3
+
+    records = list(read_journal(str(tmp_path), start_ms=START_MS + DAY_MS))
+    assert [r['cycle_ms'] for r in records] == [START_MS + DAY_MS, START_MS + 2 * DAY_MS]
+    assert records[0]['candles']['close'] == [42000.0, 42100.5, 42050.0]
+    assert records[0]['technical']['rsi'] == 60.0
+
+
+def test_candle_columns_from_frame():
+    frame = pd.DataFrame({'timestamp': pd.to_datetime([START_MS, START_MS + 3600000], unit='ms'),
+                          'close': [42000.0, 42100.5]})
+    assert candle_columns(frame) == {'timestamp': [START_MS, START_MS + 3600000], 'close': [42000.0, 42100.5]}
+
+
+def test_truncated_tail_is_skipped(tmp_path):
+    journal = CycleJournal(str(tmp_path))
+    journal.append(_record(START_MS))
+    journal.append(_record(START_MS + 3600000))
+    path = next(tmp_path.glob('cycles-*.jnl'))
+    path.write_bytes(path.read_bytes()[:-10])
+    assert len(list(read_journal(str(tmp_path)))) == 1
+
+
+def test_replay_through_advisor_and_executor():
+    class _PaperExecutor:
+        def __init__(self):
+            self.orders = []
+
+        def execute_trade(self, symbol, trading_decision):
+            self.orders.append((symbol, trading_decision['position']))
+            return True
+
+    records = [_record(START_MS, rsi=60), _record(START_MS + 3600000, rsi=80)]
+    # 캐스케이드를 켠 설정으로 다시 돌리면 조용한 첫 사이클은 LLM 응답 없이 HOLD
+    advisor = TradingAdvisor(backend=LocalBackend(''), cascade=ModelCascade(), deadline=30)
+    executor = _PaperExecutor()
+    results = list(replay(records, advisor=advisor, executor=executor))
+    assert [decision['position'] for _, decision, _ in results] == ['HOLD', 'LONG']
+    assert executor.orders == [('BTCUSDT', 'HOLD'), ('BTCUSDT', 'LONG')]
+    assert results[1][2] == RESPONSE
@@ -0,0 +1,70 @@
+import time
+from cycle_scheduler import ServerClock, CycleScheduler
+
+HOUR_MS = 3600 * 1000
+
+
+class _FakeExchange:
+    """로컬 시계보다 2.5초 빠른 서버"""
+
+    def __init__(self, server_ahead_ms=2500):
+        self.server_ahead_ms = server_ahead_ms
+        self.options = {}
+
+    def fetch_time(self):
+        return int(time.time() * 1000 + self.server_ahead_ms)
+
+
+class _FakeStream:
+    def __init__(self, bar):
+        self.bar = bar
+        self.requested = None
+
+    def wait_for_closed_bar(self, symbol, start_ms, timeout):
+        self.requested = start_ms
+        return self.bar
+
+
+def test_server_clock_offset():
+    clock = ServerClock(_FakeExchange())
+    assert abs(clock.sync() - 2500) < 50
+    assert abs(clock.now_ms() - (time.time() * 1000 + 2500)) < 50
+
+    # 조회가 모두 실패하면 ccxt 의 timeDifference (로컬 - 서버) 사용
+    class _Broken:
+        options = {'timeDifference': 800}
+
+        def fetch_time(self):
+            raise ConnectionError('down')
+
+    clock = ServerClock(_Broken())
+    assert clock.sync() == -800
+
+
+def test_next_close_uses_server_time():
+    clock = ServerClock(_FakeExchange())
+    scheduler = CycleScheduler(clock, timeframe='1h')
+    clock.offset_ms = HOUR_MS * 10 - time.time() * 1000 - 1000  # 서버 시각: 10시 정각 1초 전
+    assert scheduler.next_close_ms() == HOUR_MS * 10
+    clock.offset_ms += 2000  # 정각 1초 후
+    assert scheduler.next_close_ms() == HOUR_MS * 11
+
+
+def test_wait_for_close_and_latency():
+    clock = ServerClock(_FakeExchange())
+    clock.sync()
+    scheduler = CycleScheduler(clock, timeframe='1h', close_grace=0.2)
+    close_ms = (clock.now_ms() // HOUR_MS) * HOUR_MS
+    stream = _FakeStream([close_ms - HOUR_MS, 1, 2, 0.5, 1.5, 10])
+    assert scheduler.wait_for_close(close_ms, stream=stream, symbol='BTCUSDT')[0] == close_ms - HOUR_MS
+    assert stream.requested == close_ms - HOUR_MS
+
+    # 확정봉을 못 받으면 유예 시간 후 None (REST 조회에 맡김)
+    close_ms = clock.now_ms()
+    started = time.perf_counter()
+    assert scheduler.wait_for_close(close_ms, stream=_FakeStream(None), symbol='BTCUSDT') is None
+    assert time.perf_counter() - started >= 0.19
+
+    assert scheduler.record_order(clock.now_ms() - 1500) >= 1.5
+    stats = scheduler.latency_stats()
+    assert stats['count'] == 1 and stats['p90'] >= 1.5
@@ -0,0 +1,126 @@
+import math
+import threading
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from models import Base
+from candle_store import CandleStore
+from data_collector import MarketDataCollector
+from derivatives_snapshot import DerivativesCache
+from rate_limiter import RateLimiter
+
+HOUR_MS = 3600 * 1000
+NOW_MS = 1704067200000 + 10 * HOUR_MS + 1000
+
+
+def _bar(ts):
+    close = 100 + 10 * math.sin(ts / HOUR_MS / 7) + (ts // HOUR_MS) % 3
+    return [ts, close - 0.5, close + 1.0, close - 1.5, close, 10.0 + (ts // HOUR_MS) % 5]
+
+
+class _CountingLimiter(RateLimiter):
+    def __init__(self):
+        super().__init__(rate_per_second=1000)
+        self.acquired = 0
+        self._count_lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        with self._count_lock:
+            self.acquired += 1
+        return super().acquire(tokens)
+
+
+class _StubExchange:
+    """BADUSDT 캔들 조회만 실패하는 거래소"""
+
+    def __init__(self):
+        self.markets = {}
+        # 두 심볼의 첫 1h 조회가 동시에 진행 중이어야 통과 (순차 수집이면 타임아웃)
+        self.barrier = threading.Barrier(2, timeout=5)
+        self.waiting = {'BTCUSDT', 'ETHUSDT'}
+
+    def load_markets(self):
+        self.markets = {'BTCUSDT': {}, 'ETHUSDT': {}, 'BADUSDT': {}}
+
+    def parse_timeframe(self, timeframe):
+        return {'1h': 3600, '4h': 4 * 3600}[timeframe]
+
+    def milliseconds(self):
+        return NOW_MS
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None, params=None):
+        if timeframe == '1h' and symbol in self.waiting:
+            self.waiting.discard(symbol)
+            self.barrier.wait()
+        if symbol == 'BADUSDT':
+            raise RuntimeError('kline unavailable')
+        tf_ms = self.parse_timeframe(timeframe) * 1000
+        return [_bar(ts) for ts in range(since, params['until'] + tf_ms, tf_ms)]
+
+    def fetch_open_interest(self, symbol):
+        return {'info': {'openInterest': '100'}}
+
+    def fetch_funding_rate(self, symbol):
+        return {'info': {'fundingRate': '0.0001'}, 'fundingTimestamp': None}
+
+    def fetch_open_interest_history(self, symbol, timeframe, since=None, limit=None):
+        return []
+
+
+def _collector(exchange, limiter):
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    collector = MarketDataCollector(api_key='', secret_key='', rate_limiter=limiter, max_workers=4)
+    collector.exchange = exchange
+    collector.candle_store = CandleStore(exchange, session_factory=sessionmaker(bind=engine), rate_limiter=limiter)
+    collector.derivatives_cache = DerivativesCache(exchange, rate_limiter=limiter)
+    return collector
+
+
+def test_collect_isolates_symbol_errors_and_shares_rate_limiter():
+    exchange, limiter = _StubExchange(), _CountingLimiter()
+    collector = _collector(exchange, limiter)
+
+    results = collector.collect_market_data(['BTCUSDT', 'ETHUSDT', 'BADUSDT'], timeframes=('1h', '4h'), limit=5)
+
+    # 한 심볼의 실패는 그 심볼의 errors 에만 기록되고 나머지는 그대로 수집
+    for symbol in ('BTCUSDT', 'ETHUSDT'):
+        assert results[symbol]['errors'] == []
+        assert {tf: len(df) for tf, df in results[symbol]['candles'].items()} == {'1h': 5, '4h': 5}
+        assert results[symbol]['derivatives']['open_interest'] == 100.0
+    assert results['BADUSDT']['candles'] == {}
+    assert results['BADUSDT']['errors'] == ['1h candles: kline unavailable', '4h candles: kline unavailable']
+    assert results['BADUSDT']['derivatives']['funding_rate'] == 0.0001
+
+    # 모든 요청(마켓 1 + 캔들 6 + 파생상품 9)이 같은 한도를 거침
+    assert limiter.acquired == 1 + 6 + 9
+
+    # 마켓 정보는 이미 로드됐으면 다시 조회하지 않음
+    collector.collect_market_data(['BTCUSDT'], limit=5)
+    assert limiter.acquired == 16
+
+
+def test_report_reads_store_window_without_frames():
+    exchange, limiter = _StubExchange(), _CountingLimiter()
+    exchange.waiting.clear()
+    collector = _collector(exchange, limiter)
+
+    report = collector.prepare_llm_input('BTCUSDT', '1h')
+    assert 'BTCUSDT' in report
+
+    # 링 버퍼 뷰로 계산한 결과가 DataFrame 경로(get_candles)의 배치 계산과 같음
+    df = collector.candle_store.get_candles('BTCUSDT', '1h', limit=500)
+    metrics = collector.latest_metrics['BTCUSDT']
+    expected = collector.get_technical_indicators(df)
+    assert math.isclose(metrics['indicators']['rsi']['current'], expected['rsi']['current'], rel_tol=1e-9)
+    assert math.isclose(metrics['indicators']['adx']['adx'], expected['adx']['adx'], rel_tol=1e-9)
+    assert metrics['close'] == df['close'].iloc[-1]
+    assert set(metrics['multi_timeframe']) == {'4h', '1d'}
+
+    # 저널용 구간은 버퍼와 메모리를 공유하지 않는 복사본
+    window = collector.latest_windows['BTCUSDT']
+    assert len(window['timestamp']) == 500
+    assert window['timestamp'][-1] == np.datetime64(df['timestamp'].iloc[-1], 'ms').astype(np.int64)
+    with collector.candle_store.read_window('BTCUSDT', '1h', 500) as view:
+        assert not np.shares_memory(view['close'], window['close'])
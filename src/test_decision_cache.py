@@ -0,0 +1,62 @@
+import time
+from decision_cache import DecisionCache, build_features, feature_key
+
+
+def _technical(rsi, close=60000.0):
+    return {
+        'symbol': 'BTCUSDT', 'timeframe': '1h', 'close': close,
+        'indicators': {
+            'ma': {'ma_20': 59800.0, 'ma_50': 59000.0, 'ma_200': 55000.0, 'golden_cross': True},
+            'rsi': {'current': rsi, 'divergence': 'none'},
+            'macd': {'histogram': 12.0, 'cross_above': False, 'cross_below': False},
+            'bollinger': {'position': 0.72},
+            'atr': 300.0,
+            'adx': {'adx': 27.0},
+        },
+        'derivatives': {'funding_rate': 0.0001, 'oi_change_1h': 0.3, 'oi_change_24h': 1.2},
+        'patterns': [{'name': 'doji', 'bars_ago': 0}, {'name': 'hammer', 'bars_ago': 2}],
+    }
+
+
+def _features(rsi, close=60000.0, side='none'):
+    account = {'wallet': {'total_equity': 1234.5},
+               'position': {'has_position': side != 'none', 'position_side': side, 'leverage': 3, 'roe': 1.0}}
+    return build_features(account, _technical(rsi, close), {'fear_greed': 61}, {'fundamental_dxy': 104.2})
+
+
+def test_small_moves_share_a_key():
+    assert feature_key(_features(61.0, 60000)) == feature_key(_features(62.2, 60010))
+    assert feature_key(_features(61.0)) != feature_key(_features(68.0))
+    assert feature_key(_features(61.0)) != feature_key(_features(61.0, side='long'))
+    assert _features(61.0)['technical']['patterns'] == ['doji']
+
+    # 두 분석기의 달러 인덱스/금리는 다른 지표이므로 따로 남음
+    macro = build_features({}, _technical(61.0), {}, {'fundamental_dxy': 104.2, 'external_dxy': 121.3,
+                                                      'fundamental_interest_rate': 4.27,
+                                                      'external_interest_rate': 5.33})['macro']
+    assert macro == {'fundamental_dxy': 104.0, 'external_dxy': 121.5,
+                     'fundamental_interest_rate': 4.3, 'external_interest_rate': 5.25}
+
+
+def test_ttl_lru_and_stats():
+    cache = DecisionCache(path=None, ttl=60, max_entries=2)
+    assert cache.get(_features(40)) is None
+    cache.put(_features(40), {'position': 'HOLD'}, 'a', latency=2.0)
+    cache.put(_features(50), {'position': 'LONG'}, 'b', latency=3.0)
+    assert cache.get(_features(40)) == ({'position': 'HOLD'}, 'a')
+    cache.put(_features(60), {'position': 'SHORT'}, 'c')
+    assert cache.get(_features(50)) is None  # 가장 오래 안 쓴 항목 제거
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions'], stats['saved_seconds']) == (1, 2, 1, 2.0)
+
+    cache.ttl = 0
+    time.sleep(0.01)
+    assert cache.get(_features(40)) is None
+    assert cache.stats()['expired'] == 1
+
+
+def test_persists_to_disk(tmp_path):
+    path = str(tmp_path / 'decisions.json')
+    DecisionCache(path=path).put(_features(40), {'position': 'HOLD'}, '근거')
+    assert DecisionCache(path=path).get(_features(40)) == ({'position': 'HOLD'}, '근거')
+    assert DecisionCache(path=path, ttl=0).get(_features(40)) is None
@@ -0,0 +1,52 @@
+import pytest
+from decision_cascade import DEFAULT_THRESHOLDS, ModelCascade, actionability, parse_thresholds
+from llm_backends import LocalBackend
+from trading_advisor import TradingAdvisor
+from test_decision_cache import _features
+from test_trading_advisor import RESPONSE
+
+
+def test_actionability_scores_signals():
+    # RSI 60, ADX 25, MACD/ATR 0 -> 조용한 상태
+    score, reasons = actionability(_features(60))
+    assert score == 0 and reasons == []
+    score, reasons = actionability(_features(80))
+    assert score == 1.0 and reasons == ['RSI 80.0']
+
+
+def test_cascade_tiers():
+    cascade = ModelCascade(thresholds={'rsi_high': 75})
+    assert cascade.triage(_features(60))[:2] == (False, 'triage_rules')
+    assert cascade.triage(_features(80))[:2] == (True, 'triage_rules')
+
+    # 애매한 점수 구간(0.5)만 저렴한 모델에 확인
+    triage_backend = LocalBackend('판정: HOLD')
+    cascade = ModelCascade(triage_backend, thresholds={'ma_gap': 0.1})
+    assert cascade.triage(_features(60))[:2] == (False, 'triage_llm')
+    assert triage_backend.calls == 1
+    cascade.triage_backend = LocalBackend('모르겠음')
+    assert cascade.triage(_features(60))[0] is True
+
+
+def test_parse_thresholds():
+    assert parse_thresholds('') == {}
+    thresholds = parse_thresholds(' RSI_HIGH:75, hold_score:0.8,')
+    assert thresholds == {'rsi_high': 75.0, 'hold_score': 0.8}
+    cascade = ModelCascade(thresholds=thresholds)
+    assert cascade.thresholds == dict(DEFAULT_THRESHOLDS, rsi_high=75.0, hold_score=0.8)
+    assert cascade.triage(_features(72))[:2] == (False, 'triage_rules')
+    with pytest.raises(ValueError):
+        parse_thresholds('rsi_hi:75')
+
+
+def test_advisor_skips_full_prompt_on_quiet_state():
+    backend = LocalBackend(RESPONSE)
+    advisor = TradingAdvisor(backend=backend, cascade=ModelCascade())
+    decision, _ = advisor.get_trading_advice('리포트', features=_features(60))
+    assert decision['position'] == 'HOLD' and backend.calls == 0
+    assert advisor.last_decision_info['tier'] == 'triage_rules'
+
+    decision, _ = advisor.get_trading_advice('리포트', features=_features(80))
+    assert decision['position'] == 'LONG' and backend.calls == 1
+    assert advisor.last_decision_info['tier'] == 'llm'
+    assert advisor.last_decision_info['triage']['reasons'] == ['RSI 80.0']
@@ -0,0 +1,80 @@
+from collections import Counter
+import pytest
+from derivatives_snapshot import DerivativesCache
+
+START = 1704067200.0  # 2024-01-01 00:00 UTC (초)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = START
+
+    def __call__(self):
+        return self.now
+
+
+class _FakeExchange:
+    def __init__(self, clock):
+        self.clock = clock
+        self.calls = Counter()
+
+    def fetch_open_interest(self, symbol):
+        self.calls['oi'] += 1
+        return {'info': {'openInterest': '100'}}
+
+    def fetch_funding_rate(self, symbol):
+        self.calls['funding'] += 1
+        # 다음 펀딩은 2시간 뒤
+        return {'info': {'fundingRate': '0.0001'}, 'fundingTimestamp': int((self.clock() + 7200) * 1000)}
+
+    def fetch_open_interest_history(self, symbol, timeframe, since=None, limit=None):
+        self.calls['history'] += 1
+        now_ms = int(self.clock() * 1000)
+        # 24시간 전 80, 4시간 전 95, 1시간 전 99 (그 사이는 직전 값 유지)
+        values = {24: 80.0, 4: 95.0, 1: 99.0}
+        history, oi = [], 75.0
+        for hours_ago in range(25, 0, -1):
+            oi = values.get(hours_ago, oi)
+            history.append({'timestamp': now_ms - hours_ago * 3600 * 1000, 'openInterestAmount': oi})
+        return history
+
+
+def test_fields_refresh_on_their_own_ttl():
+    clock = _Clock()
+    exchange = _FakeExchange(clock)
+    cache = DerivativesCache(exchange, oi_ttl=60, history_ttl=300, funding_ttl=300, clock=clock)
+
+    cache.get_snapshot('BTCUSDT')
+    assert exchange.calls == {'oi': 1, 'funding': 1, 'history': 1}
+
+    # TTL 안에서는 조회하지 않음
+    clock.now += 30
+    cache.get_snapshot('BTCUSDT')
+    assert exchange.calls == {'oi': 1, 'funding': 1, 'history': 1}
+
+    # OI 만 만료
+    clock.now = START + 61
+    cache.get_snapshot('BTCUSDT')
+    assert exchange.calls == {'oi': 2, 'funding': 1, 'history': 1}
+
+    # 히스토리 만료, 펀딩비는 funding_ttl 이 지나도 다음 펀딩 시각까지 재사용
+    clock.now = START + 301
+    cache.get_snapshot('BTCUSDT')
+    assert exchange.calls == {'oi': 3, 'funding': 1, 'history': 2}
+
+    # 다음 펀딩 시각이 지나면 다시 조회
+    clock.now = START + 7200
+    cache.get_snapshot('BTCUSDT')
+    assert exchange.calls['funding'] == 2
+
+
+def test_oi_change_per_horizon():
+    clock = _Clock()
+    snapshot = DerivativesCache(_FakeExchange(clock), clock=clock).get_snapshot('BTCUSDT')
+    data = snapshot.to_dict(now_ms=int(clock() * 1000))
+    assert data['open_interest'] == 100.0
+    assert data['next_funding_time'] == int((START + 7200) * 1000)
+    assert data['oi_change_1h'] == pytest.approx((100 - 99) / 99 * 100)
+    assert data['oi_change_4h'] == pytest.approx((100 - 95) / 95 * 100)
+    assert data['oi_change_24h'] == pytest.approx(25.0)
+    assert data['oi_change'] == data['oi_change_24h']
@@ -0,0 +1,91 @@
+from event_triggers import EventTrigger
+
+METRICS = {
+    'close': 42000.0,
+    'indicators': {'atr': 300.0, 'bollinger': {'upper': 42400.0, 'middle': 42000.0, 'lower': 41600.0}},
+    'derivatives': {'funding_rate': 0.0001},
+}
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _trigger(clock, prices, fired, **kwargs):
+    def on_event(symbol, event):
+        fired.append(event)
+        return True
+
+    options = dict(confirm_seconds=10, cooldown=600, max_per_hour=2, clock=clock)
+    options.update(kwargs)
+    trigger = EventTrigger(['BTCUSDT'], on_event, price_source=lambda symbol: prices.get(symbol), **options)
+    trigger.record_decision('BTCUSDT', METRICS)
+    return trigger
+
+
+def test_conditions():
+    trigger = _trigger(_Clock(), {}, [])
+    assert trigger.evaluate('BTCUSDT', 42300.0) is None
+    assert trigger.evaluate('BTCUSDT', 42500.0)[0] == 'bollinger'
+    assert trigger.evaluate('BTCUSDT', 41300.0)[0] == 'atr_move'
+    assert trigger.evaluate('BTCUSDT', 42100.0, funding_rate=0.0008)[0] == 'funding'
+    assert trigger.evaluate('ETHUSDT', 1.0) is None
+
+    # 결정 당시 이미 밴드 밖이었으면 볼린저 조건은 다시 발동하지 않음
+    trigger.record_decision('BTCUSDT', METRICS, price=42500.0)
+    assert trigger.evaluate('BTCUSDT', 42550.0) is None
+
+
+def test_debounce_cooldown_and_hourly_cap():
+    clock, prices, fired = _Clock(), {}, []
+    trigger = _trigger(clock, prices, fired)
+
+    # 결정 직후 쿨다운 중에는 실행하지 않음
+    prices['BTCUSDT'] = 41300.0
+    trigger.poll_once()
+    clock.now += 20
+    assert trigger.poll_once() == [] and fired == []
+
+    # 쿨다운 이후에도 조건이 confirm_seconds 동안 유지돼야 실행
+    clock.now += 600
+    prices['BTCUSDT'] = 42000.0
+    trigger.poll_once()
+    prices['BTCUSDT'] = 41300.0
+    trigger.poll_once()
+    assert fired == []
+    clock.now += 5
+    prices.pop('BTCUSDT')
+    trigger.poll_once()  # 시세가 없는 회차는 감지 상태 유지
+    prices['BTCUSDT'] = 41300.0
+    clock.now += 5
+    assert [event['condition'] for event in trigger.poll_once()] == ['atr_move']
+    assert fired[0]['reference_price'] == 42000.0
+
+    # 시간당 상한: 이벤트 사이클이 기준을 갱신하지 않아도 한 시간에 두 번까지
+    for _ in range(3):
+        clock.now += 610
+        trigger.poll_once()
+        clock.now += 10
+        trigger.poll_once()
+    assert len(fired) == 2
+
+
+def test_busy_symbol_is_not_counted():
+    clock, prices = _Clock(), {'BTCUSDT': 41300.0}
+    calls = []
+
+    def on_event(symbol, event):
+        calls.append(event)
+        return len(calls) > 1
+
+    trigger = EventTrigger(['BTCUSDT'], on_event, price_source=prices.get,
+                           confirm_seconds=0, cooldown=0, max_per_hour=1, clock=clock)
+    trigger.record_decision('BTCUSDT', METRICS)
+    assert trigger.poll_once() == []
+    assert len(trigger.poll_once()) == 1
+    assert trigger.poll_once() == []
+    assert len(calls) == 2
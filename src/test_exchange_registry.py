@@ -0,0 +1,70 @@
+import json
+from collections import Counter
+import ccxt
+from exchange_registry import CachedBybit, ExchangeRegistry, MetadataCache
+
+MARKETS = {'BTC/USDT:USDT': {
+    'id': 'BTCUSDT', 'symbol': 'BTC/USDT:USDT', 'base': 'BTC', 'quote': 'USDT', 'settle': 'USDT',
+    'type': 'swap', 'spot': False, 'swap': True, 'linear': True, 'contract': True, 'precision': {}, 'limits': {}
+}}
+
+
+def _fake_network(monkeypatch):
+    calls = Counter()
+
+    def load_markets(self, reload=False, params={}):
+        calls['markets'] += 1
+        self.set_markets(MARKETS)
+        return self.markets
+
+    def load_time_difference(self, params={}):
+        calls['time'] += 1
+        self.options['timeDifference'] = 123
+        return 123
+
+    monkeypatch.setattr(ccxt.bybit, 'load_markets', load_markets)
+    monkeypatch.setattr(CachedBybit, 'load_time_difference', load_time_difference)
+    return calls
+
+
+def _age(path, seconds):
+    with open(path, encoding='utf-8') as f:
+        entry = json.load(f)
+    entry['saved_at'] -= seconds
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(entry, f)
+
+
+def test_metadata_is_reused_from_disk_until_ttl(tmp_path, monkeypatch):
+    calls = _fake_network(monkeypatch)
+    cache = MetadataCache(str(tmp_path))
+
+    CachedBybit({}, cache, markets_ttl=100, time_ttl=50).load_markets()
+    assert calls == {'markets': 1, 'time': 1}
+
+    # 새 클라이언트(재시작)는 디스크 캐시의 마켓 정보와 시간 오차를 그대로 사용
+    restarted = CachedBybit({}, cache, markets_ttl=100, time_ttl=50)
+    assert 'BTC/USDT:USDT' in restarted.load_markets()
+    assert restarted.options['timeDifference'] == 123
+    assert restarted.markets_by_id['BTCUSDT'][0]['symbol'] == 'BTC/USDT:USDT'
+    assert calls == {'markets': 1, 'time': 1}
+
+    # 시간 오차만 TTL 이 지나면 그것만 다시 조회
+    _age(tmp_path / 'bybit_time_difference.json', 60)
+    assert cache.load('bybit_time_difference', 50) is None
+    CachedBybit({}, cache, markets_ttl=100, time_ttl=50).load_markets()
+    assert calls == {'markets': 1, 'time': 2}
+
+
+def test_pybit_and_ccxt_share_pool_but_not_headers(tmp_path):
+    registry = ExchangeRegistry(cache_dir=str(tmp_path))
+    ccxt_client = registry.ccxt_client('key', 'secret')
+    http_client = registry.http_client('key', 'secret')
+    assert registry.ccxt_client('key', 'secret') is ccxt_client
+    assert registry.http_client('key', 'secret') is http_client
+
+    ccxt_session, pybit_session = ccxt_client.session, http_client.client
+    assert ccxt_session is not pybit_session
+    assert ccxt_session.get_adapter('https://api.bybit.com') is pybit_session.get_adapter('https://api.bybit.com')
+    assert pybit_session.headers['Content-Type'] == 'application/json'
+    assert 'Content-Type' not in ccxt_session.headers
@@ -0,0 +1,56 @@
+import math
+import numpy as np
+import pandas as pd
+from data_collector import MarketDataCollector
+from indicator_engine import IncrementalIndicatorEngine
+
+
+def _synthetic_ohlcv(n: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 60000 * np.exp(np.cumsum(rng.normal(0, 0.005, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) * (1 + rng.random(n) * 0.003)
+    low = np.minimum(open_, close) * (1 - rng.random(n) * 0.003)
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=n, freq='h'),
+        'open': open_,
+        'high': high,
+        'low': low,
+        'close': close,
+        'volume': rng.random(n) * 100
+    })
+
+
+def _assert_close(batch, streaming, path=''):
+    if isinstance(batch, dict):
+        for key in batch:
+            _assert_close(batch[key], streaming[key], f"{path}.{key}")
+    elif isinstance(batch, float):
+        if math.isnan(batch):
+            assert math.isnan(streaming), path
+        else:
+            assert math.isclose(batch, streaming, rel_tol=1e-9, abs_tol=1e-7), f"{path}: {batch} != {streaming}"
+    else:
+        assert batch == streaming, f"{path}: {batch} != {streaming}"
+
+
+def test_incremental_matches_batch():
+    collector = MarketDataCollector(api_key='', secret_key='')
+    df = _synthetic_ohlcv(600)
+
+    # 400봉으로 초기화한 뒤 나머지를 한 봉씩 반영
+    engine = IncrementalIndicatorEngine()
+    engine.warm_up(df.iloc[:400])
+    for n in range(400, len(df)):
+        bar = df.iloc[n]
+        engine.update(bar['high'], bar['low'], bar['close'], bar['volume'], timestamp=bar['timestamp'])
+        if n % 50 == 0 or n == len(df) - 1:
+            window = df.iloc[:n + 1]
+            _assert_close(collector.get_technical_indicators(window), engine.get_technical_indicators(), f"bar{n}")
+            _assert_close(collector.get_volume_analysis(window), engine.get_volume_analysis(), f"bar{n}")
+
+    print("증분 지표 엔진 결과가 배치 계산과 일치합니다")
+
+
+if __name__ == "__main__":
+    test_incremental_matches_batch()
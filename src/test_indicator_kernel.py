@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import indicator_kernel as kernel
+
+
+def _fixed_series(n: int = 300, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    close = 60000 * np.exp(np.cumsum(rng.normal(0, 0.005, n)))
+    # 보합 봉도 섞어 OBV 의 변화 없음 분기까지 확인
+    close[17::17] = close[16:-1:17]
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) * (1 + rng.random(n) * 0.003)
+    low = np.minimum(open_, close) * (1 - rng.random(n) * 0.003)
+    return high, low, close, rng.random(n) * 100
+
+
+def _pandas_reference(high, low, close, volume, period=14):
+    """통합 커널 이전의 지표별 pandas 계산"""
+    df = pd.DataFrame({'high': high, 'low': low, 'close': close, 'volume': volume})
+    out = {}
+    for p in kernel.MA_PERIODS:
+        out[f'ma_{p}'] = df['close'].rolling(window=p).mean()
+        out[f'ema_{p}'] = df['close'].ewm(span=p, adjust=False).mean()
+
+    delta = df['close'].diff()
+    avg_gain = delta.where(delta > 0, 0.0).ewm(com=period - 1, min_periods=period).mean()
+    avg_loss = (-delta.where(delta < 0, 0.0)).ewm(com=period - 1, min_periods=period).mean()
+    out['rsi'] = 100 - (100 / (1 + avg_gain / avg_loss))
+
+    out['macd'] = df['close'].ewm(span=12, adjust=False).mean() - df['close'].ewm(span=26, adjust=False).mean()
+    out['macd_signal'] = out['macd'].ewm(span=9, adjust=False).mean()
+    out['macd_hist'] = out['macd'] - out['macd_signal']
+
+    out['bb_middle'] = df['close'].rolling(window=20).mean()
+    out['bb_upper'] = out['bb_middle'] + 2 * df['close'].rolling(window=20).std()
+    out['bb_lower'] = out['bb_middle'] - 2 * df['close'].rolling(window=20).std()
+
+    prev_close, prev_high, prev_low = df['close'].shift(1), df['high'].shift(1), df['low'].shift(1)
+    tr = pd.concat([df['high'] - df['low'], (df['high'] - prev_close).abs(),
+                    (df['low'] - prev_close).abs()], axis=1).max(axis=1)
+    out['atr'] = tr.ewm(span=period, adjust=False).mean()
+    up, down = df['high'] - prev_high, prev_low - df['low']
+    plus_dm = pd.Series(np.where(up > down, np.maximum(up, 0), 0))
+    minus_dm = pd.Series(np.where(down > up, np.maximum(down, 0), 0))
+    out['plus_di'] = 100 * plus_dm.ewm(span=period, adjust=False).mean() / out['atr']
+    out['minus_di'] = 100 * minus_dm.ewm(span=period, adjust=False).mean() / out['atr']
+    dx = 100 * (out['plus_di'] - out['minus_di']).abs() / (out['plus_di'] + out['minus_di'])
+    out['adx'] = dx.ewm(span=period, adjust=False).mean()
+
+    obv = [0.0]
+    for i in range(1, len(close)):
+        step = volume[i] if close[i] > close[i - 1] else -volume[i] if close[i] < close[i - 1] else 0.0
+        obv.append(obv[-1] + step)
+    out['obv'] = pd.Series(obv)
+    out['obv_sma'] = out['obv'].rolling(window=20).mean()
+    out['volume_sma'] = df['volume'].rolling(window=20).mean()
+    return {name: series.to_numpy(dtype=float) for name, series in out.items()}
+
+
+def test_kernel_matches_pandas_reference():
+    high, low, close, volume = _fixed_series()
+    reference = _pandas_reference(high, low, close, volume)
+    series = kernel.compute_indicator_series(high, low, close, volume)
+    assert set(series) == set(reference)
+    for name, expected in reference.items():
+        np.testing.assert_allclose(series[name], expected, rtol=1e-10, atol=1e-8, equal_nan=True, err_msg=name)
+
+    # tail 을 주면 같은 값의 마지막 부분만 보관
+    tail = kernel.compute_indicator_series(high, low, close, volume, tail=kernel.SUMMARY_TAIL)
+    for name, expected in reference.items():
+        np.testing.assert_allclose(tail[name], expected[-kernel.SUMMARY_TAIL:], rtol=1e-10, err_msg=name)
+
+    summary = kernel.summarize_indicators(tail, close)
+    assert summary['rsi']['current'] == tail['rsi'][-1]
+    assert summary['adx']['trend_strength'] == kernel.trend_strength(reference['adx'][-1])
+    volume_summary = kernel.summarize_volume(kernel.compute_volume_series(close, volume), volume)
+    assert volume_summary['obv']['current'] == reference['obv'][-1]
@@ -0,0 +1,85 @@
+import time
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from models import Base
+from candle_store import CandleStore
+from market_stream import BybitMarketStream
+from ws_replay_server import ReplayWebSocketServer
+
+BAR_START = 1704067200000  # 2024-01-01 00:00 UTC
+
+
+class _FakeExchange:
+    """확정봉 반영 테스트에 필요한 최소한의 거래소 인터페이스"""
+
+    def parse_timeframe(self, timeframe):
+        return 3600
+
+    def milliseconds(self):
+        return BAR_START + 3600 * 1000 + 1000
+
+
+def _recorded_messages():
+    kline = {
+        "start": BAR_START, "end": BAR_START + 3599999, "interval": "60",
+        "open": "42000.5", "high": "42500", "low": "41800", "close": "42300.1",
+        "volume": "1234.5", "turnover": "0", "confirm": False, "timestamp": BAR_START + 3000000
+    }
+    return [
+        {"topic": "tickers.BTCUSDT", "type": "snapshot", "data": {"symbol": "BTCUSDT", "lastPrice": "42290.0"}},
+        {"topic": "kline.60.BTCUSDT", "type": "snapshot", "data": [kline]},
+        {"topic": "kline.60.BTCUSDT", "type": "snapshot", "data": [dict(kline, confirm=True)]},
+        {"topic": "tickers.BTCUSDT", "type": "delta", "data": {"symbol": "BTCUSDT", "bid1Price": "42299"}},
+        {"topic": "tickers.BTCUSDT", "type": "delta", "data": {"symbol": "BTCUSDT", "lastPrice": "42300.1"}},
+    ]
+
+
+def _memory_session_factory():
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+
+def _wait(predicate, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_stream_feeds_store_and_falls_back_on_disconnect():
+    server = ReplayWebSocketServer(_recorded_messages(), interval=0.01).start()
+    store = CandleStore(_FakeExchange(), session_factory=_memory_session_factory())
+    closed = []
+    stream = BybitMarketStream(
+        ['BTCUSDT'], timeframe='1h', url=server.url, candle_store=store,
+        on_closed_bar=lambda symbol, timeframe, bar: closed.append((symbol, timeframe, bar)),
+        max_backoff=1
+    )
+    stream.start()
+    try:
+        bar = stream.wait_for_closed_bar('BTCUSDT', BAR_START, timeout=5)
+        assert bar == [BAR_START, 42000.5, 42500.0, 41800.0, 42300.1, 1234.5]
+        assert _wait(lambda: closed == [('BTCUSDT', '1h', bar)])
+        assert _wait(lambda: stream.get_last_price('BTCUSDT') == 42300.1)
+        assert {"op": "subscribe", "args": ["kline.60.BTCUSDT", "tickers.BTCUSDT"]} in server.received
+
+        # 미확정봉은 무시하고 확정봉만 저장소에 기록 (REST 조회 없이 DB 에서 로드)
+        df = store.get_candles('BTCUSDT', '1h', limit=1)
+        assert len(df) == 1
+        assert df['close'].iloc[-1] == 42300.1
+
+        # 연결이 끊기면 None 을 반환해 호출하는 쪽이 REST 로 대체
+        server.stop()
+        assert _wait(lambda: stream.get_last_price('BTCUSDT') is None)
+    finally:
+        stream.stop()
+        server.stop()
+
+
+if __name__ == "__main__":
+    test_stream_feeds_store_and_falls_back_on_disconnect()
+    print("ok")
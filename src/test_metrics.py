@@ -0,0 +1,47 @@
+import time
+import pytest
+from flask import Flask
+from metrics import MetricsRegistry, instrument_flask, HTTP_REQUEST_SECONDS, REGISTRY
+
+
+def test_render_prometheus_text():
+    registry = MetricsRegistry()
+    counter = registry.counter('orders', '주문 수', ['side'])
+    histogram = registry.histogram('latency_seconds', '지연', ['stage'], buckets=(0.1, 1.0))
+    counter.inc(side='long')
+    counter.inc(2, side='long')
+    for value in (0.05, 0.5, 3.0):
+        histogram.observe(value, stage='technical')
+
+    text = registry.render()
+    assert '# TYPE trading_bot_orders_total counter' in text
+    assert 'trading_bot_orders_total{side="long"} 3.0' in text
+    assert 'trading_bot_latency_seconds_bucket{stage="technical",le="0.1"} 1' in text
+    assert 'trading_bot_latency_seconds_bucket{stage="technical",le="1.0"} 2' in text
+    assert 'trading_bot_latency_seconds_bucket{stage="technical",le="+Inf"} 3' in text
+    assert 'trading_bot_latency_seconds_count{stage="technical"} 3' in text
+
+    with pytest.raises(ValueError):
+        counter.inc(symbol='BTCUSDT')
+
+
+def test_observe_overhead_is_small():
+    histogram = MetricsRegistry().histogram('overhead_seconds', '측정', ['stage'])
+    started = time.perf_counter()
+    for _ in range(10000):
+        histogram.observe(0.2, stage='technical')
+    # 사이클당 수십 번 기록하므로 한 번에 수 마이크로초면 충분
+    assert (time.perf_counter() - started) / 10000 < 50e-6
+    assert histogram.count(stage='technical') == 10000
+
+
+def test_flask_routes_are_timed():
+    app = instrument_flask(Flask(__name__))
+
+    @app.route('/api/items/<int:item_id>')
+    def item(item_id):
+        return {'id': item_id}
+
+    app.test_client().get('/api/items/7')
+    assert HTTP_REQUEST_SECONDS.count(route='/api/items/<int:item_id>', method='GET', status='200') == 1
+    assert 'trading_bot_http_request_seconds_count{route="/api/items/<int:item_id>"' in REGISTRY.render()
@@ -0,0 +1,33 @@
+import functools
+from backtester import Backtester, trend_rule
+from parameter_sweep import ParameterSweep, grid, random_search
+from test_indicator_engine import _synthetic_ohlcv
+
+
+def test_sweep_matches_direct_backtest():
+    df = _synthetic_ohlcv(3000)
+    configs = grid({'rsi_period': [7, 14], 'fast': [5, 20], 'slow': [50], 'leverage': [1, 3]})
+    results = ParameterSweep(df, max_workers=2).run(configs)
+    assert len(results) == len(configs)
+    assert results['error'].isna().all()
+
+    for config in configs[:2]:
+        expected = Backtester(indicator_params={'rsi_period': config['rsi_period']}).run(
+            df, functools.partial(trend_rule, fast=config['fast'], slow=config['slow']),
+            leverage=config['leverage']
+        )['stats']
+        row = results[
+            (results['rsi_period'] == config['rsi_period'])
+            & (results['fast'] == config['fast'])
+            & (results['leverage'] == config['leverage'])
+        ].iloc[0]
+        assert row['final_equity'] == expected['final_equity']
+        assert row['trades'] == expected['trades']
+
+
+def test_random_search_samples_unique_configs():
+    space = {'a': [1, 2, 3], 'b': [10, 20], 'c': ['x', 'y']}
+    configs = random_search(space, 5, seed=3)
+    assert len({tuple(c.items()) for c in configs}) == 5
+    assert all(c in grid(space) for c in configs)
+    assert len(random_search(space, 100)) == 12
@@ -0,0 +1,55 @@
+import time
+import pytest
+from pipeline import Stage, StagePipeline, StageUnavailable
+
+
+def _sleeper(value, seconds):
+    def run():
+        time.sleep(seconds)
+        return value
+    return run
+
+
+def test_stages_run_concurrently():
+    pipeline = StagePipeline([Stage(name, _sleeper(name, 0.3), deadline=2) for name in 'abc'])
+    results = pipeline.run()
+    assert [r.value for r in results.values()] == ['a', 'b', 'c']
+    timing = pipeline.last_timing
+    # 사이클 시간은 합계가 아니라 가장 느린 단계 시간
+    assert timing['wall'] < 0.6 and timing['sum'] >= 0.9
+    assert timing['critical_path'] in 'abc'
+
+
+def test_missed_deadline_uses_placeholder_then_stale_value():
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.4 if len(calls) == 1 else 2)
+        return 'fresh'
+
+    pipeline = StagePipeline([Stage('fast', _sleeper('ok', 0), deadline=1),
+                              Stage('slow', slow, deadline=0.1, placeholder='없음')])
+    started = time.perf_counter()
+    results = pipeline.run()
+    assert time.perf_counter() - started < 0.3
+    assert results['slow'].status == 'unavailable' and results['slow'].value == '없음'
+    assert results['fast'].fresh
+
+    # 늦게 끝난 호출 값은 다음 사이클의 대체 값이 됨
+    time.sleep(0.5)
+    results = pipeline.run()
+    assert results['slow'].status == 'stale' and results['slow'].value == 'fresh'
+    # 진행 중인 호출은 중복 실행하지 않음
+    results = pipeline.run()
+    assert results['slow'].error == '이전 호출 진행 중' and len(calls) == 2
+
+
+def test_required_stage_failure_stops_cycle():
+    def broken():
+        raise ConnectionError('timeout')
+
+    pipeline = StagePipeline([Stage('wallet', broken, deadline=1, max_stale=0, required=True)])
+    with pytest.raises(StageUnavailable):
+        pipeline.run()
+    assert pipeline.stats['errors'] == 1
@@ -0,0 +1,50 @@
+import json
+from report_encoding import encode_price_history, estimate_tokens, section_token_counts
+
+
+def _records(n: int = 50):
+    records = []
+    price = 60000.0
+    for i in range(n):
+        close = price + (i % 7 - 3) * 12.345
+        records.append({
+            'timestamp': f"2024-01-{1 + i // 24:02d} {i % 24:02d}:00:00",
+            'open': price,
+            'high': max(price, close) + 5.55,
+            'low': min(price, close) - 4.44,
+            'close': close,
+            'volume': 10 + i * 0.123456
+        })
+        price = close
+    return records
+
+
+def test_csv_keeps_every_bar_and_halves_tokens():
+    records = _records()
+    compact = encode_price_history(records, 'csv')
+    rows = compact.split('\n')
+    assert rows[0] == 'time,open,high,low,close,volume'
+    assert len(rows) == len(records) + 1
+    time, open_, high, low, close, volume = rows[-1].split(',')
+    assert time == records[-1]['timestamp'][5:16]
+    assert abs(float(close) - records[-1]['close']) <= 0.05
+    assert abs(float(volume) - records[-1]['volume']) <= 0.005
+
+    verbose = json.dumps(records, indent=2, ensure_ascii=False)
+    assert estimate_tokens(compact) * 2 < estimate_tokens(verbose)
+
+
+def test_delta_reconstructs_closes():
+    records = _records()
+    rows = encode_price_history(records, 'delta', price_decimals=1).split('\n')[1:]
+    close = float(rows[0].split(',')[4])
+    for row, record in zip(rows[1:], records[1:]):
+        close += float(row.split(',')[4])
+        assert abs(close - record['close']) <= 0.05 + 1e-6
+
+
+def test_section_token_counts():
+    report = "\n리포트\n\n1. 가격:\nabc\n\n2. 지표:\n- RSI: 55.10\n"
+    counts = section_token_counts(report)
+    assert list(counts) == ['header', '1. 가격', '2. 지표', 'total']
+    assert counts['total'] == estimate_tokens(report)
@@ -0,0 +1,61 @@
+import pandas as pd
+import pytest
+from resampler import can_resample, resample_many, resample_ohlcv, timeframe_to_ms
+
+
+def _hourly(start: str, hours: int) -> pd.DataFrame:
+    timestamps = pd.date_range(start, periods=hours, freq='h')
+    index = list(range(hours))
+    return pd.DataFrame({
+        'timestamp': timestamps,
+        'open': [100.0 + i for i in index],
+        'high': [101.0 + i for i in index],
+        'low': [99.0 + i for i in index],
+        'close': [100.5 + i for i in index],
+        'volume': [1.0] * hours
+    })
+
+
+def test_can_resample_only_integer_multiples():
+    assert timeframe_to_ms('4h') == 4 * 3600 * 1000
+    assert can_resample('1h', '4h') and can_resample('15m', '1d') and can_resample('1d', '1w')
+    assert not can_resample('1h', '1h')
+    assert not can_resample('4h', '1h')
+    assert not can_resample('1h', '90m')
+    with pytest.raises(ValueError):
+        resample_ohlcv(_hourly('2024-01-01', 8), '90m', '1h')
+    with pytest.raises(ValueError):
+        timeframe_to_ms('4x')
+
+
+def test_buckets_align_to_epoch_and_drop_partial_bars():
+    # 02:00 부터 시작: 00:00~04:00 봉은 앞이 잘렸고 마지막 20:00~ 봉은 진행 중
+    df = _hourly('2024-01-01 02:00', 20)
+    result = resample_ohlcv(df, '4h', '1h')
+    assert [str(ts) for ts in result['timestamp']] == [
+        '2024-01-01 04:00:00', '2024-01-01 08:00:00', '2024-01-01 12:00:00', '2024-01-01 16:00:00']
+    first = result.iloc[0]
+    # 04:00~07:00 의 4개 봉 (입력 인덱스 2~5)
+    assert (first['open'], first['high'], first['low'], first['close'], first['volume']) == (
+        102.0, 106.0, 101.0, 105.5, 4.0)
+
+    kept = resample_ohlcv(df, '4h', '1h', drop_incomplete=False)
+    assert str(kept['timestamp'].iloc[0]) == '2024-01-01 00:00:00'
+    assert kept['volume'].tolist() == [2.0, 4.0, 4.0, 4.0, 4.0, 2.0]
+
+    # 누락 구간이 있는 봉도 제외
+    assert len(resample_ohlcv(df.drop(index=7), '4h', '1h')) == 3
+
+
+def test_daily_and_weekly_boundaries():
+    # 2024-01-01 은 월요일: 일봉은 UTC 0시, 주봉은 월요일 0시 기준
+    df = _hourly('2023-12-31 12:00', 24 * 9)
+    daily = resample_ohlcv(df, '1d', '1h')
+    assert str(daily['timestamp'].iloc[0]) == '2024-01-01 00:00:00'
+    assert len(daily) == 8
+    weekly = resample_ohlcv(df, '1w', '1h', drop_incomplete=False)
+    assert [str(ts) for ts in weekly['timestamp']] == ['2023-12-25 00:00:00', '2024-01-01 00:00:00',
+                                                       '2024-01-08 00:00:00']
+
+    # 만들 수 없는 타임프레임은 건너뜀
+    assert set(resample_many(df, '1h', ('4h', '1d', '30m'))) == {'4h', '1d'}
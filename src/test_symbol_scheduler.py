@@ -0,0 +1,186 @@
+import threading
+import time
+from cycle_scheduler import CycleScheduler
+from llm_backends import ConcurrencyLimitedBackend, LocalBackend
+from rate_limiter import RateLimiter, RateLimitedClient
+from symbol_scheduler import SymbolJob, SymbolScheduler, parse_allocations, parse_symbols
+from trade_executor import TradeExecutor
+
+HOUR_MS = 3600 * 1000
+
+
+class _FakeClock:
+    def __init__(self, now_ms):
+        self.now = now_ms
+
+    def now_ms(self):
+        return self.now
+
+
+def _job(symbol, clock, timeframe='1h'):
+    return SymbolJob(symbol, CycleScheduler(clock, timeframe=timeframe, prefetch_lead=180))
+
+
+def test_parse_symbols():
+    assert parse_symbols('btcusdt:1h, ETHUSDT:4h,SOLUSDT,') == [
+        ('BTCUSDT', '1h'), ('ETHUSDT', '4h'), ('SOLUSDT', '1h')]
+
+
+def test_allocations_cap_each_symbol():
+    assert parse_allocations('', ['BTCUSDT', 'ETHUSDT']) == {'BTCUSDT': 0.5, 'ETHUSDT': 0.5}
+    weights = parse_allocations('btcusdt:0.6', ['BTCUSDT', 'ETHUSDT', 'SOLUSDT'])
+    assert weights['BTCUSDT'] == 0.6 and abs(weights['ETHUSDT'] - 0.2) < 1e-9
+    assert abs(sum(parse_allocations('BTCUSDT:0.8,ETHUSDT:0.8', ['BTCUSDT', 'ETHUSDT']).values()) - 1) < 1e-9
+
+    class _Client:
+        def get_wallet_balance(self, **kwargs):
+            return {'result': {'list': [{'coin': [{'coin': 'USDT', 'equity': '1000'}]}]}}
+
+    executor = TradeExecutor.__new__(TradeExecutor)
+    executor.client = _Client()
+    executor.allocations = {'BTCUSDT': 0.5, 'ETHUSDT': 0.5}
+    # 사용 가능 잔고가 많아도 평가 잔고의 배분 비율까지, 다른 심볼이 증거금을 쓰고 있으면 남은 만큼
+    assert executor._symbol_budget('BTCUSDT', 1000.0) == 500.0
+    assert executor._symbol_budget('ETHUSDT', 300.0) == 300.0
+    assert executor._symbol_budget('SOLUSDT', 1000.0) == 0.0
+
+
+def test_slow_symbol_is_skipped_without_delaying_others():
+    clock = _FakeClock(10 * HOUR_MS + 1000)
+    release = threading.Event()
+    runs = []
+
+    def run_cycle(job, close_ms, prefetched, event):
+        runs.append((job.symbol, close_ms, prefetched))
+        if job.symbol == 'BTCUSDT':
+            release.wait(5)
+
+    jobs = [_job('BTCUSDT', clock), _job('ETHUSDT', clock)]
+    scheduler = SymbolScheduler(jobs, run_cycle, prefetch=lambda job, close_ms: close_ms, max_workers=2)
+    try:
+        # 마감 3분 전이 되기 전에는 실행하지 않음
+        assert scheduler.run_pending() == []
+        assert scheduler.seconds_until_next() == (HOUR_MS - 1000 - 180 * 1000) / 1000
+
+        clock.now = 11 * HOUR_MS - 180 * 1000
+        assert scheduler.run_pending() == [('BTCUSDT', 'prefetch'), ('ETHUSDT', 'prefetch')]
+        for job in jobs:
+            job.prefetch_future.result(timeout=5)
+        # 마감 후 확정봉 유예 시간이 지나야 마감 단계 시작
+        clock.now = 11 * HOUR_MS + 1000
+        assert scheduler.run_pending() == []
+        clock.now = 11 * HOUR_MS + 5000
+        assert scheduler.run_pending() == [('BTCUSDT', 'close'), ('ETHUSDT', 'close')]
+        jobs[1].cycle_future.result(timeout=5)
+        assert ('ETHUSDT', 11 * HOUR_MS, 11 * HOUR_MS) in runs
+
+        # 다음 마감: BTC 는 아직 실행 중이라 건너뛰고 ETH 는 그대로 실행
+        clock.now = 12 * HOUR_MS - 180 * 1000
+        assert scheduler.run_pending() == [('ETHUSDT', 'prefetch')]
+        assert jobs[0].skipped == 1
+
+        # 이벤트 사이클도 실행 중인 심볼/사전 수집 구간에는 넘기지 않음
+        assert not scheduler.trigger('BTCUSDT', {'condition': 'atr_move'})
+        assert not scheduler.trigger('ETHUSDT', {'condition': 'atr_move'})
+    finally:
+        release.set()
+        scheduler.stop()
+
+
+def test_single_worker_does_not_serialize_waits():
+    clock = _FakeClock(11 * HOUR_MS - 180 * 1000)
+    order = []
+
+    def prefetch(job, close_ms):
+        order.append((job.symbol, 'prefetch', clock.now))
+        return job.symbol
+
+    def run_cycle(job, close_ms, prefetched, event):
+        order.append((job.symbol, 'close', clock.now))
+        assert prefetched == job.symbol
+
+    jobs = [_job('BTCUSDT', clock), _job('ETHUSDT', clock)]
+    scheduler = SymbolScheduler(jobs, run_cycle, prefetch=prefetch, max_workers=1)
+    try:
+        # 작업자가 하나여도 두 심볼 모두 마감 전에 사전 수집을 마침 (작업자가 마감을 기다리며 잠들지 않음)
+        scheduler.run_pending()
+        for job in jobs:
+            job.prefetch_future.result(timeout=5)
+        assert [(symbol, phase) for symbol, phase, _ in order] == [
+            ('BTCUSDT', 'prefetch'), ('ETHUSDT', 'prefetch')]
+        assert all(now < 11 * HOUR_MS for _, _, now in order)
+
+        clock.now = 11 * HOUR_MS + 5000
+        assert len(scheduler.run_pending()) == 2
+        for job in jobs:
+            job.cycle_future.result(timeout=5)
+        assert [phase for _, phase, _ in order[2:]] == ['close', 'close']
+    finally:
+        scheduler.stop()
+
+
+def test_event_cycle_defers_scheduled_cycle():
+    clock = _FakeClock(11 * HOUR_MS - 600 * 1000)
+    release = threading.Event()
+    runs = []
+
+    def run_cycle(job, close_ms, prefetched, event):
+        runs.append((close_ms, event))
+        if event is not None:
+            release.wait(5)
+
+    job = _job('BTCUSDT', clock)
+    scheduler = SymbolScheduler([job], run_cycle, prefetch=lambda job, close_ms: None)
+    try:
+        assert scheduler.trigger('BTCUSDT', {'condition': 'atr_move'})
+        assert not scheduler.trigger('BTCUSDT', {'condition': 'atr_move'})
+
+        # 이벤트 사이클이 사전 수집 시각까지 이어져도 정규 회차는 건너뛰지 않고 미룸
+        clock.now = 11 * HOUR_MS - 180 * 1000
+        assert scheduler.run_pending() == []
+        assert job.skipped == 0
+        release.set()
+        job.event_future.result(timeout=5)
+        assert scheduler.run_pending() == [('BTCUSDT', 'prefetch')]
+        job.prefetch_future.result(timeout=5)
+        clock.now = 11 * HOUR_MS + 5000
+        assert scheduler.run_pending() == [('BTCUSDT', 'close')]
+        job.cycle_future.result(timeout=5)
+        assert runs[-1] == (11 * HOUR_MS, None)
+    finally:
+        release.set()
+        scheduler.stop()
+
+
+def test_shared_llm_and_rate_limits():
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def respond(prompt, temperature):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return prompt
+
+    backend = ConcurrencyLimitedBackend(LocalBackend(respond), threading.BoundedSemaphore(2))
+    threads = [threading.Thread(target=backend.generate, args=('x',)) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak[0] == 2
+
+    class _Client:
+        endpoint = 'linear'
+
+        def get_tickers(self, **kwargs):
+            return kwargs
+
+    limiter = RateLimiter(rate_per_second=1000, burst=1)
+    client = RateLimitedClient(_Client(), limiter)
+    assert client.endpoint == 'linear'
+    assert client.get_tickers(symbol='BTCUSDT') == {'symbol': 'BTCUSDT'}
+    assert limiter.tokens < 1
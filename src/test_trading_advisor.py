@@ -0,0 +1,157 @@
+import threading
+import time
+from concurrent.futures import Future
+from llm_backends import ConcurrencyLimitedBackend, LLMBackend, LocalBackend
+from trading_advisor import TradingAdvisor, _parse_trading_signal, _signal_block_complete, vote_decisions
+from test_decision_cache import _features
+from main import wait_rationale
+
+RESPONSE = """[트레이딩 신호]
+- 포지션: Long
+- 레버리지: 5
+- 투자비중: 30%
+
+[결정 근거]
+1. 기술적 분석:
+- 가격분석: 상승 추세
+"""
+
+
+class _StreamingBackend(LLMBackend):
+    """몇 글자씩 응답을 보내고, 신호 블록 이후에는 release 될 때까지 대기"""
+
+    def __init__(self, text, size=7):
+        self.chunks = [text[i:i + size] for i in range(0, len(text), size)]
+        self.release = threading.Event()
+        self.sent = 0
+
+    def stream(self, prompt, temperature=None):
+        for chunk in self.chunks:
+            if '[결정' in ''.join(self.chunks[:self.sent]):
+                self.release.wait(5)
+            self.sent += 1
+            yield chunk
+
+
+def test_parse_trading_signal():
+    assert _parse_trading_signal(RESPONSE) == {'position': 'LONG', 'leverage': '5', 'investment_ratio': '0.3'}
+    assert _parse_trading_signal('없음')['position'] == 'HOLD'
+
+
+def test_signal_block_complete_waits_for_last_line():
+    assert not _signal_block_complete('[트레이딩 신호]\n- 포지션: Long\n- 레버리지: 5\n- 투자비중: 3')
+    assert _signal_block_complete('[트레이딩 신호]\n- 포지션: Long\n- 레버리지: 5\n- 투자비중: 30%\n')
+
+
+def test_streaming_returns_decision_before_rationale():
+    backend = _StreamingBackend(RESPONSE)
+    advisor = TradingAdvisor(backend=backend)
+    decision, rationale = advisor.get_trading_advice_streaming('리포트')
+    assert decision == {'position': 'LONG', 'leverage': '5', 'investment_ratio': '0.3'}
+    assert not rationale.done()
+    # 근거 스트림이 멈추면 사이클을 붙잡지 않고 사유를 기록
+    assert '시간 초과' in wait_rationale(rationale, 0.05)
+    backend.release.set()
+    assert wait_rationale(rationale, 5) == RESPONSE
+
+    failed = Future()
+    failed.set_exception(RuntimeError('stream reset'))
+    assert wait_rationale(failed, 5) == '결정 근거 수신 실패: stream reset'
+
+
+def test_deadline_hedges_then_falls_back_to_rules():
+    # 첫 요청만 느림 -> 헤지 요청이 마감 안에 응답
+    advisor = TradingAdvisor(backend=LocalBackend(RESPONSE, latency=[5.0, 0.05]), deadline=1.0)
+    advisor.hedger.initial_hedge_delay = 0.1
+    decision, _ = advisor.get_trading_advice('리포트', features=_features(60))
+    assert decision['position'] == 'LONG'
+    assert advisor.hedger.stats['hedge_wins'] == 1
+
+    # 모든 요청이 마감을 넘기면 지표 규칙으로 결정 (상승 추세, ADX 25 -> LONG)
+    advisor = TradingAdvisor(backend=LocalBackend(RESPONSE, latency=5.0), deadline=0.3)
+    decision, response = advisor.get_trading_advice('리포트', features=_features(60))
+    assert decision == {'position': 'LONG', 'leverage': '2', 'investment_ratio': '0.2'}
+    assert '규칙 기반' in response
+    decision, rationale = advisor.get_trading_advice_streaming('리포트', features=_features(60, side='long'))
+    assert decision['position'] == 'HOLD' and rationale.done()
+
+
+def test_vote_decisions_majority_and_tie():
+    long_a = {'position': 'LONG', 'leverage': '3', 'investment_ratio': '0.2'}
+    long_b = {'position': 'LONG', 'leverage': '5', 'investment_ratio': '0.4'}
+    short = {'position': 'SHORT', 'leverage': '10', 'investment_ratio': '1.0'}
+    decision, agreement = vote_decisions([long_a, long_b, short])
+    assert decision == {'position': 'LONG', 'leverage': '4', 'investment_ratio': '0.3'}
+    assert agreement['votes'] == {'LONG': 2, 'SHORT': 1}
+    assert agreement['agreement'] == round(2 / 3, 4)
+
+    assert vote_decisions([long_a, short])[0]['position'] == 'HOLD'
+    assert vote_decisions([long_a, short], weights=[0.3, 0.9])[0]['position'] == 'SHORT'
+
+
+def test_ensemble_runs_samples_concurrently():
+    def respond(prompt, temperature):
+        position = 'Short' if temperature == 1.0 else 'Long'
+        return RESPONSE.replace('Long', position).replace('30%', '30%\n- 확신도: 80')
+
+    advisor = TradingAdvisor(backend=LocalBackend(respond, latency=0.3), ensemble_size=3)
+    started = time.perf_counter()
+    decision, response, agreement = advisor.get_ensemble_advice('리포트')
+    assert time.perf_counter() - started < 0.8
+    assert decision['position'] == 'LONG'
+    assert agreement['votes'] == {'LONG': 2, 'SHORT': 1}
+    assert [s['confidence'] for s in agreement['samples_detail']] == [0.8, 0.8, 0.8]
+    assert response.count('[트레이딩 신호]') == 3
+
+
+class _HangingBackend(LLMBackend):
+    """처음 hang 번의 호출은 timeout 을 무시하고 release 될 때까지 멈춤"""
+
+    def __init__(self, response, hang):
+        self.response = response
+        self.hang = hang
+        self.release = threading.Event()
+        self.blocked = 0
+        self._lock = threading.Lock()
+
+    def generate(self, prompt, temperature=None, timeout=None):
+        with self._lock:
+            hanging = self.hang > 0
+            self.hang -= hanging
+            self.blocked += hanging
+        if hanging:
+            self.release.wait(10)
+            with self._lock:
+                self.blocked -= 1
+        return self.response
+
+
+def test_next_ensemble_does_not_queue_behind_hung_samples():
+    backend = _HangingBackend(RESPONSE, hang=3)
+    advisor = TradingAdvisor(backend=backend, ensemble_size=3, deadline=0.3)
+    try:
+        assert advisor.get_ensemble_advice('리포트')[0]['position'] == 'HOLD'
+        assert advisor.last_decision_info['tier'] == 'fallback'
+
+        # 이전 호출의 표본 3개가 아직 멈춰 있어도 이번 호출의 표본은 바로 실행
+        decision, _, info = advisor.get_ensemble_advice('리포트')
+        assert backend.blocked == 3
+        assert info['tier'] == 'ensemble' and info['votes'] == {'LONG': 3}
+        assert decision['position'] == 'LONG'
+    finally:
+        backend.release.set()
+
+
+def test_late_ensemble_samples_release_shared_slots():
+    slots = threading.BoundedSemaphore(3)
+    backend = ConcurrencyLimitedBackend(LocalBackend(RESPONSE, latency=[30.0, 30.0, 30.0, 0.05]), slots)
+    advisor = TradingAdvisor(backend=backend, ensemble_size=3, deadline=0.5)
+    started = time.perf_counter()
+    assert advisor.get_ensemble_advice('리포트')[1] == '앙상블 응답 없음'
+
+    # 늦은 표본은 마감 시간이 지나면 자리를 돌려주므로 다음 사이클이 30초를 기다리지 않음
+    decision, _, info = advisor.get_ensemble_advice('리포트')
+    assert info['tier'] == 'ensemble' and info['votes'] == {'LONG': 3}
+    assert time.perf_counter() - started < 2.0
+    for _ in range(3):
+        assert slots.acquire(timeout=1)
@@ -1,22 +1,97 @@
 import ccxt
 import logging
-from typing import Dict
+from typing import Dict, Optional
 from decimal import Decimal, ROUND_DOWN
+import threading
 import time
 from wallet_position_tracker import WalletPositionTracker
-from pybit.unified_trading import HTTP
+from exchange_registry import get_http_client
+from rate_limiter import RateLimiter, RateLimitedClient
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 거래소 심볼 정보를 받지 못했을 때 쓰는 BTCUSDT 주문 수량 단위
+DEFAULT_LOT_SIZE = {'step': 0.001, 'min': 0.001, 'max': 119.0}
+
 class TradeExecutor:
-    def __init__(self, api_key: str, secret_key: str):
-        self.client = HTTP(
-            testnet=False,
-            api_key=api_key,
-            api_secret=secret_key
-        )
-        self.position_tracker = WalletPositionTracker(api_key, secret_key)
+    def __init__(self, api_key: str, secret_key: str, price_feed=None, rate_limiter: Optional[RateLimiter] = None,
+                 allocations: Optional[Dict[str, float]] = None):
+        self.client = get_http_client(api_key, secret_key)
+        # 여러 심볼을 동시에 운용할 때 수집기와 같은 요청 한도를 공유
+        if rate_limiter is not None:
+            self.client = RateLimitedClient(self.client, rate_limiter)
+        self.position_tracker = WalletPositionTracker(api_key, secret_key, rate_limiter=rate_limiter)
+        # 실시간 시세 피드 (BybitMarketStream), 없거나 끊겼으면 REST 조회
+        self.price_feed = price_feed
+        # 심볼별 상태: 주문 잠금 (같은 심볼은 한 번에 하나, 다른 심볼은 병렬), 마지막 조회 포지션, 주문 수량 단위
+        self.positions: Dict[str, Dict] = {}
+        self._symbol_locks: Dict[str, threading.Lock] = {}
+        self._lot_sizes: Dict[str, Dict[str, float]] = {}
+        self._locks_guard = threading.Lock()
+        # 심볼별 자본 배분 비율 (계정 평가 잔고 대비). None 이면 심볼마다 사용 가능 잔고 전체를 기준으로 주문
+        self.allocations = allocations
+
+    def _lock_for(self, symbol: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._symbol_locks.setdefault(symbol, threading.Lock())
+
+    def _lot_size(self, symbol: str) -> Dict[str, float]:
+        """심볼별 주문 수량 단위/최소/최대 (조회 실패 시 기본값, 성공한 값만 보관)"""
+        lot = self._lot_sizes.get(symbol)
+        if lot is not None:
+            return lot
+        try:
+            response = self.client.get_instruments_info(category="linear", symbol=symbol)
+            lot_filter = response['result']['list'][0]['lotSizeFilter']
+            lot = {
+                'step': float(lot_filter['qtyStep']),
+                'min': float(lot_filter['minOrderQty']),
+                'max': float(lot_filter.get('maxMktOrderQty') or lot_filter['maxOrderQty'])
+            }
+            self._lot_sizes[symbol] = lot
+            return lot
+        except Exception as e:
+            logger.warning(f"{symbol} 주문 수량 단위 조회 실패, 기본값 사용: {e}")
+            return DEFAULT_LOT_SIZE
+
+    def _round_qty(self, symbol: str, quantity: float) -> float:
+        """주문 수량을 심볼의 수량 단위로 내림"""
+        step = Decimal(str(self._lot_size(symbol)['step']))
+        return float((Decimal(str(quantity)) / step).to_integral_value(rounding=ROUND_DOWN) * step)
+
+    def _format_qty(self, symbol: str, quantity: float) -> str:
+        """주문용 수량 문자열 (수량 단위의 소수 자릿수로 표시)"""
+        step = Decimal(str(self._lot_size(symbol)['step'])).normalize()
+        decimals = max(0, -step.as_tuple().exponent)
+        return f"{self._round_qty(symbol, quantity):.{decimals}f}"
+
+    def get_account_equity(self) -> float:
+        """계정 USDT 평가 잔고 (사용 중인 증거금 포함, 심볼별 배분 기준)"""
+        try:
+            response = self.client.get_wallet_balance(accountType="UNIFIED", coin="USDT")
+            for wallet in (response or {}).get('result', {}).get('list', []):
+                for coin in wallet.get('coin', []):
+                    if coin.get('coin') == 'USDT':
+                        return float(coin.get('equity') or coin.get('walletBalance') or 0)
+            logger.warning("USDT 평가 잔고를 찾을 수 없습니다")
+            return 0.0
+        except Exception as e:
+            logger.error(f"평가 잔고 조회 중 에러 발생: {e}")
+            return 0.0
+
+    def _symbol_budget(self, symbol: str, available: float) -> float:
+        """심볼의 주문 기준 금액
+
+        배분이 있으면 계정 평가 잔고 * 심볼 비율을 넘지 않게 하고, 다른 심볼 포지션이 증거금을 쓰고 있어
+        사용 가능 잔고가 더 적으면 그 값을 쓴다 (여러 심볼이 같은 회차에 진입해도 전체 노출은 배분 합계 이내).
+        """
+        if self.allocations is None:
+            return available
+        weight = self.allocations.get(symbol, 0.0)
+        budget = min(available, self.get_account_equity() * weight)
+        logger.info(f"{symbol} 배분 잔고: {budget:.2f} USDT (비율 {weight:.0%}, 사용 가능 {available:.2f})")
+        return budget
 
     def get_wallet_balance(self) -> float:
         try:
@@ -73,6 +148,10 @@ class TradeExecutor:
 
     def get_current_price(self, symbol: str) -> float:
         """현재 가격 조회"""
+        if self.price_feed is not None:
+            price = self.price_feed.get_last_price(symbol)
+            if price:
+                return price
         try:
             response = self.client.get_tickers(
                 category="linear",
@@ -86,6 +165,11 @@ class TradeExecutor:
             return 0.0
 
     def execute_trade(self, symbol: str, trading_decision: Dict) -> bool:
+        """거래 실행 (같은 심볼의 주문은 순서대로, 다른 심볼은 동시에 실행 가능)"""
+        with self._lock_for(symbol):
+            return self._execute_trade(symbol, trading_decision)
+
+    def _execute_trade(self, symbol: str, trading_decision: Dict) -> bool:
         try:
             # 현재 포지션 확인
             current_position = self._get_current_position(symbol)
@@ -117,7 +201,7 @@ class TradeExecutor:
                         symbol=symbol,
                         side=close_side,
                         orderType="Market",
-                        qty=f"{position_size:.3f}",
+                        qty=self._format_qty(symbol, position_size),
                         reduceOnly=True
                     )
                     
@@ -141,7 +225,7 @@ class TradeExecutor:
                         symbol=symbol,
                         side=close_side,
                         orderType="Market",
-                        qty=f"{position_size:.3f}",
+                        qty=self._format_qty(symbol, position_size),
                         reduceOnly=True
                     )
                     
@@ -163,17 +247,17 @@ class TradeExecutor:
                             raise e
                     
                     # 4. 잔고 다시 확인
-                    wallet_balance = float(self.get_wallet_balance())
+                    wallet_balance = self._symbol_budget(symbol, float(self.get_wallet_balance()))
                     current_price = self.get_current_price(symbol)
                     investment_ratio = float(trading_decision.get('investment_ratio', 0.1))
                     
                     # 5. 새로운 포지션 수량 계산 (여유있게 95%만 사용)
                     order_value = wallet_balance * investment_ratio * leverage * 0.95
-                    order_quantity = round(order_value / current_price, 3)
+                    order_quantity = self._round_qty(symbol, order_value / current_price)
                     
                     logger.info(f"새로운 포지션 계산: 잔고={wallet_balance}, 가격={current_price}, 수량={order_quantity}")
                     
-                    if order_quantity >= 0.001:
+                    if order_quantity >= self._lot_size(symbol)['min']:
                         # 6. 새 포지션 진입
                         new_side = "Sell" if position == "LONG->SHORT" else "Buy"
                         self.client.place_order(
@@ -181,10 +265,10 @@ class TradeExecutor:
                             symbol=symbol,
                             side=new_side,
                             orderType="Market",
-                            qty=f"{order_quantity:.3f}",
+                            qty=self._format_qty(symbol, order_quantity),
                             isLeverage=1
                         )
-                        logger.info(f"새로운 {new_side} 포지션 진입 성공: {order_quantity} BTC")
+                        logger.info(f"새로운 {new_side} 포지션 진입 성공: {order_quantity} ({symbol})")
                         return True
                     else:
                         logger.warning(f"새로운 포지션 주문 수량이 너무 작음: {order_quantity}")
@@ -200,7 +284,7 @@ class TradeExecutor:
                 investment_ratio = float(trading_decision.get('investment_ratio', 0.1))
                 
                 # 주문 수량 계산
-                wallet_balance = self.get_wallet_balance()
+                wallet_balance = self._symbol_budget(symbol, self.get_wallet_balance())
                 current_price = self.get_current_price(symbol)
                 
                 logger.info(f"잔고: {wallet_balance} USDT")
@@ -210,14 +294,15 @@ class TradeExecutor:
                 
                 order_value = wallet_balance * investment_ratio * leverage
                 
-                # 주문 수량을 3자리로 반올림 (바이비트 최소 단위: 0.001)
-                order_quantity = round(order_value / current_price, 3)
+                # 주문 수량을 심볼의 수량 단위로 내림 (BTCUSDT: 0.001)
+                order_quantity = self._round_qty(symbol, order_value / current_price)
                 
-                logger.info(f"계산된 주문 수량: {order_quantity} BTC")
+                logger.info(f"계산된 주문 수량: {order_quantity} ({symbol})")
                 
-                # 최소 주문 수량 확인 (0.001 BTC)
-                if order_quantity < 0.001:
-                    logger.warning(f"주문 수량이 최소 수량보다 작습니다: {order_quantity} < 0.001")
+                # 최소 주문 수량 확인
+                min_qty = self._lot_size(symbol)['min']
+                if order_quantity < min_qty:
+                    logger.warning(f"주문 수량이 최소 수량보다 작습니다: {order_quantity} < {min_qty}")
                     return False
                 
                 # 레버리지 설정 (이미 설정된 경우 무시)
@@ -241,7 +326,7 @@ class TradeExecutor:
                             symbol=symbol,
                             side="Buy",
                             orderType="Market",
-                            qty=f"{order_quantity:.3f}",  # 3자리 소수점으로 포맷팅
+                            qty=self._format_qty(symbol, order_quantity),  # 3자리 소수점으로 포맷팅
                             isLeverage=1,  # 레버리지 거래 표시
                             reduceOnly=False
                         )
@@ -255,7 +340,7 @@ class TradeExecutor:
                                 symbol=symbol,
                                 side='Sell',
                                 orderType="Market",
-                                qty=str(position_size),
+                                qty=self._format_qty(symbol, position_size),
                                 reduceOnly=True
                             )
                         # 숏 포지션 진입
@@ -264,7 +349,7 @@ class TradeExecutor:
                             symbol=symbol,
                             side='Sell',
                             orderType="Market",
-                            qty=str(order_quantity)
+                            qty=self._format_qty(symbol, order_quantity)
                         )
                         return True
                         
@@ -276,7 +361,7 @@ class TradeExecutor:
                             symbol=symbol,
                             side=side,
                             orderType="Market",
-                            qty=str(position_size),
+                            qty=self._format_qty(symbol, position_size),
                             reduceOnly=True
                         )
                         return True
@@ -308,7 +393,8 @@ class TradeExecutor:
             positions = response['result']['list']
             if not positions:
                 logger.info("활성화된 포지션이 없습니다")
-                return self._empty_position()
+                self.positions[symbol] = self._empty_position()
+                return self.positions[symbol]
             
             position = positions[0]
             
@@ -333,13 +419,14 @@ class TradeExecutor:
             except (ValueError, TypeError):
                 unrealised_pnl = 0.0
             
-            return {
+            self.positions[symbol] = {
                 'side': position.get('side', 'NONE'),
                 'size': size,
                 'entry_price': entry_price,
                 'leverage': leverage,
                 'unrealised_pnl': unrealised_pnl
             }
+            return self.positions[symbol]
             
         except Exception as e:
             logger.error(f"포지션 조회 중 에러 발생: {e}")
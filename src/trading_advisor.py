@@ -1,25 +1,178 @@
-import os
-import google.generativeai as genai
 from dotenv import load_dotenv
 import logging
-from typing import Dict, Tuple
+import time
+import re
+from collections import Counter, defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+from decision_cache import DecisionCache
+from llm_backends import LLMBackend, GeminiBackend, HedgedRequest
+from rule_based_advisor import RuleBasedAdvisor
+from decision_cascade import ModelCascade
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+HOLD_DECISION = {
+    'position': 'HOLD',
+    'leverage': '0',
+    'investment_ratio': '0'
+}
+SIGNAL_FIELDS = ('포지션:', '레버리지:', '투자비중:')
+
+# 앙상블 표본별 온도와 추가 지시 (앙상블 크기가 더 크면 순환)
+ENSEMBLE_VARIANTS = (
+    {'temperature': 0.2, 'focus': ''},
+    {'temperature': 0.7, 'focus': '추세가 이어질 가능성을 중심으로 판단해주세요.'},
+    {'temperature': 1.0, 'focus': '손실과 청산 위험을 가장 먼저 고려해주세요.'},
+)
+CONFIDENCE_INSTRUCTION = "[트레이딩 신호] 마지막 줄에 '- 확신도: (0-100 사이 숫자만 표시)' 를 추가해주세요."
+
+
+def _parse_trading_signal(text: str) -> Dict:
+    """응답에서 포지션/레버리지/투자비중 파싱 (값이 없거나 범위를 벗어나면 HOLD/0)"""
+    lines = text.split('\n')
+    trading_decision = {}
+
+    for line in lines:
+        line = line.strip()
+        if '포지션:' in line:
+            position = line.split(':')[1].strip().upper()  # 대문자로 통일
+            # 허용된 포지션 값 확인
+            valid_positions = ['LONG', 'SHORT', 'HOLD', 'CLOSE', 'LONG->SHORT', 'SHORT->LONG']
+            trading_decision['position'] = position if position in valid_positions else 'HOLD'
+
+        elif '레버리지:' in line:
+            try:
+                leverage = line.split(':')[1].strip().replace('배', '')
+                leverage_value = int(leverage)
+                # 레버리지 범위 확인 (1-10)
+                if 1 <= leverage_value <= 10:
+                    trading_decision['leverage'] = str(leverage_value)
+                else:
+                    trading_decision['leverage'] = '0'
+            except:
+                trading_decision['leverage'] = '0'
+
+        elif '투자비중:' in line:
+            try:
+                ratio = line.split(':')[1].strip().replace('%', '')
+                ratio_value = float(ratio)
+                # 투자비중 범위 확인 (10-100)
+                if 10 <= ratio_value <= 100:
+                    trading_decision['investment_ratio'] = str(ratio_value/100)  # 백분율을 소수로 변환
+                else:
+                    trading_decision['investment_ratio'] = '0'
+            except:
+                trading_decision['investment_ratio'] = '0'
+
+    # 필수 키가 없는 경우 기본값 설정
+    if 'position' not in trading_decision:
+        logger.warning("포지션 정보를 찾을 수 없음")
+        trading_decision['position'] = 'HOLD'
+    if 'leverage' not in trading_decision:
+        trading_decision['leverage'] = '0'
+    if 'investment_ratio' not in trading_decision:
+        trading_decision['investment_ratio'] = '0'
+
+    # 포지션 전환 시 투자비중이 0이면 기본값 설정
+    if trading_decision['position'] in ['LONG->SHORT', 'SHORT->LONG'] and trading_decision['investment_ratio'] == '0':
+        trading_decision['investment_ratio'] = '0.7'  # 기본 70%
+        trading_decision['leverage'] = '3'  # 기본 3배
+    return trading_decision
+
+
+def _signal_block_complete(text: str) -> bool:
+    """[트레이딩 신호] 블록의 세 줄이 모두 생성됐는지 (마지막 줄은 아직 생성 중일 수 있어 제외)"""
+    if '[결정 근거]' in text:
+        return True
+    start = text.find('[트레이딩 신호]')
+    if start < 0:
+        return False
+    lines = text[start:].split('\n')[:-1]
+    return all(any(field in line for line in lines) for field in SIGNAL_FIELDS)
+
+
+def _parse_confidence(text: str) -> Optional[float]:
+    """'확신도: 80' 줄을 0~1 로 변환 (없으면 None)"""
+    match = re.search(r'확신도:\s*([0-9]+(?:\.[0-9]+)?)', text)
+    if not match:
+        return None
+    return min(max(float(match.group(1)), 0.0), 100.0) / 100
+
+
+def vote_decisions(decisions: Sequence[Dict], weights: Optional[Sequence[float]] = None) -> Tuple[Dict, Dict]:
+    """표본 결정들을 포지션 (가중) 다수결로 합치고 합의 통계 반환
+
+    동률이면 HOLD. 레버리지/투자비중은 이긴 포지션에 투표한 표본들의 중앙값.
+    """
+    weights = list(weights) if weights is not None else [1.0] * len(decisions)
+    totals = defaultdict(float)
+    for decision, weight in zip(decisions, weights):
+        totals[decision['position']] += weight
+    best = max(totals.values(), default=0.0)
+    leaders = [position for position, total in totals.items() if total == best]
+    position = leaders[0] if len(leaders) == 1 else 'HOLD'
+
+    agreeing = [d for d in decisions if d['position'] == position]
+    leverages = [float(d.get('leverage', 0)) for d in agreeing]
+    ratios = [float(d.get('investment_ratio', 0)) for d in agreeing]
+    decision = {
+        'position': position,
+        'leverage': str(int(round(np.median(leverages)))) if leverages else '0',
+        'investment_ratio': str(round(float(np.median(ratios)), 4)) if ratios else '0'
+    }
+    total_weight = sum(weights)
+    agreement = {
+        'samples': len(decisions),
+        'votes': dict(Counter(d['position'] for d in decisions)),
+        'weighted_votes': {k: round(v, 4) for k, v in totals.items()},
+        'agreement': round(totals.get(position, 0.0) / total_weight, 4) if total_weight else 0.0,
+        'unanimous': len(totals) == 1,
+        'leverage_range': [min(leverages), max(leverages)] if leverages else None,
+        'ratio_range': [min(ratios), max(ratios)] if ratios else None,
+    }
+    return decision, agreement
+
+
+def _completed(result) -> Future:
+    future = Future()
+    future.set_result(result)
+    return future
+
+
 class TradingAdvisor:
-    def __init__(self):
+    def __init__(self, decision_cache: Optional[DecisionCache] = None, backend: Optional[LLMBackend] = None,
+                 deadline: Optional[float] = None, hedge_percentile: float = 90.0,
+                 fallback: Optional[RuleBasedAdvisor] = None, ensemble_size: int = 1,
+                 ensemble_vote: str = 'majority', cascade: Optional[ModelCascade] = None):
         load_dotenv()
-        api_key = os.getenv('GEMINI_API_KEY')
-        if not api_key:
-            raise ValueError("Gemini API 키가 설정되지 않았습니다. .env 파일을 확인해주세요.")
-        
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
-
-    def get_trading_advice(self, market_analysis: str) -> Tuple[Dict, str]:
-        """시장 분석 데이터를 기반으로 트레이딩 조언 생성"""
-        prompt = f"""
+        # 마감 시간(초)이 있으면 HTTP 요청에도 같은 타임아웃 적용
+        self.backend = backend or GeminiBackend(timeout=deadline)
+        # 양자화된 시장 상태가 같으면 LLM 을 다시 호출하지 않음 (None 이면 사용 안 함)
+        self.decision_cache = decision_cache
+        # 마감 시간 안에 유효한 응답이 없거나 LLM 장애 시 지표 기반 규칙으로 결정 (features 필요)
+        self.deadline = deadline
+        self.fallback = fallback or RuleBasedAdvisor()
+        # 전체 응답과 신호 블록까지의 지연 분포가 다르므로 헤지 기준을 따로 관리
+        self.hedger = HedgedRequest(deadline, hedge_percentile) if deadline else None
+        self.stream_hedger = HedgedRequest(deadline, hedge_percentile) if deadline else None
+        # 스트리밍 모드에서 신호 이후의 결정 근거를 마저 받는 스레드
+        self._rationale_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='llm-rationale')
+        # 앙상블 모드: 표본 수와 집계 방식 ('majority' 또는 확신도 가중 'confidence')
+        self.ensemble_size = ensemble_size
+        self.ensemble_vote = ensemble_vote
+        # 캐스케이드: 1차 판별에서 행동이 필요 없다고 보면 전체 조언 없이 HOLD
+        self.cascade = cascade
+        # 마지막 결정을 내린 단계와 상세 (cache, triage_rules, triage_llm, llm, llm_stream, ensemble, fallback)
+        self.last_decision_info: Dict = {}
+        self._triage_info: Optional[Dict] = None
+        # 마지막으로 LLM 에 보낸 프롬프트 (캐시/1차 판별로 끝났으면 None, 사이클 저널 기록용)
+        self.last_prompt: Optional[str] = None
+
+    def _build_prompt(self, market_analysis: str) -> str:
+        return f"""
 당신은 암호화폐 선물 1시간봉 추세추종 트레이딩 전문가입니다. 다소 공격적인 투자성향을 지니고 있습니다. 다음 "시장 분석 리포트"와 "지갑정보" 및 "포지션 정보"를 기반으로 트레이딩 추천을 제공해주세요.
 
 {market_analysis}
@@ -63,80 +216,223 @@ class TradingAdvisor:
 5. 종합 평가:
 - 종합 평가:
 """
+
+    def _cached_advice(self, features: Optional[Dict]) -> Optional[Tuple[Dict, str]]:
+        if self.decision_cache is None or features is None:
+            return None
+        cached = self.decision_cache.get(features)
+        if cached is not None:
+            stats = self.decision_cache.stats()
+            logger.info(f"결정 캐시 적중: {cached[0]} (적중률 {stats['hit_rate']:.0%}, "
+                        f"절약한 LLM 시간 {stats['saved_seconds']:.1f}초)")
+        return cached
+
+    def _store_advice(self, features: Optional[Dict], decision: Dict, full_response: str, latency: float):
+        if self.decision_cache is not None and features is not None:
+            self.decision_cache.put(features, decision, full_response, latency=latency)
+
+    def _record(self, tier: str, **details):
+        info = {'tier': tier}
+        if self._triage_info is not None:
+            info['triage'] = self._triage_info
+        info.update(details)
+        self.last_decision_info = info
+        logger.info(f"결정 단계: {tier}")
+
+    def _screen(self, features: Optional[Dict]) -> Optional[Tuple[Dict, str]]:
+        """캐시 적중이나 1차 판별로 끝나면 (결정, 근거), 전체 조언이 필요하면 None"""
+        self._triage_info = None
+        self.last_prompt = None
+        cached = self._cached_advice(features)
+        if cached is not None:
+            self._record('cache')
+            return cached
+        if self.cascade is None or features is None:
+            return None
+        actionable, tier, info = self.cascade.triage(features)
+        self._triage_info = dict(info, tier=tier)
+        reasons = ', '.join(info['reasons']) or '뚜렷한 신호 없음'
+        if actionable:
+            logger.info(f"1차 판별({tier}): 전체 조언 요청 (점수 {info['score']}, {reasons})")
+            return None
+        self._record(tier, **info)
+        response = f"""[트레이딩 신호]
+- 포지션: Hold
+- 레버리지: 0
+- 투자비중: 0%
+
+[결정 근거]
+1차 판별({tier})에서 행동이 필요 없는 상태로 판단 (점수 {info['score']}, {reasons})
+"""
+        return dict(HOLD_DECISION), response
+
+    def _fallback_advice(self, features: Optional[Dict], reason: str) -> Tuple[Dict, str]:
+        self._record('fallback', reason=reason)
+        if features is None:
+            return dict(HOLD_DECISION), reason
+        logger.warning(f"{reason} - 규칙 기반 결정으로 대체")
+        return self.fallback.get_trading_advice(features)
+
+    def get_trading_advice(self, market_analysis: str, features: Optional[Dict] = None) -> Tuple[Dict, str]:
+        """시장 분석 데이터를 기반으로 트레이딩 조언 생성
+
+        features 는 decision_cache.build_features 결과이며, 결정 캐시 키, 1차 판별, 규칙 기반 대체 결정에 사용한다.
+        """
+        screened = self._screen(features)
+        if screened is not None:
+            return screened
+        prompt = self.last_prompt = self._build_prompt(market_analysis)
         try:
-            response = self.model.generate_content(prompt)
+            started = time.perf_counter()
+            if self.hedger is not None:
+                full_response = self.hedger.run(lambda: self.backend.generate(prompt),
+                                                is_valid=_signal_block_complete)
+                if full_response is None:
+                    return self._fallback_advice(features, "LLM 응답 마감 시간 초과")
+            else:
+                full_response = self.backend.generate(prompt)
+            latency = time.perf_counter() - started
             
-            if not response or not response.text:
+            if not full_response:
                 logger.error("LLM 응답 없음")
-                return {
-                    'position': 'HOLD',
-                    'leverage': '0',
-                    'investment_ratio': '0'
-                }, "LLM 응답 실패"
-            
-            # 응답 파싱
-            lines = response.text.split('\n')
-            trading_decision = {}
-            full_response = response.text
-            
-            for line in lines:
-                line = line.strip()
-                if '포지션:' in line:
-                    position = line.split(':')[1].strip().upper()  # 대문자로 통일
-                    # 허용된 포지션 값 확인
-                    valid_positions = ['LONG', 'SHORT', 'HOLD', 'CLOSE', 'LONG->SHORT', 'SHORT->LONG']
-                    trading_decision['position'] = position if position in valid_positions else 'HOLD'
-                    
-                elif '레버리지:' in line:
-                    try:
-                        leverage = line.split(':')[1].strip().replace('배', '')
-                        leverage_value = int(leverage)
-                        # 레버리지 범위 확인 (1-10)
-                        if 1 <= leverage_value <= 10:
-                            trading_decision['leverage'] = str(leverage_value)
-                        else:
-                            trading_decision['leverage'] = '0'
-                    except:
-                        trading_decision['leverage'] = '0'
-                        
-                elif '투자비중:' in line:
-                    try:
-                        ratio = line.split(':')[1].strip().replace('%', '')
-                        ratio_value = float(ratio)
-                        # 투자비중 범위 확인 (10-100)
-                        if 10 <= ratio_value <= 100:
-                            trading_decision['investment_ratio'] = str(ratio_value/100)  # 백분율을 소수로 변환
-                        else:
-                            trading_decision['investment_ratio'] = '0'
-                    except:
-                        trading_decision['investment_ratio'] = '0'
-            
-            # 필수 키가 없는 경우 기본값 설정
-            if 'position' not in trading_decision:
-                logger.warning("포지션 정보를 찾을 수 없음")
-                trading_decision['position'] = 'HOLD'
-            if 'leverage' not in trading_decision:
-                trading_decision['leverage'] = '0'
-            if 'investment_ratio' not in trading_decision:
-                trading_decision['investment_ratio'] = '0'
-            
-            # 포지션 전환 시 투자비중이 0이면 기본값 설정
-            if trading_decision['position'] in ['LONG->SHORT', 'SHORT->LONG'] and trading_decision['investment_ratio'] == '0':
-                trading_decision['investment_ratio'] = '0.7'  # 기본 70%
-                trading_decision['leverage'] = '3'  # 기본 3배
+                return self._fallback_advice(features, "LLM 응답 실패")
             
+            trading_decision = _parse_trading_signal(full_response)
             logger.info(f"파싱된 트레이딩 신호: {trading_decision}")
             logger.info(f"LLM 원본 응답:\n{full_response}")
+            self._record('llm', latency=round(latency, 3))
+            self._store_advice(features, trading_decision, full_response, latency)
             
             return trading_decision, full_response
             
         except Exception as e:
             logger.error(f"트레이딩 조언 생성 중 에러 발생: {e}")
-            return {
-                'position': 'HOLD',
-                'leverage': '0',
-                'investment_ratio': '0'
-            }, str(e)
+            return self._fallback_advice(features, str(e))
+
+    def _read_signal(self, prompt: str) -> Tuple[str, Iterator[str]]:
+        """[트레이딩 신호] 블록이 완성될 때까지 스트림을 읽어 (받은 텍스트, 남은 스트림) 반환"""
+        chunks = iter(self.backend.stream(prompt))
+        text = ''
+        for chunk in chunks:
+            text += chunk
+            if _signal_block_complete(text):
+                break
+        return text, chunks
+
+    def get_trading_advice_streaming(self, market_analysis: str,
+                                     features: Optional[Dict] = None) -> Tuple[Dict, Future]:
+        """스트리밍으로 생성하면서 [트레이딩 신호] 블록이 완성되는 즉시 결정 반환
+
+        결정 근거는 백그라운드에서 계속 받아 Future 로 돌려준다 (결과는 전체 응답 문자열).
+        주문은 결정으로 바로 실행하고, 거래 기록에 남길 때 Future 결과를 기다리면 된다.
+        마감 시간이 있으면 신호 블록까지의 시간에 적용한다.
+        """
+        screened = self._screen(features)
+        if screened is not None:
+            return self._with_future(screened)
+        prompt = self.last_prompt = self._build_prompt(market_analysis)
+        started = time.perf_counter()
+        try:
+            if self.stream_hedger is not None:
+                streamed = self.stream_hedger.run(lambda: self._read_signal(prompt),
+                                                  is_valid=lambda r: _signal_block_complete(r[0]))
+                if streamed is None:
+                    return self._with_future(self._fallback_advice(features, "LLM 응답 마감 시간 초과"))
+            else:
+                streamed = self._read_signal(prompt)
+            text, chunks = streamed
+        except Exception as e:
+            logger.error(f"트레이딩 조언 생성 중 에러 발생: {e}")
+            return self._with_future(self._fallback_advice(features, str(e)))
+
+        if not text:
+            logger.error("LLM 응답 없음")
+            return self._with_future(self._fallback_advice(features, "LLM 응답 실패"))
+
+        trading_decision = _parse_trading_signal(text)
+        time_to_signal = time.perf_counter() - started
+        logger.info(f"파싱된 트레이딩 신호: {trading_decision} (신호까지 {time_to_signal:.1f}초)")
+        self._record('llm_stream', time_to_signal=round(time_to_signal, 3))
+
+        def finish(text=text):
+            try:
+                for chunk in chunks:
+                    text += chunk
+            except Exception as e:
+                logger.error(f"결정 근거 수신 중 에러 발생: {e}")
+                return text
+            logger.info(f"LLM 원본 응답:\n{text}")
+            # 캐시는 근거까지 모두 받은 응답만 저장
+            self._store_advice(features, trading_decision, text, time.perf_counter() - started)
+            return text
+
+        return dict(trading_decision), self._rationale_pool.submit(finish)
+
+    def get_ensemble_advice(self, market_analysis: str,
+                            features: Optional[Dict] = None) -> Tuple[Dict, str, Dict]:
+        """온도/지시를 달리한 프롬프트 ensemble_size 개를 동시에 보내 투표로 결정
+
+        (결정, 표본 응답 모음, 합의 통계) 반환. 마감 시간이 있으면 그때까지 도착한 표본으로만 투표한다.
+        표본마다 마감 시간을 timeout 으로 넘겨 늦은 표본이 백엔드 자리를 놓고 끝나게 하고, 호출마다 새
+        풀을 써서 이전 사이클에 남은 표본 뒤에 이번 표본이 줄 서지 않게 한다.
+        """
+        screened = self._screen(features)
+        if screened is not None:
+            return screened[0], screened[1], self.last_decision_info
+        pool = ThreadPoolExecutor(max_workers=self.ensemble_size, thread_name_prefix='llm-ensemble')
+        prompt = self.last_prompt = self._build_prompt(market_analysis)
+        variants = [ENSEMBLE_VARIANTS[i % len(ENSEMBLE_VARIANTS)] for i in range(self.ensemble_size)]
+        started = time.perf_counter()
+        futures = [
+            pool.submit(
+                self.backend.generate,
+                '\n'.join(part for part in (prompt, variant['focus'], CONFIDENCE_INSTRUCTION) if part),
+                variant['temperature'], self.deadline
+            ) for variant in variants
+        ]
+        done, _ = wait(futures, timeout=self.deadline)
+        # 마감을 넘긴 표본은 기다리지 않음 (스레드는 백엔드 timeout 이 지나면 스스로 끝남)
+        pool.shutdown(wait=False, cancel_futures=True)
+        latency = time.perf_counter() - started
+
+        samples: List[Dict] = []
+        for variant, future in zip(variants, futures):
+            if future not in done or future.exception() is not None:
+                continue
+            text = future.result()
+            if not text or not _signal_block_complete(text):
+                continue
+            samples.append({
+                'decision': _parse_trading_signal(text),
+                'confidence': _parse_confidence(text),
+                'temperature': variant['temperature'],
+                'text': text
+            })
+
+        if not samples:
+            decision, response = self._fallback_advice(features, "앙상블 응답 없음")
+            return decision, response, self.last_decision_info
+
+        weights = None
+        if self.ensemble_vote == 'confidence':
+            weights = [s['confidence'] if s['confidence'] is not None else 0.5 for s in samples]
+        decision, agreement = vote_decisions([s['decision'] for s in samples], weights)
+        agreement.update(
+            size=self.ensemble_size, vote=self.ensemble_vote, latency=round(latency, 3),
+            samples_detail=[{k: s[k] for k in ('decision', 'confidence', 'temperature')} for s in samples]
+        )
+        full_response = '\n\n'.join(
+            f"=== 표본 {i + 1} (온도 {s['temperature']}) ===\n{s['text']}" for i, s in enumerate(samples)
+        )
+        logger.info(f"앙상블 결정: {decision} (득표 {agreement['votes']}, 합의율 {agreement['agreement']:.0%}, "
+                    f"{latency:.1f}초)")
+        self._record('ensemble', **agreement)
+        self._store_advice(features, decision, full_response, latency)
+        return decision, full_response, self.last_decision_info
+
+    @staticmethod
+    def _with_future(advice: Tuple[Dict, str]) -> Tuple[Dict, Future]:
+        return advice[0], _completed(advice[1])
 
     def format_trading_advice(self, decision: Dict, full_response: str) -> str:
         """트레이딩 조언을 보기 좋게 포맷팅"""
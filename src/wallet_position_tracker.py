@@ -2,6 +2,8 @@ import ccxt
 import logging
 from typing import Dict, Optional
 from datetime import datetime
+from exchange_registry import get_ccxt_client
+from rate_limiter import RateLimiter, RateLimitedClient
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -16,17 +18,13 @@ def safe_float(value, default=0.0):
         return default
 
 class WalletPositionTracker:
-    def __init__(self, api_key: str, secret_key: str):
-        self.exchange = ccxt.bybit({
-            'apiKey': api_key,
-            'secret': secret_key,
-            'enableRateLimit': True,
-            'options': {
-                'defaultType': 'linear',
-                'adjustForTimeDifference': True,
-                'recvWindow': 10000
-            }
-        })
+    def __init__(self, api_key: str, secret_key: str, rate_limiter: Optional[RateLimiter] = None):
+        self.exchange = get_ccxt_client(api_key, secret_key)
+        # 여러 심볼을 동시에 운용할 때 수집기/주문 실행기와 같은 요청 한도를 공유
+        if rate_limiter is not None:
+            self.exchange = RateLimitedClient(self.exchange, rate_limiter)
+        # 마지막 prepare_account_status 에서 조회한 지갑/포지션 (결정 캐시 키 등에 사용)
+        self.latest_status: Dict[str, Dict] = {}
 
     def get_wallet_info(self) -> Dict:
         """지갑 정보 조회"""
@@ -82,9 +80,11 @@ class WalletPositionTracker:
 
     def prepare_account_status(self, symbol: str = "BTCUSDT") -> str:
         """계정 상태 정보를 문자열로 포맷팅"""
+        self.latest_status = {}
         try:
             wallet = self.get_wallet_info()
             position = self.get_position_info(symbol)
+            self.latest_status = {'wallet': wallet, 'position': position}
             
             status = f"""
 === 계정 상태 ===
@@ -0,0 +1,186 @@
+"""녹화된 WebSocket 메시지를 재생하는 로컬 대체 서버 (오프라인 테스트용)
+
+표준 라이브러리만으로 RFC 6455 핸드셰이크와 텍스트 프레임을 처리한다.
+클라이언트가 구독하면 녹화된 메시지를 순서대로 보내고, {"op": "ping"} 에는 pong 으로 응답한다.
+"""
+
+from typing import List, Optional, Union
+import base64
+import hashlib
+import json
+import socket
+import struct
+import threading
+import time
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+def load_recording(path: str) -> List[dict]:
+    """JSONL 형식 녹화 파일 로드 (한 줄에 메시지 하나, 선택적으로 {"delay": 초, "message": {...}})"""
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class ReplayWebSocketServer:
+    """녹화된 메시지를 재생하는 단일 스레드 WebSocket 서버"""
+
+    def __init__(self, messages: List[Union[dict, str]], host: str = '127.0.0.1', port: int = 0,
+                 interval: float = 0.0):
+        self.messages = messages
+        self.interval = interval
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((host, port))
+        self._sock.listen(5)
+        self.host, self.port = self._sock.getsockname()
+        self._clients: List[socket.socket] = []
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self.received: List[dict] = []
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._accept_loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """서버 종료 (연결된 클라이언트도 끊어 연결 단절 상황 재현)"""
+        self._running = False
+        self.disconnect_clients()
+        try:
+            self._sock.close()
+        except OSError:
+            pass
+
+    def disconnect_clients(self):
+        for client in list(self._clients):
+            try:
+                client.shutdown(socket.SHUT_RDWR)
+                client.close()
+            except OSError:
+                pass
+        self._clients.clear()
+
+    def _accept_loop(self):
+        while self._running:
+            try:
+                client, _ = self._sock.accept()
+            except OSError:
+                break
+            threading.Thread(target=self._serve, args=(client,), daemon=True).start()
+
+    def _handshake(self, client: socket.socket) -> bool:
+        request = b''
+        while b'\r\n\r\n' not in request:
+            chunk = client.recv(4096)
+            if not chunk:
+                return False
+            request += chunk
+        key = None
+        for line in request.decode('latin-1').split('\r\n'):
+            if line.lower().startswith('sec-websocket-key:'):
+                key = line.split(':', 1)[1].strip()
+        if key is None:
+            return False
+        accept = base64.b64encode(hashlib.sha1((key + _WS_GUID).encode()).digest()).decode()
+        client.sendall((
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+        ).encode())
+        return True
+
+    @staticmethod
+    def _send_frame(client: socket.socket, payload: bytes, opcode: int = 0x1):
+        header = bytes([0x80 | opcode])
+        length = len(payload)
+        if length < 126:
+            header += bytes([length])
+        elif length < 65536:
+            header += bytes([126]) + struct.pack('!H', length)
+        else:
+            header += bytes([127]) + struct.pack('!Q', length)
+        client.sendall(header + payload)
+
+    @staticmethod
+    def _recv_exact(client: socket.socket, size: int) -> bytes:
+        data = b''
+        while len(data) < size:
+            chunk = client.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("client closed")
+            data += chunk
+        return data
+
+    def _recv_frame(self, client: socket.socket):
+        first, second = self._recv_exact(client, 2)
+        opcode = first & 0x0F
+        length = second & 0x7F
+        if length == 126:
+            length = struct.unpack('!H', self._recv_exact(client, 2))[0]
+        elif length == 127:
+            length = struct.unpack('!Q', self._recv_exact(client, 8))[0]
+        mask = self._recv_exact(client, 4) if second & 0x80 else b'\x00' * 4
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(self._recv_exact(client, length)))
+        return opcode, payload
+
+    def _serve(self, client: socket.socket):
+        try:
+            if not self._handshake(client):
+                client.close()
+                return
+            self._clients.append(client)
+            while self._running:
+                opcode, payload = self._recv_frame(client)
+                if opcode == 0x8:  # close
+                    self._send_frame(client, b'', opcode=0x8)
+                    break
+                if opcode == 0x9:  # ping
+                    self._send_frame(client, payload, opcode=0xA)
+                    continue
+                if opcode != 0x1:
+                    continue
+                request = json.loads(payload.decode('utf-8'))
+                self.received.append(request)
+                if request.get('op') == 'ping':
+                    self._send_frame(client, json.dumps({"op": "pong", "success": True}).encode())
+                elif request.get('op') == 'subscribe':
+                    self._send_frame(client, json.dumps({"op": "subscribe", "success": True}).encode())
+                    threading.Thread(target=self._replay, args=(client,), daemon=True).start()
+        except (ConnectionError, OSError, ValueError):
+            pass
+        finally:
+            if client in self._clients:
+                self._clients.remove(client)
+            try:
+                client.close()
+            except OSError:
+                pass
+
+    def _replay(self, client: socket.socket):
+        for item in self.messages:
+            if not self._running:
+                return
+            delay = self.interval
+            message = item
+            if isinstance(item, dict) and 'message' in item:
+                delay = item.get('delay', self.interval)
+                message = item['message']
+            if delay:
+                time.sleep(delay)
+            payload = message if isinstance(message, str) else json.dumps(message)
+            try:
+                self._send_frame(client, payload.encode('utf-8'))
+            except OSError:
+                return